@@ -0,0 +1,82 @@
+import time
+from dataclasses import replace
+
+import numpy as np
+
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_expected_sarsa import AgentExpectedSarsa
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+from rl_intro.utils.logger import logger
+
+# * configurations: change these as needed
+
+n_rows, n_cols = 4, 10
+n_actions = 4
+dtypes = ["float64", "float32", "float16"]
+n_runs = 5
+
+env_config = GridWorldConfig(
+    width=n_cols,
+    height=n_rows,
+    start_states=[0],
+    terminal_states=[39],
+    cliff_states=[4, 24, 5, 25],
+    wall_states=[2, 12, 22, 17, 27, 37],
+    random_seed=42,
+)
+
+agent_config = AgentConfig(
+    n_states=n_cols * n_rows,
+    n_actions=n_actions,
+    random_seed=42,
+    learning_rate=0.3,
+    discount=1.0,
+)
+policy_config = EpsilonGreedyConfig(epsilon=0.1)
+
+experiment_config = ExperimentConfig(
+    n_episodes=1000, max_steps=200, log_level="episodes"
+)
+
+
+def benchmark(dtype: str) -> dict:
+    """Runs n_runs seeds and reports throughput and the return of the last 100 episodes."""
+    n_steps, seconds, final_returns = 0, 0.0, []
+    for seed in range(n_runs):
+        agent = AgentExpectedSarsa(
+            replace(agent_config, dtype=dtype, random_seed=seed),
+            EpsilonGreedyPolicy(policy_config),
+        )
+        env = GridWorld(replace(env_config, random_seed=seed))
+        start = time.perf_counter()
+        log = Experiment(agent, env, experiment_config).run()
+        seconds += time.perf_counter() - start
+        n_steps += int(log.episodes.lengths.sum())
+        final_returns.append(log.episodes.returns[-100:].mean())
+    return {
+        "steps_per_second": n_steps / seconds,
+        "final_return": float(np.mean(final_returns)),
+        "q_bytes": agent.memory_footprint()["q"],
+    }
+
+
+def large_map_footprint(dtype: str, n_states: int = 500 * 500) -> int:
+    agent = AgentExpectedSarsa(
+        replace(agent_config, n_states=n_states, dtype=dtype),
+        EpsilonGreedyPolicy(policy_config),
+    )
+    return sum(agent.memory_footprint().values())
+
+
+if __name__ == "__main__":
+    logger.setLevel("INFO")
+    for dtype in dtypes:
+        result = benchmark(dtype)
+        logger.info(
+            f"{dtype:>8}: {result['steps_per_second']:10.0f} steps/s, "
+            f"final return {result['final_return']:8.2f}, "
+            f"Q table {result['q_bytes']} bytes, "
+            f"500x500 map {large_map_footprint(dtype) / 2**20:.1f} MiB"
+        )
@@ -0,0 +1,65 @@
+import time
+
+import numpy as np
+
+from rl_intro.agent.agent_linear import AgentLinearSarsa, LinearAgentConfig
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.agent.tile_coding import TileCoder
+from rl_intro.environment.mountain_car import (
+    HIGH,
+    LOW,
+    MountainCar,
+    MountainCarConfig,
+    VectorMountainCar,
+)
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+from rl_intro.utils.logger import logger
+
+# * configurations: change these as needed
+
+env_config = MountainCarConfig(random_seed=0)
+agent_config = LinearAgentConfig(
+    n_states=0, n_actions=3, learning_rate=0.5, random_seed=0, low=LOW, high=HIGH
+)
+n_episodes = 100
+n_envs = 1024
+n_vector_steps = 1000
+
+
+def scalar_throughput() -> float:
+    """Steps per second of one linear SARSA agent on a single MountainCar."""
+    agent = AgentLinearSarsa(
+        agent_config, EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.0))
+    )
+    experiment = Experiment(
+        agent,
+        MountainCar(env_config),
+        ExperimentConfig(n_episodes=n_episodes, max_steps=1000, log_level="episodes"),
+    )
+    start = time.perf_counter()
+    log = experiment.run()
+    seconds = time.perf_counter() - start
+    logger.info(f"last 10 episode lengths: {log.episodes.lengths[-10:]}")
+    return log.episodes.lengths.sum() / seconds
+
+
+def vector_throughput() -> float:
+    """
+    Steps per second of n_envs instances acting greedily on one shared set of tile-coded
+    weights, with features and dynamics computed for all instances at once.
+    """
+    env = VectorMountainCar(env_config, n_envs=n_envs)
+    coder = TileCoder(LOW, HIGH, agent_config.n_tilings, agent_config.tiles_per_dim)
+    weights = np.random.default_rng(0).normal(size=(coder.memory_size, 3))
+    states = env.states
+    start = time.perf_counter()
+    for _ in range(n_vector_steps):
+        actions = weights[coder.indices(states)].sum(axis=1).argmax(axis=1)
+        states, rewards, terminals = env.step(actions)
+    return n_envs * n_vector_steps / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    logger.setLevel("INFO")
+    logger.info(f"scalar: {scalar_throughput():,.0f} steps/s")
+    logger.info(f"vector ({n_envs} envs): {vector_throughput():,.0f} steps/s")
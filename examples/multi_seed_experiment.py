@@ -1,7 +1,5 @@
 import matplotlib.pyplot as plt
-from dataclasses import asdict
 from pathlib import Path
-import json
 
 from rl_intro.agent.core import AgentConfig
 from rl_intro.agent.agent_expected_sarsa import AgentExpectedSarsa
@@ -13,7 +11,10 @@ from rl_intro.simulation.experiment import (
     AgentRecipe,
     EnvironmentRecipe,
 )
-from rl_intro.evaluation.parse import parse_experiment_batch_json
+from rl_intro.evaluation.parse import (
+    parse_experiment_batch_json,
+    save_experiment_batch_json,
+)
 from rl_intro.evaluation.analyze import analyze_experiments
 from rl_intro.evaluation.plot import (
     plot_state_visit_frequency,
@@ -75,8 +76,7 @@ def run_experiment(log_file: Path):
     # * running the experiment
     experiment_logs = experiment_batch.run()
 
-    with open(log_file, "w") as f:
-        json.dump([asdict(log) for log in experiment_logs], f, indent=4)
+    save_experiment_batch_json(experiment_logs, log_file)
     logger.info(f"Experiment completed and logs saved to '{log_file}'.")
 
 
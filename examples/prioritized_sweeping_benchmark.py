@@ -0,0 +1,113 @@
+import time
+from collections import deque
+
+import numpy as np
+
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.agent_expected_sarsa import AgentExpectedSarsa
+from rl_intro.agent.agent_dyna_q import AgentDynaQ, DynaConfig
+from rl_intro.agent.agent_prioritized_sweeping import (
+    AgentPrioritizedSweeping,
+    PrioritizedSweepingConfig,
+)
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+from rl_intro.utils.logger import logger
+
+# * configurations: change these as needed
+
+width, height = 40, 40
+wall_density = 0.25
+n_actions = 4
+time_budget = 120.0  # seconds per agent
+window = 10  # episodes averaged when checking the target return
+target_slack = 1.5  # the target allows this many times the shortest path length
+
+
+def make_maze(seed: int) -> tuple[GridWorldConfig, int]:
+    """Random walls with start and goal in opposite corners, regenerated until solvable."""
+    rng = np.random.default_rng(seed)
+    start, goal = 0, width * height - 1
+    while True:
+        walls = np.flatnonzero(rng.random(width * height) < wall_density)
+        walls = walls[(walls != start) & (walls != goal)].tolist()
+        config = GridWorldConfig(
+            width=width,
+            height=height,
+            start_states=[start],
+            terminal_states=[goal],
+            cliff_states=[],
+            wall_states=walls,
+            random_seed=seed,
+        )
+        distance = shortest_path(GridWorld(config), start, goal)
+        if distance is not None:
+            return config, distance
+
+
+def shortest_path(env: GridWorld, start: int, goal: int) -> int | None:
+    distances = {start: 0}
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        if state == goal:
+            return distances[state]
+        for next_state in env.next_state_table[state].tolist():
+            if next_state not in distances:
+                distances[next_state] = distances[state] + 1
+                queue.append(next_state)
+    return None
+
+
+def time_to_target(agent, env_config: GridWorldConfig, target: float) -> tuple:
+    """Runs episodes until the mean return of the last episodes reaches the target."""
+    experiment = Experiment(
+        agent,
+        GridWorld(env_config),
+        ExperimentConfig(max_steps=20 * width * height, log_level="episodes"),
+    )
+    start = time.perf_counter()
+    while time.perf_counter() - start < time_budget:
+        experiment.run_episode()
+        returns = experiment.log.episodes.returns
+        if len(returns) >= window and returns[-window:].mean() >= target:
+            return time.perf_counter() - start, len(returns)
+    return None, len(experiment.log.episodes.returns)
+
+
+if __name__ == "__main__":
+    logger.setLevel("INFO")
+    env_config, distance = make_maze(seed=0)
+    # -1 per step and +1 for entering the goal
+    target = -(target_slack * distance - 1) + 1
+    logger.info(f"{width}x{height} maze, shortest path {distance}, target {target}")
+
+    n_states = width * height
+    policy_config = EpsilonGreedyConfig(epsilon=0.05)
+    base = dict(n_states=n_states, n_actions=n_actions, random_seed=0)
+    agents = [
+        AgentSarsa(
+            AgentConfig(learning_rate=0.5, **base), EpsilonGreedyPolicy(policy_config)
+        ),
+        AgentQLearning(
+            AgentConfig(learning_rate=0.5, **base), EpsilonGreedyPolicy(policy_config)
+        ),
+        AgentExpectedSarsa(
+            AgentConfig(learning_rate=0.5, **base), EpsilonGreedyPolicy(policy_config)
+        ),
+        AgentDynaQ(
+            DynaConfig(learning_rate=0.5, n_planning=20, **base),
+            EpsilonGreedyPolicy(policy_config),
+        ),
+        AgentPrioritizedSweeping(
+            PrioritizedSweepingConfig(learning_rate=0.5, n_planning=20, **base),
+            EpsilonGreedyPolicy(policy_config),
+        ),
+    ]
+    for agent in agents:
+        seconds, n_episodes = time_to_target(agent, env_config, target)
+        result = f"{seconds:.2f} s" if seconds is not None else "not reached"
+        logger.info(f"{type(agent).__name__:>24}: {result} after {n_episodes} episodes")
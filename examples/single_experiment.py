@@ -1,14 +1,12 @@
 import matplotlib.pyplot as plt
-from dataclasses import asdict
 from pathlib import Path
-import json
 
 from rl_intro.agent.core import AgentConfig
 from rl_intro.agent.agent_expected_sarsa import AgentExpectedSarsa
 from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
 from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
 from rl_intro.simulation.experiment import Experiment, ExperimentConfig
-from rl_intro.evaluation.parse import parse_experiment_json
+from rl_intro.evaluation.parse import parse_experiment_json, save_experiment_json
 from rl_intro.evaluation.analyze import analyze_experiment
 from rl_intro.evaluation.plot import (
     plot_state_visit_frequency,
@@ -65,8 +63,7 @@ def run_experiment(log_file: Path):
     # logger.debug(grid_str(agent.get_greedy_actions(), n_cols, n_rows))
     # logger.debug(grid_str(agent.get_greedy_values(), n_cols, n_rows))
 
-    with open(log_file, "w") as f:
-        json.dump(asdict(experiment_log), f, indent=4)
+    save_experiment_json(experiment_log, log_file)
     logger.info(f"Experiment completed and logs saved to '{log_file}'.")
 
 
@@ -0,0 +1,79 @@
+from rl_intro.agent.core import AgentConfig, BatchedAgent, Policy
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.agent_expected_sarsa import AgentExpectedSarsa
+from typing import Sequence
+from numpy.typing import NDArray
+import numpy as np
+from rl_intro.utils.logger import logger
+
+
+class BatchedAgentSarsa(BatchedAgent):
+    def __init__(self, config: AgentConfig, policy: Policy, seeds: Sequence[int]):
+        super().__init__(config, policy, seeds)
+        logger.debug(self.__str__() + " initialized.")
+
+    def __str__(self):
+        return f"BatchedAgentSarsa(learning_rate={self.config.learning_rate},discount={self.config.discount},policy={self.policy},n_seeds={self.n_seeds})"
+
+    def learn(
+        self,
+        states: NDArray,
+        rewards: NDArray,
+        terminals: NDArray,
+        actions: NDArray,
+        seeds: NDArray,
+    ) -> None:
+        next_values = self.q[seeds, states[seeds], actions[seeds]]
+        self._apply_td_update(seeds, rewards, terminals, next_values)
+
+
+class BatchedAgentQLearning(BatchedAgent):
+    def __init__(self, config: AgentConfig, policy: Policy, seeds: Sequence[int]):
+        super().__init__(config, policy, seeds)
+        logger.debug(self.__str__() + " initialized.")
+
+    def __str__(self):
+        return f"BatchedAgentQLearning(learning_rate={self.config.learning_rate},discount={self.config.discount},policy={self.policy},n_seeds={self.n_seeds})"
+
+    def learn(
+        self,
+        states: NDArray,
+        rewards: NDArray,
+        terminals: NDArray,
+        actions: NDArray,
+        seeds: NDArray,
+    ) -> None:
+        next_values = np.max(self.q[seeds, states[seeds], :], axis=1)
+        self._apply_td_update(seeds, rewards, terminals, next_values)
+
+
+class BatchedAgentExpectedSarsa(BatchedAgent):
+    def __init__(self, config: AgentConfig, policy: Policy, seeds: Sequence[int]):
+        super().__init__(config, policy, seeds)
+        logger.debug(self.__str__() + " initialized.")
+
+    def __str__(self):
+        return f"BatchedAgentExpectedSarsa(learning_rate={self.config.learning_rate},discount={self.config.discount},policy={self.policy},n_seeds={self.n_seeds})"
+
+    def learn(
+        self,
+        states: NDArray,
+        rewards: NDArray,
+        terminals: NDArray,
+        actions: NDArray,
+        seeds: NDArray,
+    ) -> None:
+        distribution = self.policy.get_states_distribution(self, states)[seeds]
+        q_values = self.q[seeds, states[seeds], :]
+        # stacked matmul reduces each row like np.dot does in AgentExpectedSarsa
+        next_values = np.matmul(distribution[:, None, :], q_values[:, :, None])[:, 0, 0]
+        self._apply_td_update(seeds, rewards, terminals, next_values)
+
+
+# scalar agent classes and the batched classes that replicate them seed by seed
+BATCHED_AGENTS: dict[type, type[BatchedAgent]] = {
+    AgentSarsa: BatchedAgentSarsa,
+    AgentQLearning: BatchedAgentQLearning,
+    AgentExpectedSarsa: BatchedAgentExpectedSarsa,
+}
@@ -0,0 +1,137 @@
+from rl_intro.agent.core import Agent, AgentConfig, Policy
+from rl_intro.agent.greedy_cache import GreedyCache
+from rl_intro.agent.q_table import make_q_table
+from rl_intro.utils.rng import make_generator
+from rl_intro.environment.core import Reward, Action, Terminal, State
+from dataclasses import dataclass
+from typing import Optional
+from numpy.typing import NDArray
+import numpy as np
+from rl_intro.utils.logger import logger
+
+
+@dataclass
+class DynaConfig(AgentConfig):
+    n_planning: int = 10  # simulated updates per real step
+
+
+class AgentDynaQ(Agent):
+    """
+    Dyna-Q: one-step Q-learning on real transitions, plus n_planning simulated updates
+    per step on transitions replayed from a deterministic model of the last outcome of
+    every (state, action) pair seen so far.
+    """
+
+    def __init__(self, config: DynaConfig, policy: Policy):
+        assert config.q_backend == "dense", "Dyna-Q plans on a dense Q table."
+        assert config.replay_batch_size == 0, "Dyna-Q does not replay transitions."
+        self.config = config
+        self.policy = policy
+
+        self.last_state: Optional[State] = None
+        self.last_action: Optional[Action] = None
+
+        self.q = make_q_table(self.config)
+        self.random_generator = make_generator(
+            config.random_seed, config.rng_block_size
+        )
+        # planning draws from its own stream, so action selection is unaffected by it
+        self.planning_generator = np.random.default_rng(
+            np.random.SeedSequence(config.random_seed).spawn(1)[0]
+        )
+        self.greedy = GreedyCache(self.q) if config.greedy_cache else None
+
+        shape = (config.n_states, config.n_actions)
+        state_dtype = np.int32 if config.n_states < 2**31 else np.int64
+        self.model_next_state = np.zeros(shape, dtype=state_dtype)
+        self.model_reward = np.zeros(shape)
+        self.model_terminal = np.zeros(shape, dtype=bool)
+        self.model_seen = np.zeros(shape, dtype=bool)
+        # flat indices of the seen pairs, for uniform sampling without a scan
+        self.seen_pairs = np.empty(config.n_states * config.n_actions, dtype=np.int64)
+        self.n_seen = 0
+
+        logger.debug(self.__str__() + " initialized.")
+
+    def __str__(self):
+        return f"AgentDynaQ(learning_rate={self.config.learning_rate},discount={self.config.discount},n_planning={self.config.n_planning},policy={self.policy})"
+
+    def step(
+        self, state: State, reward: Optional[Reward], terminal: Terminal
+    ) -> Action:
+        action = self.policy.select_action(self, state, reward)
+        if reward is not None:
+            self.learn(state, reward, terminal, action)
+            self.update_model(state, reward, terminal)
+            self.plan(self.config.n_planning)
+        self.last_state = state if not terminal else None
+        self.last_action = action if not terminal else None
+        return action
+
+    def learn(
+        self, state: State, reward: Reward, terminal: Terminal, action: Action
+    ) -> None:
+        if terminal:
+            td_error = reward - float(self.q[self.last_state, self.last_action])
+        else:
+            max_value = (
+                self.greedy.max_values[state]
+                if self.greedy is not None
+                else float(np.max(self.q[state, :]))
+            )
+            td_error = (
+                reward
+                + self.config.discount * max_value
+                - float(self.q[self.last_state, self.last_action])
+            )
+        self.update_q(
+            self.last_state, self.last_action, self.config.learning_rate * td_error
+        )
+
+    def update_model(self, state: State, reward: Reward, terminal: Terminal) -> None:
+        s, a = self.last_state, self.last_action
+        if not self.model_seen[s, a]:
+            self.model_seen[s, a] = True
+            self.seen_pairs[self.n_seen] = s * self.config.n_actions + a
+            self.n_seen += 1
+        self.model_next_state[s, a] = state
+        self.model_reward[s, a] = reward
+        self.model_terminal[s, a] = terminal
+
+    def sample_model(
+        self, n: int
+    ) -> tuple[NDArray, NDArray, NDArray, NDArray, NDArray]:
+        """Draws n seen pairs uniformly with replacement and their modelled outcomes."""
+        picks = self.seen_pairs[self.planning_generator.integers(self.n_seen, size=n)]
+        states, actions = np.divmod(picks, self.config.n_actions)
+        return (
+            states,
+            actions,
+            self.model_reward[states, actions],
+            self.model_next_state[states, actions],
+            self.model_terminal[states, actions],
+        )
+
+    def plan(self, n: int) -> None:
+        """
+        Applies n simulated Q-learning updates in one learn_batch call, so all targets
+        are computed from the Q table before the update.
+        """
+        if n <= 0 or self.n_seen == 0:
+            return
+        states, actions, rewards, next_states, terminals = self.sample_model(n)
+        self.learn_batch(states, actions, rewards, next_states, actions, terminals)
+
+    def _next_values(self, next_states: NDArray, next_actions: NDArray) -> NDArray:
+        return self.q[next_states].max(axis=1).astype(np.float64)
+
+    def memory_footprint(self) -> dict[str, int]:
+        footprint = super().memory_footprint()
+        footprint["model"] = (
+            self.model_next_state.nbytes
+            + self.model_reward.nbytes
+            + self.model_terminal.nbytes
+            + self.model_seen.nbytes
+            + self.seen_pairs.nbytes
+        )
+        return footprint
@@ -1,6 +1,11 @@
 from rl_intro.agent.core import Agent, AgentConfig, Policy
+from rl_intro.agent.greedy_cache import GreedyCache
+from rl_intro.agent.q_table import make_q_table
+from rl_intro.agent.replay import make_replay_buffer
+from rl_intro.utils.rng import make_generator
 from rl_intro.environment.core import Reward, Action, Terminal, State
 from typing import Optional
+from numpy.typing import NDArray
 import numpy as np
 from rl_intro.utils.logger import logger
 
@@ -16,8 +21,12 @@ class AgentExpectedSarsa(Agent):
         self.last_state: Optional[State] = None
         self.last_action: Optional[Action] = None
 
-        self.q = np.zeros((self.config.n_states, self.config.n_actions))
-        self.random_generator = np.random.default_rng(config.random_seed)
+        self.q = make_q_table(self.config)
+        self.random_generator = make_generator(
+            config.random_seed, config.rng_block_size
+        )
+        self.greedy = GreedyCache(self.q) if config.greedy_cache else None
+        self.replay_buffer = make_replay_buffer(config)
 
         logger.debug(self.__str__() + " initialized.")
 
@@ -30,6 +39,8 @@ class AgentExpectedSarsa(Agent):
         action = self.policy.select_action(self, state, reward)
         if reward is not None:
             self.learn(state, reward, terminal, action)
+            if self.replay_buffer is not None:
+                self.replay(state, reward, terminal)
         self.last_state = state if not terminal else None
         self.last_action = action if not terminal else None
         return action
@@ -38,16 +49,20 @@ class AgentExpectedSarsa(Agent):
         self, state: State, reward: Reward, terminal: Terminal, action: Action
     ) -> None:
         if terminal:
-            td_error = reward - self.q[self.last_state, self.last_action]
+            td_error = reward - float(self.q[self.last_state, self.last_action])
         else:
-            expected_value = np.dot(
-                self.policy.get_state_distribution(self, state), self.q[state, :]
-            )
+            expected_value = float(self.policy.get_expected_value(self, state))
             td_error = (
                 reward
                 + self.config.discount * expected_value
-                - self.q[self.last_state, self.last_action]
+                - float(self.q[self.last_state, self.last_action])
             )
-        self.q[self.last_state, self.last_action] += (
-            self.config.learning_rate * td_error
+        self.update_q(
+            self.last_state, self.last_action, self.config.learning_rate * td_error
         )
+
+    def _next_values(self, next_states: NDArray, next_actions: NDArray) -> NDArray:
+        distribution = self.policy.get_rows_distribution(self, next_states)
+        q_values = self.q[next_states].astype(np.float64)
+        # stacked matmul reduces each row like the np.dot in get_expected_value
+        return np.matmul(distribution[:, None, :], q_values[:, :, None])[:, 0, 0]
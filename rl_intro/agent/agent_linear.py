@@ -0,0 +1,183 @@
+from rl_intro.agent.core import Agent, AgentConfig, Policy
+from rl_intro.agent.tile_coding import TileCoder
+from rl_intro.utils.rng import make_generator
+from rl_intro.environment.core import Reward, Action, Terminal, State
+from dataclasses import dataclass
+from typing import Any, Optional
+from numpy.typing import NDArray
+import numpy as np
+from rl_intro.utils.logger import logger
+
+
+@dataclass
+class LinearAgentConfig(AgentConfig):
+    # observation box of the tile coder; defaults to the grid for grid_width
+    low: tuple[float, ...] = ()
+    high: tuple[float, ...] = ()
+    # integer grid states are observed as (row, col) on a grid of this width,
+    # without it states are observation vectors (arrays, not tuples)
+    grid_width: Optional[int] = None
+    n_tilings: int = 8
+    tiles_per_dim: int = 8
+    memory_size: int = 4096  # hashed features per action
+
+
+class LinearQ:
+    """
+    Read-only Q table view of a linear agent: q[state] and q[state, action] evaluate
+    the weights of the active tiles, so the tabular policies work unchanged.
+    """
+
+    def __init__(self, agent: "AgentLinearSarsa"):
+        self.agent = agent
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, tuple):
+            state, action = key
+        else:
+            state, action = key, slice(None)
+        return self.agent.action_values(state)[action]
+
+    @property
+    def nbytes(self) -> int:
+        return self.agent.weights.nbytes
+
+    def greedy_values(self) -> NDArray:
+        return self.agent.grid_action_values().max(axis=1)
+
+    def greedy_actions(self) -> NDArray:
+        return self.agent.grid_action_values().argmax(axis=1)
+
+
+class AgentLinearSarsa(Agent):
+    """
+    Semi-gradient SARSA with a linear Q over hashed tile-coded features: one weight per
+    (feature, action), Q(s, a) is the sum of the weights of the n_tilings active
+    features, and an update only touches those. learning_rate is the step size of the
+    whole estimate, so each active weight moves by learning_rate / n_tilings.
+    """
+
+    def __init__(self, config: LinearAgentConfig, policy: Policy):
+        assert (
+            config.replay_batch_size == 0
+        ), "The linear agent does not replay transitions."
+        self.config = config
+        self.policy = policy
+
+        self.last_state: Optional[State] = None
+        self.last_action: Optional[Action] = None
+        self.last_features: Optional[NDArray] = None
+
+        low, high = config.low, config.high
+        if not low and config.grid_width is not None:
+            height = config.n_states / config.grid_width
+            low, high = (0.0, 0.0), (height, config.grid_width)
+        self.tile_coder = TileCoder(
+            low, high, config.n_tilings, config.tiles_per_dim, config.memory_size
+        )
+        self.weights = np.full(
+            (config.memory_size, config.n_actions),
+            config.initial_value / config.n_tilings,
+            dtype=config.dtype,
+        )
+        self.q = LinearQ(self)
+        self.random_generator = make_generator(
+            config.random_seed, config.rng_block_size
+        )
+        # features of the state seen last (compared by value), reused while the
+        # policy looks at it
+        self._cached_state: Any = None
+        self._cached_features: Optional[NDArray] = None
+
+        logger.debug(self.__str__() + " initialized.")
+
+    def __str__(self):
+        return f"AgentLinearSarsa(learning_rate={self.config.learning_rate},discount={self.config.discount},n_tilings={self.config.n_tilings},memory_size={self.config.memory_size},policy={self.policy})"
+
+    def features(self, state: State) -> NDArray:
+        if not self._is_cached(state):
+            observation = (
+                divmod(state, self.config.grid_width)
+                if self.config.grid_width is not None
+                else state
+            )
+            self._cached_features = self.tile_coder.indices(observation)
+            # a copy, as callers may update their state array in place
+            self._cached_state = (
+                np.array(state) if isinstance(state, np.ndarray) else state
+            )
+        return self._cached_features
+
+    def _is_cached(self, state: State) -> bool:
+        cached = self._cached_state
+        if cached is None:
+            return False
+        if isinstance(state, np.ndarray) or isinstance(cached, np.ndarray):
+            return np.array_equal(state, cached)
+        return state == cached
+
+    def action_values(self, state: State) -> NDArray:
+        return self.weights[self.features(state)].sum(axis=0, dtype=np.float64)
+
+    def grid_action_values(self) -> NDArray:
+        """(n_states, n_actions) values of all grid states, empty without grid_width."""
+        if self.config.grid_width is None:
+            return np.empty((0, self.config.n_actions))
+        observations = np.stack(
+            np.divmod(np.arange(self.config.n_states), self.config.grid_width), axis=1
+        )
+        features = self.tile_coder.indices(observations)
+        return self.weights[features].sum(axis=1, dtype=np.float64)
+
+    def step(
+        self, state: State, reward: Optional[Reward], terminal: Terminal
+    ) -> Action:
+        features = self.features(state)
+        action = self.policy.select_action(self, state, reward)
+        if reward is not None:
+            self.learn(state, reward, terminal, action)
+        self.last_state = state if not terminal else None
+        self.last_action = action if not terminal else None
+        self.last_features = features if not terminal else None
+        return action
+
+    def learn(
+        self, state: State, reward: Reward, terminal: Terminal, action: Action
+    ) -> None:
+        current = self.weights[self.last_features, self.last_action].sum(
+            dtype=np.float64
+        )
+        if terminal:
+            td_error = reward - current
+        else:
+            next_value = self.weights[self.features(state), action].sum(
+                dtype=np.float64
+            )
+            td_error = reward + self.config.discount * next_value - current
+        self.update_weights(td_error)
+
+    def update_weights(self, td_error: float) -> None:
+        """Moves the active weights of the last (state, action) along the TD error."""
+        step = self.config.learning_rate / self.config.n_tilings * td_error
+        # add.at, as hash collisions can repeat a feature within one state
+        np.add.at(self.weights, (self.last_features, self.last_action), step)
+
+
+class AgentLinearQLearning(AgentLinearSarsa):
+    """Semi-gradient Q-learning on the same tile-coded linear Q as AgentLinearSarsa."""
+
+    def __str__(self):
+        return f"AgentLinearQLearning(learning_rate={self.config.learning_rate},discount={self.config.discount},n_tilings={self.config.n_tilings},memory_size={self.config.memory_size},policy={self.policy})"
+
+    def learn(
+        self, state: State, reward: Reward, terminal: Terminal, action: Action
+    ) -> None:
+        current = self.weights[self.last_features, self.last_action].sum(
+            dtype=np.float64
+        )
+        if terminal:
+            td_error = reward - current
+        else:
+            next_value = self.action_values(state).max()
+            td_error = reward + self.config.discount * next_value - current
+        self.update_weights(td_error)
@@ -0,0 +1,91 @@
+from rl_intro.agent.core import Policy
+from rl_intro.agent.agent_dyna_q import AgentDynaQ, DynaConfig
+from rl_intro.environment.core import Reward, Action, Terminal, State
+from rl_intro.utils.heap import IndexedMaxHeap
+from dataclasses import dataclass
+from typing import Optional
+import numpy as np
+
+
+@dataclass
+class PrioritizedSweepingConfig(DynaConfig):
+    # pairs whose TD error is at most this are not queued
+    priority_threshold: float = 1e-4
+
+
+class AgentPrioritizedSweeping(AgentDynaQ):
+    """
+    Prioritized sweeping on the Dyna-Q model tables: real transitions queue their pair
+    by the size of its TD error, and each planning update re-queues only the predecessors
+    of the updated state whose TD error exceeds priority_threshold. Planning is a Python
+    loop over at most n_planning queued pairs, largest error first.
+    """
+
+    def __init__(self, config: PrioritizedSweepingConfig, policy: Policy):
+        super().__init__(config, policy)
+        self.queue = IndexedMaxHeap()
+        # state -> flat indices of the pairs the model says lead into it
+        self.predecessors: dict[State, set[int]] = {}
+
+    def __str__(self):
+        return f"AgentPrioritizedSweeping(learning_rate={self.config.learning_rate},discount={self.config.discount},n_planning={self.config.n_planning},priority_threshold={self.config.priority_threshold},policy={self.policy})"
+
+    def step(
+        self, state: State, reward: Optional[Reward], terminal: Terminal
+    ) -> Action:
+        action = self.policy.select_action(self, state, reward)
+        if reward is not None:
+            self.update_model(state, reward, terminal)
+            self.learn(state, reward, terminal, action)
+            self.plan(self.config.n_planning)
+        self.last_state = state if not terminal else None
+        self.last_action = action if not terminal else None
+        return action
+
+    def learn(
+        self, state: State, reward: Reward, terminal: Terminal, action: Action
+    ) -> None:
+        """Queues the real transition; the Q update itself happens in plan()."""
+        self._queue_pair(self.last_state * self.config.n_actions + self.last_action)
+
+    def update_model(self, state: State, reward: Reward, terminal: Terminal) -> None:
+        pair = self.last_state * self.config.n_actions + self.last_action
+        if self.model_seen[self.last_state, self.last_action]:
+            old_next = int(self.model_next_state[self.last_state, self.last_action])
+            self.predecessors[old_next].discard(pair)
+        super().update_model(state, reward, terminal)
+        self.predecessors.setdefault(state, set()).add(pair)
+
+    def _max_q(self, state: State) -> float:
+        if self.greedy is not None:
+            return self.greedy.max_values[state]
+        return float(np.max(self.q[state, :]))
+
+    def _td_error(self, state: State, action: Action) -> float:
+        target = float(self.model_reward[state, action])
+        if not self.model_terminal[state, action]:
+            next_state = int(self.model_next_state[state, action])
+            target += self.config.discount * self._max_q(next_state)
+        return target - float(self.q[state, action])
+
+    def _queue_pair(self, pair: int) -> None:
+        state, action = divmod(pair, self.config.n_actions)
+        priority = abs(self._td_error(state, action))
+        if priority > self.config.priority_threshold:
+            # keep the larger priority if the pair is already queued
+            if priority > (self.queue.priority(pair) or 0.0):
+                self.queue.push(pair, priority)
+
+    def plan(self, n: int) -> None:
+        for _ in range(n):
+            if not self.queue:
+                break
+            pair, _ = self.queue.pop()
+            state, action = divmod(pair, self.config.n_actions)
+            self.update_q(
+                state,
+                action,
+                self.config.learning_rate * self._td_error(state, action),
+            )
+            for predecessor in self.predecessors.get(state, ()):
+                self._queue_pair(predecessor)
@@ -0,0 +1,73 @@
+from rl_intro.agent.core import Agent, Policy
+from rl_intro.agent.greedy_cache import GreedyCache
+from rl_intro.agent.q_table import make_q_table
+from rl_intro.agent.traces import TraceAgentConfig, EligibilityTraces
+from rl_intro.utils.rng import make_generator
+from rl_intro.environment.core import Reward, Action, Terminal, State
+from typing import Optional
+import numpy as np
+from rl_intro.utils.logger import logger
+
+
+class AgentQLambda(Agent):
+    """Watkins's Q(lambda): traces are cut whenever the next action is exploratory."""
+
+    def __init__(self, config: TraceAgentConfig, policy: Policy):
+        assert config.replay_batch_size == 0, "Q(lambda) does not replay transitions."
+        self.config = config
+        self.policy = policy
+
+        self.last_state: Optional[State] = None
+        self.last_action: Optional[Action] = None
+
+        self.q = make_q_table(self.config)
+        self.random_generator = make_generator(
+            config.random_seed, config.rng_block_size
+        )
+        self.greedy = GreedyCache(self.q) if config.greedy_cache else None
+        self.traces = EligibilityTraces(config.trace_type, config.trace_threshold)
+
+        logger.debug(self.__str__() + " initialized.")
+
+    def __str__(self):
+        return f"AgentQLambda(learning_rate={self.config.learning_rate},discount={self.config.discount},trace_decay={self.config.trace_decay},trace_type={self.config.trace_type},policy={self.policy})"
+
+    def step(
+        self, state: State, reward: Optional[Reward], terminal: Terminal
+    ) -> Action:
+        action = self.policy.select_action(self, state, reward)
+        if reward is not None:
+            self.learn(state, reward, terminal, action)
+        else:
+            # a new episode starts, also after a truncated one
+            self.traces.clear()
+        self.last_state = state if not terminal else None
+        self.last_action = action if not terminal else None
+        return action
+
+    def learn(
+        self, state: State, reward: Reward, terminal: Terminal, action: Action
+    ) -> None:
+        greedy = True
+        if terminal:
+            td_error = reward - float(self.q[self.last_state, self.last_action])
+        else:
+            max_value = (
+                self.greedy.max_values[state]
+                if self.greedy is not None
+                else float(np.max(self.q[state, :]))
+            )
+            greedy = float(self.q[state, action]) == max_value
+            td_error = (
+                reward
+                + self.config.discount * max_value
+                - float(self.q[self.last_state, self.last_action])
+            )
+        self.traces.visit(self.last_state, self.last_action)
+        self.traces.update(
+            self,
+            self.config.learning_rate * td_error,
+            self.config.discount * self.config.trace_decay,
+        )
+        if terminal or not greedy:
+            self.traces.clear()
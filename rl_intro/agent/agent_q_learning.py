@@ -1,6 +1,11 @@
 from rl_intro.agent.core import Agent, AgentConfig, Policy
+from rl_intro.agent.greedy_cache import GreedyCache
+from rl_intro.agent.q_table import make_q_table
+from rl_intro.agent.replay import make_replay_buffer
+from rl_intro.utils.rng import make_generator
 from rl_intro.environment.core import Reward, Action, Terminal, State
 from typing import Optional
+from numpy.typing import NDArray
 import numpy as np
 from rl_intro.utils.logger import logger
 
@@ -13,8 +18,12 @@ class AgentQLearning(Agent):
         self.last_state: Optional[State] = None
         self.last_action: Optional[Action] = None
 
-        self.q = np.zeros((self.config.n_states, self.config.n_actions))
-        self.random_generator = np.random.default_rng(config.random_seed)
+        self.q = make_q_table(self.config)
+        self.random_generator = make_generator(
+            config.random_seed, config.rng_block_size
+        )
+        self.greedy = GreedyCache(self.q) if config.greedy_cache else None
+        self.replay_buffer = make_replay_buffer(config)
 
         logger.debug(self.__str__() + " initialized.")
 
@@ -27,6 +36,8 @@ class AgentQLearning(Agent):
         action = self.policy.select_action(self, state, reward)
         if reward is not None:
             self.learn(state, reward, terminal, action)
+            if self.replay_buffer is not None:
+                self.replay(state, reward, terminal)
         self.last_state = state if not terminal else None
         self.last_action = action if not terminal else None
         return action
@@ -35,13 +46,21 @@ class AgentQLearning(Agent):
         self, state: State, reward: Reward, terminal: Terminal, action: Action
     ) -> None:
         if terminal:
-            td_error = reward - self.q[self.last_state, self.last_action]
+            td_error = reward - float(self.q[self.last_state, self.last_action])
         else:
+            max_value = (
+                self.greedy.max_values[state]
+                if self.greedy is not None
+                else float(np.max(self.q[state, :]))
+            )
             td_error = (
                 reward
-                + self.config.discount * np.max(self.q[state, :])
-                - self.q[self.last_state, self.last_action]
+                + self.config.discount * max_value
+                - float(self.q[self.last_state, self.last_action])
             )
-        self.q[self.last_state, self.last_action] += (
-            self.config.learning_rate * td_error
+        self.update_q(
+            self.last_state, self.last_action, self.config.learning_rate * td_error
         )
+
+    def _next_values(self, next_states: NDArray, next_actions: NDArray) -> NDArray:
+        return self.q[next_states].max(axis=1).astype(np.float64)
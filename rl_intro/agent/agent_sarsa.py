@@ -1,20 +1,28 @@
 from rl_intro.agent.core import Agent, AgentConfig, Policy
+from rl_intro.agent.greedy_cache import GreedyCache
+from rl_intro.agent.q_table import make_q_table
+from rl_intro.utils.rng import make_generator
 from rl_intro.environment.core import Reward, Action, Terminal, State
 from typing import Optional
+from numpy.typing import NDArray
 import numpy as np
 from rl_intro.utils.logger import logger
 
 
 class AgentSarsa(Agent):
     def __init__(self, config: AgentConfig, policy: Policy):
+        assert config.replay_batch_size == 0, "Sarsa does not replay transitions."
         self.config = config
         self.policy = policy
 
         self.last_state: Optional[State] = None
         self.last_action: Optional[Action] = None
 
-        self.q = np.zeros((self.config.n_states, self.config.n_actions))
-        self.random_generator = np.random.default_rng(config.random_seed)
+        self.q = make_q_table(self.config)
+        self.random_generator = make_generator(
+            config.random_seed, config.rng_block_size
+        )
+        self.greedy = GreedyCache(self.q) if config.greedy_cache else None
 
         logger.debug(self.__str__() + " initialized.")
 
@@ -35,13 +43,16 @@ class AgentSarsa(Agent):
         self, state: State, reward: Reward, terminal: Terminal, action: Action
     ) -> None:
         if terminal:
-            td_error = reward - self.q[self.last_state, self.last_action]
+            td_error = reward - float(self.q[self.last_state, self.last_action])
         else:
             td_error = (
                 reward
-                + self.config.discount * self.q[state, action]
-                - self.q[self.last_state, self.last_action]
+                + self.config.discount * float(self.q[state, action])
+                - float(self.q[self.last_state, self.last_action])
             )
-        self.q[self.last_state, self.last_action] += (
-            self.config.learning_rate * td_error
+        self.update_q(
+            self.last_state, self.last_action, self.config.learning_rate * td_error
         )
+
+    def _next_values(self, next_states: NDArray, next_actions: NDArray) -> NDArray:
+        return self.q[next_states, next_actions].astype(np.float64)
@@ -0,0 +1,173 @@
+from rl_intro.agent.core import Agent
+from rl_intro.agent.q_table import SparseQTable, given_q_table
+from rl_intro.utils.rng import BufferedGenerator
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Literal, Optional
+import importlib
+import json
+import os
+import shutil
+import numpy as np
+
+CHECKPOINT_VERSION = 1
+Q_FILE = "q.npy"
+# sparse tables store their allocated rows and the states they belong to
+Q_STATES_FILE = "q_states.npy"
+REPLAY_FILE = "replay.npz"
+META_FILE = "meta.json"
+
+
+def class_path(cls: type) -> dict[str, str]:
+    return {"module": cls.__module__, "name": cls.__qualname__}
+
+
+def import_class(path: dict[str, str]) -> type:
+    obj: Any = importlib.import_module(path["module"])
+    for name in path["name"].split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _plain(value: Any) -> Any:
+    """numpy scalars (e.g. states drawn by a generator) as JSON-friendly Python values."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _generator_state(generator: Any) -> dict:
+    if isinstance(generator, BufferedGenerator):
+        # moves the wrapped generator to the values handed out so far
+        generator = generator.sync()
+    return generator.bit_generator.state
+
+
+def _restore_generator(state: dict) -> np.random.Generator:
+    assert state["bit_generator"] == "PCG64", "Expected a PCG64 state."
+    generator = np.random.default_rng()
+    generator.bit_generator.state = state
+    return generator
+
+
+def _previous(directory: Path) -> Path:
+    return directory.with_name(directory.name + ".old")
+
+
+def _resolve(directory: Path) -> Path:
+    """The checkpoint, or the previous one if a save was interrupted while swapping."""
+    directory = Path(directory)
+    if not directory.exists() and _previous(directory).exists():
+        return _previous(directory)
+    return directory
+
+
+def save_checkpoint(agent: Agent, directory: Path, **metadata: Any) -> Path:
+    """
+    Saves the Q table (q.npy, plus q_states.npy for the rows of a SparseQTable), the
+    replay buffer if the agent has one (replay.npz) and the rest of the agent state as
+    meta.json: generator states, last_state and last_action, the agent and policy
+    classes and configs, and any extra metadata (e.g. the episode count). Other tables
+    of subclasses (Dyna models, traces, queues) are not saved and start empty on load.
+    The files are written to a temporary directory which then replaces the checkpoint.
+    The old checkpoint is moved aside first and only deleted afterwards, so a crash
+    leaves one of them on disk.
+    """
+    q = agent.q
+    assert isinstance(q, (np.ndarray, SparseQTable)), "Checkpoints need a Q table."
+    directory = Path(directory)
+    meta = {
+        "version": CHECKPOINT_VERSION,
+        "agent_class": class_path(type(agent)),
+        "agent_config_class": class_path(type(agent.config)),
+        "agent_config": asdict(agent.config),
+        "policy_class": class_path(type(agent.policy)),
+        "policy_config_class": class_path(type(agent.policy.config)),
+        "policy_config": asdict(agent.policy.config),
+        "rng_state": _generator_state(agent.random_generator),
+        "last_state": _plain(agent.last_state),
+        "last_action": _plain(agent.last_action),
+        "metadata": {key: _plain(value) for key, value in metadata.items()},
+    }
+
+    tmp = directory.with_name(directory.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    if isinstance(q, SparseQTable):
+        np.save(tmp / Q_FILE, q.rows)
+        np.save(tmp / Q_STATES_FILE, q.states)
+    else:
+        np.save(tmp / Q_FILE, q)
+    buffer = agent.replay_buffer
+    if buffer is not None:
+        np.savez(
+            tmp / REPLAY_FILE,
+            states=buffer.states,
+            actions=buffer.actions,
+            rewards=buffer.rewards,
+            next_states=buffer.next_states,
+            terminals=buffer.terminals,
+            cursor=np.array([buffer.position, buffer.size]),
+        )
+        meta["replay_rng_state"] = _generator_state(buffer.random_generator)
+    (tmp / META_FILE).write_text(json.dumps(meta, indent=2))
+
+    previous = _previous(directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    if directory.exists():
+        directory.rename(previous)
+    os.replace(tmp, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    return directory
+
+
+def read_metadata(directory: Path) -> dict:
+    meta = json.loads((_resolve(directory) / META_FILE).read_text())
+    if meta.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {meta.get('version')}")
+    return meta
+
+
+def load_checkpoint(
+    directory: Path, mmap_mode: Optional[Literal["r", "r+", "c"]] = None
+) -> Agent:
+    """
+    Rebuilds the agent of a checkpoint. With mmap_mode a dense Q table is memory-mapped
+    instead of read: "r" opens it read-only (e.g. shared by evaluation processes),
+    "c" copy-on-write, and "r+" writes updates back to q.npy. Sparse tables are always
+    read into memory, as they grow on the first visit of a state.
+    """
+    directory = _resolve(directory)
+    meta = read_metadata(directory)
+    agent_config = import_class(meta["agent_config_class"])(**meta["agent_config"])
+    policy_config = import_class(meta["policy_config_class"])(**meta["policy_config"])
+    policy = import_class(meta["policy_class"])(policy_config)
+
+    # the table is loaded first and handed to the constructor, which then allocates none
+    if agent_config.q_backend == "sparse":
+        assert mmap_mode is None, "Sparse Q tables cannot be memory-mapped."
+        q = SparseQTable.from_rows(
+            np.load(directory / Q_STATES_FILE),
+            np.load(directory / Q_FILE),
+            n_states=agent_config.n_states,
+            initial_value=agent_config.initial_value,
+        )
+    else:
+        q = np.load(directory / Q_FILE, mmap_mode=mmap_mode)
+    with given_q_table(q):
+        agent = import_class(meta["agent_class"])(agent_config, policy)
+    assert agent.q is q, f"{agent} does not build its Q table with make_q_table."
+
+    generator = _restore_generator(meta["rng_state"])
+    block_size = agent_config.rng_block_size
+    agent.random_generator = (
+        generator if block_size is None else BufferedGenerator(generator, block_size)
+    )
+    buffer = agent.replay_buffer
+    if buffer is not None:
+        with np.load(directory / REPLAY_FILE) as replay:
+            for name in ("states", "actions", "rewards", "next_states", "terminals"):
+                getattr(buffer, name)[:] = replay[name]
+            buffer.position, buffer.size = replay["cursor"].tolist()
+        buffer.random_generator = _restore_generator(meta["replay_rng_state"])
+    agent.last_state = meta["last_state"]
+    agent.last_action = meta["last_action"]
+    return agent
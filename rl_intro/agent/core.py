@@ -6,10 +6,13 @@ from rl_intro.environment.core import (
 )
 from typing import Protocol
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Literal, Optional, Sequence
 from numpy.typing import NDArray
 from abc import ABC, abstractmethod
 import numpy as np
+from rl_intro.agent.greedy_cache import GreedyCache
+from rl_intro.agent.replay import ReplayBuffer
+from rl_intro.utils.rng import BatchedGenerator, RandomGenerator
 
 
 @dataclass
@@ -24,11 +27,28 @@ class AgentConfig:
     learning_rate: float = 0.1
     discount: float = 1.0
     random_seed: Optional[int] = None
+    # keep a GreedyCache of the Q table (direct writes to agent.q then need a rebuild)
+    greedy_cache: bool = False
+    # draw random numbers in prefetched blocks of this size (see BufferedGenerator)
+    rng_block_size: Optional[int] = None
+    # storage dtype of the Q table (e.g. "float32", "float16"); TD updates are
+    # computed in float64 and only rounded when written back
+    dtype: str = "float64"
+    # "dense" allocates the full (n_states, n_actions) array, "sparse" a SparseQTable
+    # with rows for visited states only
+    q_backend: Literal["dense", "sparse"] = "dense"
+    initial_value: float = 0.0
+    # Q-learning and Expected SARSA replay this many stored transitions per real step
+    # from a ReplayBuffer of replay_capacity transitions; 0 disables replay
+    replay_batch_size: int = 0
+    replay_capacity: int = 10_000
 
 
 class Agent(ABC):
     q: NDArray
-    random_generator: np.random.Generator
+    random_generator: RandomGenerator
+    greedy: Optional[GreedyCache] = None
+    replay_buffer: Optional[ReplayBuffer] = None
 
     def __init__(self, config: AgentConfig, policy: "Policy"):
         self.config = config
@@ -40,13 +60,205 @@ class Agent(ABC):
     ) -> Action:
         pass
 
+    def update_q(self, state: State, action: Action, delta: float) -> None:
+        """Adds delta to Q(state, action), keeping the greedy cache in sync."""
+        old = float(self.q[state, action])
+        self.q[state, action] = old + float(delta)
+        if self.greedy is not None:
+            self.greedy.update(state, action, old, float(self.q[state, action]))
+
+    def learn_batch(
+        self,
+        states: NDArray,
+        actions: NDArray,
+        rewards: NDArray,
+        next_states: NDArray,
+        next_actions: NDArray,
+        terminals: NDArray,
+    ) -> None:
+        """
+        Applies the TD updates of a batch of transitions in one vectorized step,
+        independent of last_state and last_action. All targets are computed from the Q
+        table before the update. A pair that occurs k times receives its k updates in
+        batch order, each towards its own target:
+        Q <- (1 - lr)^k Q + sum_i lr (1 - lr)^(k - 1 - i) target_i,
+        which is what k sequential learn calls give when the targets do not move in
+        between. next_actions is only read by agents that bootstrap on it (SARSA) and
+        is ignored for terminal transitions.
+        """
+        assert isinstance(self.q, np.ndarray), "learn_batch needs a dense Q table."
+        states = np.asarray(states, dtype=np.int64)
+        actions = np.asarray(actions, dtype=np.int64)
+        next_states = np.asarray(next_states, dtype=np.int64)
+        next_actions = np.asarray(next_actions, dtype=np.int64)
+        terminals = np.asarray(terminals, dtype=bool)
+        next_values = np.zeros(len(states))
+        bootstrap = ~terminals
+        if bootstrap.any():
+            next_values[bootstrap] = self._next_values(
+                next_states[bootstrap], next_actions[bootstrap]
+            )
+        rewards = np.asarray(rewards, dtype=np.float64)
+        targets = rewards + self.config.discount * next_values
+        self._apply_targets(states, actions, targets)
+
+    def replay(self, state: State, reward: Reward, terminal: Terminal) -> None:
+        """Stores the transition from last_state and replays a minibatch of the buffer."""
+        buffer = self.replay_buffer
+        buffer.add(self.last_state, self.last_action, reward, state, terminal)
+        states, actions, rewards, next_states, terminals = buffer.sample(
+            self.config.replay_batch_size
+        )
+        # replaying agents bootstrap off-policy, so next actions are never read
+        next_actions = np.zeros_like(actions)
+        self.learn_batch(states, actions, rewards, next_states, next_actions, terminals)
+
+    def _next_values(self, next_states: NDArray, next_actions: NDArray) -> NDArray:
+        """Bootstrap values of non-terminal transitions for learn_batch."""
+        raise NotImplementedError(f"{self} does not support learn_batch.")
+
+    def _apply_targets(
+        self, states: NDArray, actions: NDArray, targets: NDArray
+    ) -> None:
+        n_actions = self.config.n_actions
+        decay = 1.0 - self.config.learning_rate
+        pairs = states * n_actions + actions
+        order = np.argsort(pairs, kind="stable")
+        pairs = pairs[order]
+        starts = np.flatnonzero(np.r_[True, pairs[1:] != pairs[:-1]])
+        counts = np.diff(np.r_[starts, len(pairs)])
+        # how many later updates of the same pair decay each update
+        later = np.repeat(starts + counts, counts) - np.arange(len(pairs)) - 1
+        contributions = np.bincount(
+            np.repeat(np.arange(len(starts)), counts),
+            weights=self.config.learning_rate * decay**later * targets[order],
+            minlength=len(starts),
+        )
+        unique_states, unique_actions = np.divmod(pairs[starts], n_actions)
+        current = self.q[unique_states, unique_actions].astype(np.float64)
+        self.q[unique_states, unique_actions] = decay**counts * current + contributions
+        if self.greedy is not None:
+            for state in np.unique(unique_states).tolist():
+                self.greedy.refresh(state)
+
+    def memory_footprint(self) -> dict[str, int]:
+        """Approximate number of bytes held by each of the agent's tables."""
+        footprint = {"q": self.q.nbytes}
+        if self.greedy is not None:
+            footprint["greedy_cache"] = self.greedy.nbytes
+        if self.replay_buffer is not None:
+            footprint["replay"] = self.replay_buffer.nbytes
+        return footprint
+
     def get_greedy_actions(self) -> np.ndarray:
+        if not isinstance(self.q, np.ndarray):
+            return self.q.greedy_actions()
         return np.argmax(self.q, axis=1)
 
     def get_greedy_values(self) -> np.ndarray:
+        if not isinstance(self.q, np.ndarray):
+            return self.q.greedy_values()
         return np.max(self.q, axis=1)
 
 
+class BatchedAgent(ABC):
+    """
+    Runs one tabular agent per seed on a stacked (n_seeds, n_states, n_actions) Q tensor.
+    Every seed owns an independent stream of a BatchedGenerator, so seed i behaves
+    exactly like a scalar agent created with random_seed=seeds[i].
+    """
+
+    q: NDArray
+    random_generators: BatchedGenerator
+
+    def __init__(self, config: AgentConfig, policy: "Policy", seeds: Sequence[int]):
+        self.config = config
+        self.policy = policy
+        self.seeds = list(seeds)
+        self.n_seeds = len(self.seeds)
+
+        self.last_states = np.full(self.n_seeds, -1, dtype=np.int64)
+        self.last_actions = np.full(self.n_seeds, -1, dtype=np.int64)
+
+        assert config.q_backend == "dense", "Batched agents need a dense Q table."
+        self.q = np.full(
+            (self.n_seeds, self.config.n_states, self.config.n_actions),
+            config.initial_value,
+            dtype=self.config.dtype,
+        )
+        # one stream per seed, drawn for all seeds at once
+        self.random_generators = BatchedGenerator(
+            [np.random.default_rng(seed) for seed in self.seeds],
+            config.rng_block_size or 256,
+        )
+
+    def step(
+        self,
+        states: NDArray,
+        rewards: Optional[NDArray],
+        terminals: NDArray,
+        episode_starts: Optional[NDArray] = None,
+    ) -> NDArray:
+        """
+        Vectorized counterpart of Agent.step. Seeds flagged in episode_starts (or all
+        seeds if rewards is None) only select an action, and so do seeds without a last
+        state, e.g. after a terminal step. The others also learn.
+        """
+        states = np.asarray(states, dtype=np.int64)
+        terminals = np.asarray(terminals, dtype=bool)
+        actions = self.policy.select_actions(self, states)
+        if rewards is not None:
+            learning = self.last_states >= 0
+            if episode_starts is not None:
+                learning &= ~np.asarray(episode_starts, dtype=bool)
+            if learning.any():
+                self.learn(
+                    states,
+                    np.asarray(rewards, dtype=np.float64),
+                    terminals,
+                    actions,
+                    np.flatnonzero(learning),
+                )
+        self.last_states = np.where(terminals, -1, states)
+        self.last_actions = np.where(terminals, -1, actions)
+        return actions
+
+    @abstractmethod
+    def learn(
+        self,
+        states: NDArray,
+        rewards: NDArray,
+        terminals: NDArray,
+        actions: NDArray,
+        seeds: NDArray,
+    ) -> None:
+        """Applies the TD update for the given seed indices."""
+        pass
+
+    def _apply_td_update(
+        self, seeds: NDArray, rewards: NDArray, terminals: NDArray, next_values: NDArray
+    ) -> None:
+        last_states = self.last_states[seeds]
+        last_actions = self.last_actions[seeds]
+        current = self.q[seeds, last_states, last_actions]
+        td_error = np.where(
+            terminals[seeds],
+            rewards[seeds] - current,
+            rewards[seeds] + self.config.discount * next_values - current,
+        )
+        self.q[seeds, last_states, last_actions] += self.config.learning_rate * td_error
+
+    def memory_footprint(self) -> dict[str, int]:
+        """Approximate number of bytes held by each of the agent's tables."""
+        return {"q": self.q.nbytes}
+
+    def get_greedy_actions(self) -> np.ndarray:
+        return np.argmax(self.q, axis=2)
+
+    def get_greedy_values(self) -> np.ndarray:
+        return np.max(self.q, axis=2)
+
+
 class Policy(ABC):
     def __init__(self, config: PolicyConfig):
         self.config = config
@@ -58,9 +270,10 @@ class Policy(ABC):
         pass
 
     @abstractmethod
-    def get_distribution(self, agent: Agent) -> NDArray:
+    def get_distribution(self, agent: Agent, out: Optional[NDArray] = None) -> NDArray:
         """
         Returns a (num_states, num_actions) array where each row is the action distribution for a state.
+        If out is given, the distribution is written into it and out is returned.
         """
         pass
 
@@ -70,3 +283,28 @@ class Policy(ABC):
         Returns the action distribution for a specific state.
         """
         pass
+
+    def get_expected_value(self, agent: Agent, state: State) -> float:
+        """
+        Returns the expected Q value of a state under the policy's action distribution.
+        """
+        return np.dot(self.get_state_distribution(agent, state), agent.q[state, :])
+
+    def get_rows_distribution(self, agent: Agent, states: NDArray) -> NDArray:
+        """
+        Returns a (len(states), num_actions) array with the rows of get_distribution for
+        the given states. Override it to avoid building the full distribution.
+        """
+        return self.get_distribution(agent)[states]
+
+    def select_actions(self, agent: BatchedAgent, states: NDArray) -> NDArray:
+        """
+        Selects one action per seed of a batched agent, drawing from each seed's own stream.
+        """
+        raise NotImplementedError(f"{self} does not support batched agents.")
+
+    def get_states_distribution(self, agent: BatchedAgent, states: NDArray) -> NDArray:
+        """
+        Returns a (n_seeds, num_actions) array with the action distribution of each seed's state.
+        """
+        raise NotImplementedError(f"{self} does not support batched agents.")
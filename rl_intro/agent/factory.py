@@ -1,6 +1,6 @@
 from rl_intro.agent.core import AgentConfig, Policy, PolicyConfig, Agent
 from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Optional
 from rl_intro.utils.logger import logger
 
@@ -16,10 +16,12 @@ class AgentRecipe:
 class AgentFactory:
     @staticmethod
     def create_agent(recipe: AgentRecipe, seed_override: Optional[int] = None) -> Agent:
+        # the recipe is shared between runs, so the override goes into a copy of the config
+        agent_config = recipe.agent_config
         if seed_override is not None:
-            recipe.agent_config.random_seed = seed_override
+            agent_config = replace(agent_config, random_seed=seed_override)
         return recipe.agent_class(
-            recipe.agent_config, recipe.policy_class(recipe.policy_config)
+            agent_config, recipe.policy_class(recipe.policy_config)
         )
 
     @staticmethod
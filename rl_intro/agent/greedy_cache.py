@@ -0,0 +1,74 @@
+from rl_intro.environment.core import State, Action
+from bisect import insort
+import numpy as np
+import sys
+from numpy.typing import NDArray
+from rl_intro.utils.rng import RandomGenerator
+
+
+class GreedyCache:
+    """
+    Per-state maximum, tied argmax set and row sum of a Q table, maintained
+    incrementally on every write so that greedy selection and expectations under
+    epsilon-greedy policies need no array operations. Only writes reported through
+    update() are tracked; call rebuild() after modifying the Q table directly.
+    Row sums are recomputed from the row on every write rather than adjusted by the
+    difference, so they equal q.sum(axis=1) exactly and do not drift. The closed-form
+    expected values built from them still round differently from the np.dot of
+    Policy.get_expected_value, so cached and uncached Expected SARSA runs agree only
+    up to rounding, while greedy selection (SARSA, Q-learning) is bit-identical.
+    """
+
+    def __init__(self, q: NDArray):
+        assert isinstance(q, np.ndarray), "GreedyCache needs a dense Q table."
+        self.q = q
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        max_values = self.q.max(axis=1)
+        self.max_values: list[float] = max_values.tolist()
+        # tied actions in index order, so picking the k-th one matches fair_argmax
+        self.best: list[list[int]] = [
+            [a for a, tied in enumerate(row) if tied]
+            for row in (self.q == max_values[:, None]).tolist()
+        ]
+        self.sums: list[float] = self.q.sum(axis=1).tolist()
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate size of the lists, including the float objects they hold."""
+        size = sum(map(sys.getsizeof, (self.max_values, self.sums, self.best)))
+        size += sum(map(sys.getsizeof, self.best))
+        return size + 2 * len(self.max_values) * sys.getsizeof(0.0)
+
+    def update(self, state: State, action: Action, old: float, new: float) -> None:
+        self.sums[state] = float(self.q[state].sum())
+        max_value = self.max_values[state]
+        best = self.best[state]
+        if new > max_value:
+            self.max_values[state] = new
+            self.best[state] = [action]
+        elif new == max_value:
+            if action not in best:
+                insort(best, action)
+        elif action in best:
+            if len(best) > 1:
+                best.remove(action)
+            else:
+                # the unique maximum decreased, so the row has to be scanned once
+                self.refresh(state)
+
+    def refresh(self, state: State) -> None:
+        """Recomputes the entries of one state, e.g. after a batched write to its row."""
+        row = self.q[state].tolist()
+        max_value = max(row)
+        self.max_values[state] = max_value
+        self.best[state] = [a for a, v in enumerate(row) if v == max_value]
+        self.sums[state] = float(self.q[state].sum())
+
+    def select(self, state: State, random_generator: RandomGenerator) -> Action:
+        """Uniform choice among the tied actions, consuming the same draws as fair_argmax."""
+        best = self.best[state]
+        if len(best) == 1:
+            return best[0]
+        return best[random_generator.integers(len(best))]
@@ -2,7 +2,8 @@ from dataclasses import dataclass
 from typing import List, Optional
 import numpy as np
 import random
-from rl_intro.agent.core import Agent, AgentConfig, Policy, PolicyConfig
+from numpy.typing import NDArray
+from rl_intro.agent.core import Agent, AgentConfig, BatchedAgent, Policy, PolicyConfig
 from rl_intro.environment.core import Reward, State, Action, Terminal
 from rl_intro.utils.math import fair_argmax
 
@@ -16,15 +17,35 @@ class RandomPolicy(Policy):
     ) -> Action:
         return Action(agent.random_generator.choice(agent.config.n_actions))
 
-    def get_distribution(self, agent: Agent) -> np.ndarray:
-        return np.full(
-            (agent.config.n_states, agent.config.n_actions),
-            1.0 / agent.config.n_actions,
-        )
+    def get_distribution(
+        self, agent: Agent, out: Optional[NDArray] = None
+    ) -> np.ndarray:
+        if out is None:
+            out = np.empty((agent.config.n_states, agent.config.n_actions))
+        out.fill(1.0 / agent.config.n_actions)
+        return out
 
     def get_state_distribution(self, agent: Agent, state: State) -> np.ndarray:
         return np.full(agent.config.n_actions, 1.0 / agent.config.n_actions)
 
+    def get_expected_value(self, agent: Agent, state: State) -> float:
+        if agent.greedy is None:
+            return super().get_expected_value(agent, state)
+        return agent.greedy.sums[state] / agent.config.n_actions
+
+    def get_rows_distribution(self, agent: Agent, states: NDArray) -> NDArray:
+        return np.full(
+            (len(states), agent.config.n_actions), 1.0 / agent.config.n_actions
+        )
+
+    def select_actions(self, agent: BatchedAgent, states: NDArray) -> NDArray:
+        return agent.random_generators.integers(agent.config.n_actions)
+
+    def get_states_distribution(self, agent: BatchedAgent, states: NDArray) -> NDArray:
+        return np.full(
+            (len(states), agent.config.n_actions), 1.0 / agent.config.n_actions
+        )
+
 
 @dataclass
 class EpsilonGreedyConfig(PolicyConfig):
@@ -45,31 +66,81 @@ class EpsilonGreedyPolicy(Policy):
             # Explore: random action
             return Action(agent.random_generator.choice(agent.config.n_actions))
             # Exploit: best action from Q-table
+        elif agent.greedy is not None:
+            return Action(agent.greedy.select(state, agent.random_generator))
         else:
             q_values = agent.q[state]
             action, value = fair_argmax(q_values, agent.random_generator)
             return Action(action)
 
-    def get_distribution(self, agent: Agent) -> np.ndarray:
-        n_states = agent.config.n_states
+    def get_distribution(
+        self, agent: Agent, out: Optional[NDArray] = None
+    ) -> np.ndarray:
         n_actions = agent.config.n_actions
-        distribution = np.full((n_states, n_actions), self.config.epsilon / n_actions)
+        q = np.asarray(agent.q)
+        best = q == q.max(axis=1, keepdims=True)
+        if out is None:
+            out = np.empty(best.shape)
 
         # Fairly distribute the (1 - epsilon) probability among all best actions
-        for s in range(n_states):
-            max_q = np.max(agent.q[s])
-            best_actions = np.flatnonzero(agent.q[s] == max_q)
-            distribution[s, best_actions] += (1 - self.config.epsilon) / len(
-                best_actions
-            )
-        return distribution
+        share = (1 - self.config.epsilon) / best.sum(axis=1, keepdims=True)
+        np.multiply(best, share, out=out)
+        out += self.config.epsilon / n_actions
+        return out
 
     def get_state_distribution(self, agent: Agent, state: State) -> np.ndarray:
         n_actions = agent.config.n_actions
         distribution = np.full(n_actions, self.config.epsilon / n_actions)
 
-        max_q = np.max(agent.q[state])
-        best_actions = np.flatnonzero(agent.q[state] == max_q)
+        if agent.greedy is not None:
+            best_actions = agent.greedy.best[state]
+        else:
+            max_q = np.max(agent.q[state])
+            best_actions = np.flatnonzero(agent.q[state] == max_q)
         distribution[best_actions] += (1 - self.config.epsilon) / len(best_actions)
 
         return distribution
+
+    def get_rows_distribution(self, agent: Agent, states: NDArray) -> NDArray:
+        # same operations as get_distribution, on the requested rows only
+        q = np.asarray(agent.q[states])
+        best = q == q.max(axis=1, keepdims=True)
+        share = (1 - self.config.epsilon) / best.sum(axis=1, keepdims=True)
+        distribution = best * share
+        distribution += self.config.epsilon / agent.config.n_actions
+        return distribution
+
+    def get_expected_value(self, agent: Agent, state: State) -> float:
+        if agent.greedy is None:
+            return super().get_expected_value(agent, state)
+        # epsilon spreads uniformly over all actions, the rest goes to the maximum
+        epsilon = self.config.epsilon
+        return (
+            epsilon / agent.config.n_actions * agent.greedy.sums[state]
+            + (1 - epsilon) * agent.greedy.max_values[state]
+        )
+
+    def select_actions(self, agent: BatchedAgent, states: NDArray) -> NDArray:
+        # Per seed this draws random() and then integers(k), which is the exact stream
+        # consumed by select_action (choice(n) and choice(max_indices) reduce to integers(k)).
+        generators = agent.random_generators
+        n_actions = agent.config.n_actions
+        explore = generators.random() < self.config.epsilon
+
+        q_values = agent.q[np.arange(len(states)), states]
+        best = q_values == q_values.max(axis=1, keepdims=True)
+        n_choices = np.where(explore, n_actions, best.sum(axis=1))
+        picks = generators.integers(n_choices)
+        # pick the picks[i]-th tied action (in index order) for greedy seeds
+        greedy = np.argmax(np.cumsum(best, axis=1) > picks[:, None], axis=1)
+        return np.where(explore, picks, greedy)
+
+    def get_states_distribution(self, agent: BatchedAgent, states: NDArray) -> NDArray:
+        n_actions = agent.config.n_actions
+        q_values = agent.q[np.arange(len(states)), states]
+        best = q_values == q_values.max(axis=1, keepdims=True)
+        distribution = np.full(q_values.shape, self.config.epsilon / n_actions)
+        distribution += best * (
+            (1 - self.config.epsilon) / best.sum(axis=1, keepdims=True)
+        )
+        return distribution
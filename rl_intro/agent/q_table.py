@@ -0,0 +1,244 @@
+from rl_intro.agent.core import AgentConfig
+from rl_intro.environment.core import State
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional, Union
+from numpy.typing import NDArray, DTypeLike
+import numpy as np
+
+EMPTY = -1
+# Fibonacci hashing: multiply by 2**64 / golden ratio and keep the top bits
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+class SparseQTable:
+    """
+    Q table that only stores rows for visited states. Rows are handed out from a
+    preallocated slab on the first write to a state and found through an
+    open-addressing (linear probing) index from state to row. Reads of unvisited states
+    return the initial value without allocating.
+    Supports the indexing the agents and policies use: q[state], q[state, action],
+    q[state, :] and assignment to q[state, action]. np.asarray(q) gives the dense table.
+    """
+
+    def __init__(
+        self,
+        n_actions: int,
+        n_states: Optional[int] = None,
+        initial_value: float = 0.0,
+        dtype: DTypeLike = np.float64,
+        capacity: int = 1024,
+    ):
+        self.n_actions = n_actions
+        self.n_states = n_states
+        self.initial_value = initial_value
+        self.dtype = np.dtype(dtype)
+        self._initial_row = np.full(n_actions, initial_value, dtype=self.dtype)
+        self._initial_row.flags.writeable = False
+
+        self._slab = np.empty((max(capacity, 1), n_actions), dtype=self.dtype)
+        self._row_states = np.empty(max(capacity, 1), dtype=np.int64)
+        self.n_allocated = 0
+
+        self._bits = max(4, int(2 * max(capacity, 1) - 1).bit_length())
+        self._keys = np.full(1 << self._bits, EMPTY, dtype=np.int64)
+        self._rows = np.empty(1 << self._bits, dtype=np.int64)
+
+    def __str__(self):
+        return f"SparseQTable(n_actions={self.n_actions},n_allocated={self.n_allocated},capacity={len(self._slab)})"
+
+    def __len__(self) -> int:
+        return self.n_allocated
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        n_states = self.n_states
+        if n_states is None:
+            n_states = int(self.states.max()) + 1 if self.n_allocated else 0
+        return n_states, self.n_actions
+
+    @property
+    def states(self) -> NDArray:
+        """States with an allocated row, in allocation order."""
+        return self._row_states[: self.n_allocated]
+
+    @property
+    def rows(self) -> NDArray:
+        """Allocated rows, in the order of states."""
+        return self._slab[: self.n_allocated]
+
+    @classmethod
+    def from_rows(
+        cls,
+        states: NDArray,
+        rows: NDArray,
+        n_states: Optional[int] = None,
+        initial_value: float = 0.0,
+    ) -> "SparseQTable":
+        """Table holding the given rows of distinct states, e.g. to restore a checkpoint."""
+        states = np.asarray(states, dtype=np.int64)
+        assert len(np.unique(states)) == len(states), "States must be distinct."
+        table = cls(
+            rows.shape[1], n_states, initial_value, rows.dtype, capacity=len(states)
+        )
+        table._slab[: len(states)] = rows
+        table._row_states[: len(states)] = states
+        table.n_allocated = len(states)
+        table._rebuild_index()
+        return table
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self._slab.nbytes
+            + self._row_states.nbytes
+            + self._keys.nbytes
+            + self._rows.nbytes
+        )
+
+    def _slot(self, state: int) -> int:
+        """Slot holding state, or the empty slot where it would be inserted."""
+        keys = self._keys
+        mask = len(keys) - 1
+        slot = ((state * HASH_MULTIPLIER) & MASK64) >> (64 - self._bits)
+        while True:
+            key = keys[slot]
+            if key == state or key == EMPTY:
+                return slot
+            slot = (slot + 1) & mask
+
+    def find_row(self, state: State) -> int:
+        """Row index of the state, or -1 if it has not been visited."""
+        state = int(state)
+        slot = self._slot(state)
+        return int(self._rows[slot]) if self._keys[slot] == state else EMPTY
+
+    def allocate_row(self, state: State) -> int:
+        """Row index of the state, allocating an initialized row on the first visit."""
+        state = int(state)
+        assert state >= 0, "States must be non-negative integers."
+        slot = self._slot(state)
+        if self._keys[slot] == state:
+            return int(self._rows[slot])
+
+        row = self.n_allocated
+        if row == len(self._slab):
+            self._grow_slab()
+        self._slab[row] = self.initial_value
+        self._row_states[row] = state
+        self.n_allocated += 1
+        self._keys[slot] = state
+        self._rows[slot] = row
+        # keep the load factor at most 1/2 so probe sequences stay short
+        if 2 * self.n_allocated > len(self._keys):
+            self._grow_index()
+        return row
+
+    def _grow_slab(self) -> None:
+        capacity = 2 * len(self._slab)
+        slab = np.empty((capacity, self.n_actions), dtype=self.dtype)
+        slab[: self.n_allocated] = self._slab[: self.n_allocated]
+        row_states = np.empty(capacity, dtype=np.int64)
+        row_states[: self.n_allocated] = self.states
+        self._slab, self._row_states = slab, row_states
+
+    def _grow_index(self) -> None:
+        self._bits += 1
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        self._keys = np.full(1 << self._bits, EMPTY, dtype=np.int64)
+        self._rows = np.empty(1 << self._bits, dtype=np.int64)
+        for row, state in enumerate(self.states.tolist()):
+            slot = self._slot(state)
+            self._keys[slot] = state
+            self._rows[slot] = row
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, tuple):
+            state, action = key
+        else:
+            state, action = key, slice(None)
+        row = self.find_row(state)
+        if row == EMPTY:
+            return self._initial_row[action]
+        return self._slab[row, action]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if isinstance(key, tuple):
+            state, action = key
+        else:
+            state, action = key, slice(None)
+        # allocate first, as the slab may be replaced while growing
+        row = self.allocate_row(state)
+        self._slab[row, action] = value
+
+    def __array__(
+        self, dtype: DTypeLike = None, copy: Optional[bool] = None
+    ) -> NDArray:
+        n_states, n_actions = self.shape
+        dense = np.full((n_states, n_actions), self.initial_value, dtype=self.dtype)
+        inside = self.states < n_states
+        dense[self.states[inside]] = self._slab[: self.n_allocated][inside]
+        return dense if dtype is None else dense.astype(dtype)
+
+    def greedy_values(self) -> NDArray:
+        values = np.full(self.shape[0], self._initial_row.max(), dtype=self.dtype)
+        inside = self.states < len(values)
+        values[self.states[inside]] = self._slab[: self.n_allocated][inside].max(axis=1)
+        return values
+
+    def greedy_actions(self) -> NDArray:
+        # unvisited rows are constant, so argmax picks their first action
+        actions = np.zeros(self.shape[0], dtype=np.int64)
+        inside = self.states < len(actions)
+        actions[self.states[inside]] = self._slab[: self.n_allocated][inside].argmax(
+            axis=1
+        )
+        return actions
+
+
+QTable = Union[NDArray, SparseQTable]
+
+
+# table handed to the next make_q_table call instead of a new allocation
+_given_table: ContextVar[Optional[QTable]] = ContextVar("given_table", default=None)
+
+
+@contextmanager
+def given_q_table(q: QTable) -> Iterator[None]:
+    """
+    Makes agents constructed inside the context use q (e.g. a memory-mapped table)
+    instead of allocating their own, so loading a large table never holds two copies.
+    """
+    token = _given_table.set(q)
+    try:
+        yield
+    finally:
+        _given_table.reset(token)
+
+
+def make_q_table(config: AgentConfig) -> QTable:
+    """Creates the Q table selected by config.q_backend, filled with config.initial_value."""
+    given = _given_table.get()
+    if given is not None:
+        _given_table.set(None)  # only the first table of the agent is replaced
+        expected = (config.n_states, config.n_actions)
+        assert given.shape == expected, f"Q table shape {given.shape} != {expected}."
+        assert given.dtype == np.dtype(config.dtype), f"Q table dtype {given.dtype}."
+        return given
+    if config.q_backend == "dense":
+        return np.full(
+            (config.n_states, config.n_actions),
+            config.initial_value,
+            dtype=config.dtype,
+        )
+    if config.q_backend == "sparse":
+        return SparseQTable(
+            config.n_actions,
+            n_states=config.n_states,
+            initial_value=config.initial_value,
+            dtype=config.dtype,
+        )
+    raise ValueError(f"Unknown Q table backend {config.q_backend}.")
@@ -0,0 +1,110 @@
+from rl_intro.environment.core import Reward, Action, Terminal, State
+from typing import Optional, TYPE_CHECKING
+from numpy.typing import NDArray
+import numpy as np
+
+if TYPE_CHECKING:
+    from rl_intro.agent.core import AgentConfig
+
+
+def index_dtype(n: int) -> np.dtype:
+    """Smallest unsigned integer dtype that holds the indices 0..n-1."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+class ReplayBuffer:
+    """
+    Fixed-capacity ring of transitions in preallocated arrays with compact dtypes
+    (smallest index types for states and actions, float32 rewards). Once full, each
+    new transition overwrites the oldest one. Minibatches are drawn uniformly with
+    replacement in one vectorized call.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        n_states: int,
+        n_actions: int,
+        random_generator: np.random.Generator,
+    ):
+        assert capacity > 0, "capacity must be positive."
+        self.capacity = capacity
+        self.random_generator = random_generator
+        state_dtype, action_dtype = index_dtype(n_states), index_dtype(n_actions)
+        self.states = np.zeros(capacity, dtype=state_dtype)
+        self.actions = np.zeros(capacity, dtype=action_dtype)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=state_dtype)
+        self.terminals = np.zeros(capacity, dtype=bool)
+        self.position = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __repr__(self):
+        return f"ReplayBuffer(capacity={self.capacity},size={self.size})"
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.states.nbytes
+            + self.actions.nbytes
+            + self.rewards.nbytes
+            + self.next_states.nbytes
+            + self.terminals.nbytes
+        )
+
+    def add(
+        self,
+        state: State,
+        action: Action,
+        reward: Reward,
+        next_state: State,
+        terminal: Terminal,
+    ) -> None:
+        i = self.position
+        self.states[i] = state
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = next_state
+        self.terminals[i] = terminal
+        self.position = i + 1 if i + 1 < self.capacity else 0
+        if self.size < self.capacity:
+            self.size += 1
+
+    def sample(self, n: int) -> tuple[NDArray, NDArray, NDArray, NDArray, NDArray]:
+        """Draws n transitions as (states, actions, rewards, next_states, terminals)."""
+        assert self.size > 0, "Cannot sample from an empty replay buffer."
+        indices = self.random_generator.integers(self.size, size=n)
+        return (
+            self.states[indices],
+            self.actions[indices],
+            self.rewards[indices],
+            self.next_states[indices],
+            self.terminals[indices],
+        )
+
+    def clear(self) -> None:
+        self.position = 0
+        self.size = 0
+
+
+def make_replay_buffer(config: "AgentConfig") -> Optional[ReplayBuffer]:
+    """
+    Buffer for config.replay_batch_size > 0, sampling from its own stream so that
+    action selection draws the same numbers with and without replay.
+    """
+    if config.replay_batch_size <= 0:
+        return None
+    # replayed minibatches go through learn_batch, which works on dense tables only
+    assert config.q_backend == "dense", "Replay needs a dense Q table."
+    random_generator = np.random.default_rng(
+        np.random.SeedSequence(config.random_seed).spawn(1)[0]
+    )
+    return ReplayBuffer(
+        config.replay_capacity, config.n_states, config.n_actions, random_generator
+    )
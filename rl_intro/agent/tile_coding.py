@@ -0,0 +1,74 @@
+from numpy.typing import ArrayLike, NDArray
+from typing import Sequence
+import numpy as np
+
+# odd multipliers for the tiling index and the coordinates of a tile
+HASH_MULTIPLIERS = np.array(
+    [
+        0x9E3779B97F4A7C15,
+        0xC2B2AE3D27D4EB4F,
+        0x165667B19E3779F9,
+        0xD6E8FEB86659FD93,
+        0x27D4EB2F165667C5,
+        0x94D049BB133111EB,
+    ],
+    dtype=np.uint64,
+)
+MIX_MULTIPLIER = np.uint64(0xFF51AFD7ED558CCD)
+
+
+class TileCoder:
+    """
+    Hashed tile coding of observations in a box [low, high]. Each of n_tilings grids of
+    tiles_per_dim tiles per dimension is displaced by a fraction of a tile (asymmetric
+    offsets 1, 3, 5, ... per dimension), and the tile coordinates of every tiling are
+    hashed into a fixed table of memory_size indices, so memory is bounded however
+    large the observation space is. Observations outside the box keep getting tiles
+    of their own, they are not clipped.
+    """
+
+    def __init__(
+        self,
+        low: Sequence[float],
+        high: Sequence[float],
+        n_tilings: int = 8,
+        tiles_per_dim: int = 8,
+        memory_size: int = 4096,
+    ):
+        self.low = np.asarray(low, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        assert self.low.shape == self.high.shape and self.low.ndim == 1
+        assert (self.high > self.low).all(), "high must exceed low."
+        self.n_dims = len(self.low)
+        assert self.n_dims < len(HASH_MULTIPLIERS), "Too many dimensions to hash."
+        self.n_tilings = n_tilings
+        self.tiles_per_dim = tiles_per_dim
+        self.memory_size = memory_size
+
+        self.scale = tiles_per_dim / (self.high - self.low)
+        # (n_tilings, n_dims) displacements in units of a tile
+        self.offsets = (
+            np.arange(n_tilings)[:, None] * (2 * np.arange(self.n_dims) + 1) / n_tilings
+        ) % 1.0
+        self.tiling_keys = np.arange(n_tilings, dtype=np.uint64) * HASH_MULTIPLIERS[0]
+
+    def __repr__(self):
+        return f"TileCoder(n_dims={self.n_dims},n_tilings={self.n_tilings},tiles_per_dim={self.tiles_per_dim},memory_size={self.memory_size})"
+
+    def indices(self, observations: ArrayLike) -> NDArray:
+        """
+        Active feature indices, (n_tilings,) for one observation or (n, n_tilings)
+        for a batch of n observations.
+        """
+        observations = np.asarray(observations, dtype=np.float64)
+        scaled = (observations - self.low) * self.scale
+        # (..., n_tilings, n_dims) tile coordinates
+        coordinates = np.floor(scaled[..., None, :] + self.offsets).astype(np.int64)
+        keys = self.tiling_keys + (
+            coordinates.astype(np.uint64) * HASH_MULTIPLIERS[1 : self.n_dims + 1]
+        ).sum(axis=-1, dtype=np.uint64)
+        # finalizer of MurmurHash3, so nearby tiles land far apart in the table
+        keys ^= keys >> np.uint64(33)
+        keys *= MIX_MULTIPLIER
+        keys ^= keys >> np.uint64(33)
+        return (keys % np.uint64(self.memory_size)).astype(np.int64)
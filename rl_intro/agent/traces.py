@@ -0,0 +1,51 @@
+from rl_intro.agent.core import Agent, AgentConfig
+from rl_intro.environment.core import State, Action
+from dataclasses import dataclass
+from typing import Literal
+
+
+@dataclass
+class TraceAgentConfig(AgentConfig):
+    trace_decay: float = 0.9  # lambda
+    # "accumulating" adds 1 on every visit, "replacing" resets the trace to 1
+    trace_type: Literal["accumulating", "replacing"] = "accumulating"
+    # traces that decay below this are dropped from the active set
+    trace_threshold: float = 1e-3
+
+
+class EligibilityTraces:
+    """
+    Sparse set of active (state, action) traces. Only pairs with a trace of at least
+    threshold are kept, so an update costs time proportional to the recently visited
+    pairs instead of the size of the Q table.
+    """
+
+    def __init__(self, trace_type: str, threshold: float):
+        if trace_type not in ("accumulating", "replacing"):
+            raise ValueError(f"Invalid trace type: {trace_type}")
+        self.accumulating = trace_type == "accumulating"
+        self.threshold = threshold
+        self.traces: dict[tuple[State, Action], float] = {}
+
+    def __len__(self) -> int:
+        return len(self.traces)
+
+    def visit(self, state: State, action: Action) -> None:
+        key = (state, action)
+        if self.accumulating:
+            self.traces[key] = self.traces.get(key, 0.0) + 1.0
+        else:
+            self.traces[key] = 1.0
+
+    def update(self, agent: Agent, step: float, decay: float) -> None:
+        """Adds step * trace to every active Q value, then decays and prunes the traces."""
+        active = {}
+        for (state, action), trace in self.traces.items():
+            agent.update_q(state, action, step * trace)
+            trace *= decay
+            if trace >= self.threshold:
+                active[state, action] = trace
+        self.traces = active
+
+    def clear(self) -> None:
+        self.traces.clear()
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import Protocol
 from typing import Tuple, Optional
+from numpy.typing import NDArray
 
 Reward = float
 State = int
@@ -20,3 +21,19 @@ class Environment(Protocol):
     def reset(self) -> State: ...
     def step(self, action: Action) -> Tuple[State, Reward, Terminal]: ...
     def to_str(self) -> str: ...
+
+
+class VectorEnvironment(Protocol):
+    """
+    N environment instances stepped in lockstep with array-valued states, rewards and
+    terminals. A mask selects the instances that reset or step, the others keep their
+    state. simulation.batched runs batched agents on a VectorGridWorld this way.
+    """
+
+    states: NDArray
+    n_envs: int
+
+    def reset(self, mask: Optional[NDArray] = None) -> NDArray: ...
+    def step(
+        self, actions: NDArray, mask: Optional[NDArray] = None
+    ) -> Tuple[NDArray, NDArray, NDArray]: ...
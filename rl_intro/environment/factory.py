@@ -1,5 +1,5 @@
 from rl_intro.environment.core import Environment, EnvironmentConfig
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from typing import Type, List
 from rl_intro.utils.logger import logger
 from typing import Optional
@@ -16,9 +16,11 @@ class EnvironmentFactory:
     def create_environment(
         recipe: EnvironmentRecipe, seed_override: Optional[int] = None
     ) -> Environment:
+        # the recipe is shared between runs, so the override goes into a copy of the config
+        environment_config = recipe.environment_config
         if seed_override is not None:
-            recipe.environment_config.random_seed = seed_override
-        return recipe.environment_class(recipe.environment_config)
+            environment_config = replace(environment_config, random_seed=seed_override)
+        return recipe.environment_class(environment_config)
 
     @staticmethod
     def create_environments(recipes: List[EnvironmentRecipe]) -> List[Environment]:
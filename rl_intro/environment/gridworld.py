@@ -11,6 +11,7 @@ import numpy as np
 from enum import StrEnum, Enum
 from rl_intro.utils.logger import logger
 from rl_intro.utils.visualize import grid_str
+from rl_intro.utils.rng import make_generator
 
 
 class StateKind(Enum):
@@ -46,15 +47,20 @@ class GridWorldConfig(EnvironmentConfig):
     cliff_states: List[State]
     wall_states: List[State]
     reward_function: Callable[[State, StateKind], Reward] = default_reward_function
+    compiled: bool = True  # precompute transition, reward and terminal tables
+    rng_block_size: Optional[int] = None  # see BufferedGenerator
 
 
 class GridWorld:
     def __init__(self, config: GridWorldConfig):
         self.config = config
-        self.random_generator = np.random.default_rng(config.random_seed)
+        self.random_generator = make_generator(
+            config.random_seed, config.rng_block_size
+        )
         self.reward_function = config.reward_function
         self.state = self.reset()
         self.grid = self._setup_grid()
+        self._compile_tables()
 
     def __str__(self):
         return f"GridWorld(w={self.config.width},h={self.config.height},s={self.config.start_states},t={self.config.terminal_states},c={self.config.cliff_states},w={self.config.wall_states})"
@@ -82,6 +88,8 @@ class GridWorld:
 
     @property
     def terminal(self) -> Terminal:
+        if self.config.compiled:
+            return self._terminal_list[self.state]
         return self.grid[self.get_position(self.state)] in [
             StateKind.TERMINAL.value,
             StateKind.CLIFF.value,
@@ -110,12 +118,56 @@ class GridWorld:
             return StateKind.EMPTY
 
     def _setup_grid(self):
-        self.grid = np.zeros((self.config.height, self.config.width), dtype=int)
-        for s in range(self.config.width * self.config.height):
-            kind = self.get_kind(s)
-            self.grid[self.get_position(s)] = kind.value
+        n_states = self.config.width * self.config.height
+        kinds = np.full(n_states, StateKind.EMPTY.value, dtype=int)
+        # assign in reverse order of get_kind's precedence so earlier kinds win
+        for states, kind in [
+            (self.config.wall_states, StateKind.WALL),
+            (self.config.cliff_states, StateKind.CLIFF),
+            (self.config.terminal_states, StateKind.TERMINAL),
+            (self.config.start_states, StateKind.START),
+        ]:
+            states = np.asarray(states, dtype=int)
+            # states off the grid are ignored, as when each cell asked get_kind
+            states = states[(states >= 0) & (states < n_states)]
+            kinds[states] = kind.value
+        self.grid = kinds.reshape((self.config.height, self.config.width))
         return self.grid
 
+    def _compile_tables(self) -> None:
+        """
+        Builds next_state_table[S, A], reward_table[S] and terminal_table[S] so that a
+        compiled step is a handful of table lookups. Rows of terminal states still hold
+        the regular moves; stepping out of a terminal state resets to a start state.
+        """
+        kinds = self.grid.flatten()
+        states = np.arange(kinds.size)
+        rows, cols = states // self.width, states % self.width
+
+        moves = {
+            Act.UP.value: (np.maximum(0, rows - 1), cols),
+            Act.DOWN.value: (np.minimum(self.height - 1, rows + 1), cols),
+            Act.LEFT.value: (rows, np.maximum(0, cols - 1)),
+            Act.RIGHT.value: (rows, np.minimum(self.width - 1, cols + 1)),
+        }
+        self.next_state_table = np.empty((kinds.size, len(moves)), dtype=np.int64)
+        for action, (new_rows, new_cols) in moves.items():
+            next_states = new_rows * self.width + new_cols
+            blocked = kinds[next_states] == StateKind.WALL.value
+            self.next_state_table[:, action] = np.where(blocked, states, next_states)
+
+        rewards = [self.reward_function(State(s), kinds[s]) for s in states.tolist()]
+        self.reward_table = np.array(rewards, dtype=float)
+        self.terminal_table = (kinds == StateKind.TERMINAL.value) | (
+            kinds == StateKind.CLIFF.value
+        )
+
+        # python lists are faster than numpy scalar indexing on the per-step path
+        self._next_state_list = self.next_state_table.tolist()
+        self._reward_list = rewards
+        self._terminal_list = self.terminal_table.tolist()
+        self._n_actions = len(moves)
+
     def _select_start_state(self) -> State:
         assert self.config.start_states, "No start states defined in the configuration."
         return State(self.random_generator.choice(self.config.start_states))
@@ -125,6 +177,15 @@ class GridWorld:
         return self.state
 
     def step(self, action: Action) -> Tuple[State, Reward, Terminal]:
+        if self.config.compiled:
+            if self._terminal_list[self.state]:
+                self.state = self._select_start_state()
+            elif 0 <= action < self._n_actions:
+                self.state = self._next_state_list[self.state][action]
+            else:
+                raise ValueError(f"Invalid action: {action}")
+            state = self.state
+            return state, self._reward_list[state], self._terminal_list[state]
         self.state = self._get_next_state(action)
         reward = self.reward_function(self.state, self.state_kind)
         return self.state, reward, self.terminal
@@ -0,0 +1,200 @@
+from rl_intro.environment.core import Reward, Action, Terminal, EnvironmentConfig
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+from numpy.typing import NDArray
+import numpy as np
+from rl_intro.utils.logger import logger
+from rl_intro.utils.rng import make_generator
+
+MIN_POSITION, MAX_POSITION = -1.2, 0.5
+MAX_VELOCITY = 0.07
+GOAL_POSITION = 0.5
+# observation box, e.g. for a TileCoder
+LOW = (MIN_POSITION, -MAX_VELOCITY)
+HIGH = (MAX_POSITION, MAX_VELOCITY)
+
+
+@dataclass
+class MountainCarConfig(EnvironmentConfig):
+    force: float = 0.001
+    gravity: float = 0.0025
+    # logs record the cell of a log_bins x log_bins grid over (position, velocity)
+    log_bins: int = 20
+    rng_block_size: Optional[int] = None  # see BufferedGenerator
+
+
+class MountainCar:
+    """
+    Mountain car (Sutton & Barto, example 10.1): an underpowered car in a valley has to
+    rock back and forth to reach the goal at position 0.5. The state is the array
+    [position, velocity], actions are 0 (reverse), 1 (coast) and 2 (forward), and every
+    step costs -1. Episodes start at rest at a uniform position in [-0.6, -0.4).
+    """
+
+    def __init__(self, config: MountainCarConfig):
+        self.config = config
+        self.random_generator = make_generator(
+            config.random_seed, config.rng_block_size
+        )
+        self.position = 0.0
+        self.velocity = 0.0
+        self.state = self.reset()
+
+    def __str__(self):
+        return f"MountainCar(force={self.config.force},gravity={self.config.gravity})"
+
+    def to_str(self) -> str:
+        return f"{self}: position={self.position:.3f}, velocity={self.velocity:.4f}"
+
+    @property
+    def action_space(self) -> List[Action]:
+        return [0, 1, 2]
+
+    @property
+    def n_state_indices(self) -> int:
+        return self.config.log_bins**2
+
+    @property
+    def terminal(self) -> Terminal:
+        return self.position >= GOAL_POSITION
+
+    def state_index(self, state: NDArray) -> int:
+        """Grid cell of a state, which the experiment logs in place of the array."""
+        return int(state_indices(np.asarray(state)[None], self.config.log_bins)[0])
+
+    def reset(self) -> NDArray:
+        self.position = -0.6 + 0.2 * self.random_generator.random()
+        self.velocity = 0.0
+        self.state = np.array([self.position, self.velocity])
+        return self.state
+
+    def step(self, action: Action) -> Tuple[NDArray, Reward, Terminal]:
+        if self.terminal:
+            return self.reset(), -1.0, False
+        if action not in (0, 1, 2):
+            raise ValueError(f"Invalid action: {action}")
+        velocity = (
+            self.velocity
+            + (action - 1) * self.config.force
+            - self.config.gravity * float(slopes(np.array([self.position]))[0])
+        )
+        velocity = min(max(velocity, -MAX_VELOCITY), MAX_VELOCITY)
+        position = min(max(self.position + velocity, MIN_POSITION), MAX_POSITION)
+        if position == MIN_POSITION:
+            velocity = 0.0
+        self.position, self.velocity = position, velocity
+        self.state = np.array([position, velocity])
+        return self.state, -1.0, self.terminal
+
+
+def slopes(positions: NDArray) -> NDArray:
+    """
+    cos(3 x), the slope term of the dynamics. MountainCar evaluates it on a one-element
+    array, so both environments go through the same numpy loop; math.cos (libm) may
+    differ from numpy's vectorized cos in the last bit on some CPUs and builds.
+    """
+    return np.cos(3 * positions)
+
+
+def state_indices(states: NDArray, log_bins: int) -> NDArray:
+    """Row-major cells of (n, 2) states on a log_bins x log_bins grid."""
+    fractions = (states - np.array(LOW)) / (np.array(HIGH) - np.array(LOW))
+    cells = np.clip((fractions * log_bins).astype(np.int64), 0, log_bins - 1)
+    return cells[:, 0] * log_bins + cells[:, 1]
+
+
+class VectorMountainCar:
+    """
+    Steps n_envs MountainCar instances in lockstep with NumPy dynamics. Instance i
+    behaves exactly like MountainCar(config) seeded with seeds[i]: the update formulas
+    are the same, and stepping out of the goal resets from that instance's generator.
+    """
+
+    def __init__(
+        self,
+        config: MountainCarConfig,
+        n_envs: int = 1,
+        seeds: Optional[Sequence[Optional[int]]] = None,
+    ):
+        self.config = config
+        self.n_envs = n_envs
+        assert n_envs > 0, "VectorMountainCar needs at least one instance."
+        if seeds is None:
+            children = np.random.SeedSequence(config.random_seed).spawn(n_envs)
+            seeds = [int(c.generate_state(1)[0]) for c in children]
+        if len(seeds) != n_envs:
+            raise ValueError(f"Expected {n_envs} seeds, got {len(seeds)}.")
+        self.seeds = list(seeds)
+        self.random_generators = [
+            make_generator(seed, config.rng_block_size) for seed in self.seeds
+        ]
+        self.states = np.zeros((n_envs, 2))
+        self.states = self.reset()
+
+        logger.debug(self.__str__() + " initialized.")
+
+    def __str__(self):
+        return f"VectorMountainCar(force={self.config.force},gravity={self.config.gravity},n_envs={self.n_envs})"
+
+    @property
+    def action_space(self) -> List[Action]:
+        return [0, 1, 2]
+
+    @property
+    def terminals(self) -> NDArray:
+        return self.states[:, 0] >= GOAL_POSITION
+
+    def reset(self, mask: Optional[NDArray] = None) -> NDArray:
+        """Draws new start states for all instances, or only the ones selected by mask."""
+        indices = (
+            np.arange(self.n_envs)
+            if mask is None
+            else np.flatnonzero(np.asarray(mask, dtype=bool))
+        )
+        for i in indices.tolist():
+            self.states[i] = (-0.6 + 0.2 * self.random_generators[i].random(), 0.0)
+        return self.states.copy()
+
+    def step(
+        self, actions: NDArray, mask: Optional[NDArray] = None
+    ) -> Tuple[NDArray, NDArray, NDArray]:
+        """
+        Advances all instances, or only the ones selected by mask (the others keep their
+        state and report a reward of 0).
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.n_envs,):
+            raise ValueError(
+                f"Expected {self.n_envs} actions, got shape {actions.shape}."
+            )
+        active = (
+            np.ones(self.n_envs, dtype=bool)
+            if mask is None
+            else np.asarray(mask, dtype=bool)
+        )
+        if np.any(active & ((actions < 0) | (actions > 2))):
+            raise ValueError(f"Invalid actions: {actions}")
+        finished = active & self.terminals
+        moving = active & ~finished
+
+        positions, velocities = self.states[:, 0], self.states[:, 1]
+        new_velocities = (
+            velocities
+            + (actions - 1) * self.config.force
+            - self.config.gravity * slopes(positions)
+        )
+        new_velocities = np.clip(new_velocities, -MAX_VELOCITY, MAX_VELOCITY)
+        new_positions = np.clip(positions + new_velocities, MIN_POSITION, MAX_POSITION)
+        new_velocities[new_positions == MIN_POSITION] = 0.0
+        self.states = np.where(
+            moving[:, None],
+            np.stack([new_positions, new_velocities], axis=1),
+            self.states,
+        )
+        if finished.any():
+            self.reset(finished)
+        return (
+            self.states.copy(),
+            np.where(active, -1.0, 0.0),
+            active & self.terminals,
+        )
@@ -0,0 +1,147 @@
+from rl_intro.environment.core import Action
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from dataclasses import replace
+from typing import List, Optional, Sequence, Tuple
+from numpy.typing import NDArray
+import numpy as np
+from rl_intro.utils.logger import logger
+from rl_intro.utils.rng import make_generator
+
+
+class VectorGridWorld:
+    """
+    Steps n_envs GridWorld instances in lockstep on the compiled GridWorld tables.
+    Instance i behaves exactly like GridWorld(configs[i]) seeded with seeds[i]: stepping
+    out of a terminal state draws a new start state from that instance's own generator.
+    """
+
+    def __init__(
+        self,
+        configs: GridWorldConfig | Sequence[GridWorldConfig],
+        n_envs: Optional[int] = None,
+        seeds: Optional[Sequence[Optional[int]]] = None,
+    ):
+        if isinstance(configs, GridWorldConfig):
+            n_envs = n_envs if n_envs is not None else 1
+            configs = [configs] * n_envs
+            if seeds is None:
+                children = np.random.SeedSequence(configs[0].random_seed).spawn(n_envs)
+                seeds = [int(c.generate_state(1)[0]) for c in children]
+        self.configs = list(configs)
+        self.n_envs = len(self.configs)
+        assert self.n_envs > 0, "VectorGridWorld needs at least one instance."
+        if seeds is None:
+            seeds = [config.random_seed for config in self.configs]
+        if len(seeds) != self.n_envs:
+            raise ValueError(f"Expected {self.n_envs} seeds, got {len(seeds)}.")
+        self.seeds = list(seeds)
+
+        shape = (self.configs[0].width, self.configs[0].height)
+        if any((c.width, c.height) != shape for c in self.configs):
+            raise ValueError("All configurations must have the same width and height.")
+
+        # instances sharing a configuration object share one set of tables
+        layouts: dict[int, int] = {}
+        worlds: List[GridWorld] = []
+        for config in self.configs:
+            if id(config) not in layouts:
+                layouts[id(config)] = len(worlds)
+                worlds.append(GridWorld(replace(config, compiled=True)))
+        self.layout = np.array([layouts[id(c)] for c in self.configs], dtype=np.int64)
+        self.grid = np.stack([w.grid for w in worlds])
+        self.next_state_table = np.stack([w.next_state_table for w in worlds])
+        self.reward_table = np.stack([w.reward_table for w in worlds])
+        self.terminal_table = np.stack([w.terminal_table for w in worlds])
+
+        self.random_generators = [
+            make_generator(seed, config.rng_block_size)
+            for seed, config in zip(self.seeds, self.configs)
+        ]
+        self.states = np.zeros(self.n_envs, dtype=np.int64)
+        self.states = self.reset()
+
+        logger.debug(self.__str__() + " initialized.")
+
+    def __str__(self):
+        return f"VectorGridWorld(w={self.width},h={self.height},n_envs={self.n_envs},n_layouts={len(self.grid)})"
+
+    @property
+    def width(self) -> int:
+        return self.configs[0].width
+
+    @property
+    def height(self) -> int:
+        return self.configs[0].height
+
+    @property
+    def state_space(self) -> List[int]:
+        return list(range(self.width * self.height))
+
+    @property
+    def action_space(self) -> List[Action]:
+        return list(range(self.next_state_table.shape[2]))
+
+    @property
+    def terminals(self) -> NDArray:
+        return self.terminal_table[self.layout, self.states]
+
+    def _select_start_states(self, indices: NDArray) -> NDArray:
+        start_states = np.empty(len(indices), dtype=np.int64)
+        for j, i in enumerate(indices.tolist()):
+            candidates = self.configs[i].start_states
+            assert candidates, "No start states defined in the configuration."
+            # a single candidate never consumes randomness, so the draw can be skipped
+            if len(candidates) == 1:
+                start_states[j] = candidates[0]
+            else:
+                start_states[j] = self.random_generators[i].choice(candidates)
+        return start_states
+
+    def reset(self, mask: Optional[NDArray] = None) -> NDArray:
+        """Draws new start states for all instances, or only the ones selected by mask."""
+        indices = (
+            np.arange(self.n_envs)
+            if mask is None
+            else np.flatnonzero(np.asarray(mask, dtype=bool))
+        )
+        self.states[indices] = self._select_start_states(indices)
+        return self.states.copy()
+
+    def step(
+        self, actions: NDArray, mask: Optional[NDArray] = None
+    ) -> Tuple[NDArray, NDArray, NDArray]:
+        """
+        Advances all instances, or only the ones selected by mask (the others keep their
+        state and report its reward and terminal flag).
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.shape != (self.n_envs,):
+            raise ValueError(
+                f"Expected {self.n_envs} actions, got shape {actions.shape}."
+            )
+        active = (
+            np.ones(self.n_envs, dtype=bool)
+            if mask is None
+            else np.asarray(mask, dtype=bool)
+        )
+        if np.any(
+            active & ((actions < 0) | (actions >= self.next_state_table.shape[2]))
+        ):
+            raise ValueError(f"Invalid actions: {actions}")
+        finished = active & self.terminal_table[self.layout, self.states]
+        next_states = np.where(
+            active,
+            self.next_state_table[
+                self.layout, self.states, np.where(active, actions, 0)
+            ],
+            self.states,
+        )
+        if finished.any():
+            indices = np.flatnonzero(finished)
+            next_states[indices] = self._select_start_states(indices)
+        self.states = next_states
+        return (
+            next_states.copy(),
+            self.reward_table[self.layout, next_states],
+            self.terminal_table[self.layout, next_states],
+        )
@@ -1,7 +1,7 @@
 import pandas as pd
 import numpy as np
 from rl_intro.simulation.experiment import ExperimentLog
-from rl_intro.evaluation.parse import to_dataframe
+from rl_intro.simulation.log import StepLogColumns, EpisodeLog
 from dataclasses import dataclass
 
 
@@ -42,6 +42,44 @@ def gen_state_visit_frequency_matrix(
     return visit_matrix
 
 
+def calc_cumulative_reward_columns(steps: StepLogColumns) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "global_step": np.arange(len(steps)),
+            "cumulative_reward": np.cumsum(steps.reward, dtype=np.float64),
+        }
+    )
+
+
+def calc_episodic_rewards_columns(steps: StepLogColumns) -> pd.DataFrame:
+    episodes, inverse = np.unique(steps.episode, return_inverse=True)
+    rewards = np.bincount(inverse, weights=steps.reward, minlength=len(episodes))
+    return pd.DataFrame({"episode": episodes, "reward": rewards})
+
+
+def gen_state_visit_frequency_matrix_columns(
+    steps: StepLogColumns, n_rows: int, n_cols: int
+) -> np.ndarray:
+    visits = np.bincount(steps.state, minlength=n_rows * n_cols)
+    return visits[: n_rows * n_cols].reshape((n_rows, n_cols))
+
+
+def calc_cumulative_reward_episodes(episodes: EpisodeLog) -> pd.DataFrame:
+    """Cumulative reward at episode ends, on the global step index of the step log."""
+    return pd.DataFrame(
+        {
+            "global_step": np.cumsum(episodes.lengths + 1) - 1,
+            "cumulative_reward": np.cumsum(episodes.returns),
+        }
+    )
+
+
+def calc_episodic_rewards_episodes(episodes: EpisodeLog) -> pd.DataFrame:
+    return pd.DataFrame(
+        {"episode": np.arange(1, len(episodes.returns) + 1), "reward": episodes.returns}
+    )
+
+
 def gen_final_values_matrix(
     final_values: list[float], n_rows: int, n_cols: int
 ) -> np.ndarray:
@@ -76,12 +114,25 @@ def group_by_agent(experiments: list[ExperimentLog]) -> dict[str, list[Experimen
 def analyze_experiment(
     experiment_log: ExperimentLog, n_rows: int, n_cols: int
 ) -> AnalysisResult:
-    df = to_dataframe(experiment_log)
+    """
+    Works on full step logs as well as on the episode summaries of the lighter log
+    levels (where the cumulative reward is only sampled at episode ends).
+    """
+    steps = experiment_log.steps
+    episodes = experiment_log.episodes
+    if episodes is not None:
+        cumulative_reward = calc_cumulative_reward_episodes(episodes)
+        episodic_rewards = calc_episodic_rewards_episodes(episodes)
+        visit_matrix = episodes.visits[: n_rows * n_cols].reshape((n_rows, n_cols))
+    else:
+        cumulative_reward = calc_cumulative_reward_columns(steps)
+        episodic_rewards = calc_episodic_rewards_columns(steps)
+        visit_matrix = gen_state_visit_frequency_matrix_columns(steps, n_rows, n_cols)
     return AnalysisResult(
         agent=experiment_log.agent,
-        cumulative_reward=calc_cumulative_reward(df),
-        episodic_rewards=calc_episodic_rewards(df),
-        visit_matrix=gen_state_visit_frequency_matrix(df, n_rows, n_cols),
+        cumulative_reward=cumulative_reward,
+        episodic_rewards=episodic_rewards,
+        visit_matrix=visit_matrix,
         final_values=(
             gen_final_values_matrix(experiment_log.final_values, n_rows, n_cols)
             if experiment_log.final_values
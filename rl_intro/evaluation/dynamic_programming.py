@@ -0,0 +1,247 @@
+import numpy as np
+from numpy.typing import NDArray
+from dataclasses import dataclass
+from typing import Literal
+from rl_intro.environment.gridworld import GridWorld, StateKind
+from rl_intro.utils.logger import logger
+
+# policy_evaluation solves larger systems iteratively on the sparse transitions
+DENSE_SOLVE_LIMIT = 500
+
+
+@dataclass
+class DPSolution:
+    values: NDArray  # V[S], 0 in terminal states, nan where unsolvable
+    q: NDArray  # Q[S, A], same conventions as values
+    policy: NDArray  # greedy action per state
+    n_iterations: int
+
+
+def _model(env: GridWorld) -> tuple[NDArray, NDArray, NDArray]:
+    """
+    Per (state, action) successor, reward and continuation mask from the compiled
+    tables. The reward is that of the entered state and terminal states are absorbing,
+    so their successors contribute no future value.
+    """
+    next_states = env.next_state_table
+    rewards = env.reward_table[next_states]
+    continues = ~env.terminal_table[next_states]
+    return next_states, rewards, continues
+
+
+def steps_to_terminal(env: GridWorld) -> NDArray:
+    """Fewest steps from every state to a terminal state, inf where none is reachable."""
+    next_states = env.next_state_table
+    distances = np.where(env.terminal_table, 0.0, np.inf)
+    while True:
+        new_distances = np.where(
+            env.terminal_table, 0.0, 1.0 + distances[next_states].min(axis=1)
+        )
+        if np.array_equal(new_distances, distances):
+            return distances
+        distances = new_distances
+
+
+def solvable_states(env: GridWorld, discount: float) -> NDArray:
+    """
+    States with a finite value: all but walls, which are never entered, and with
+    discount 1 also the states that cannot reach a terminal state. Moves between
+    open cells are reversible, so no solvable state has an unsolvable successor.
+    """
+    solvable = env.grid.flatten() != StateKind.WALL.value
+    if discount >= 1.0:
+        solvable &= np.isfinite(steps_to_terminal(env))
+    return solvable
+
+
+def bellman_q(env: GridWorld, values: NDArray, discount: float) -> NDArray:
+    """One-step lookahead Q[S, A] for all pairs at once."""
+    next_states, rewards, continues = _model(env)
+    q = rewards + discount * np.where(continues, values[next_states], 0.0)
+    q[env.terminal_table] = 0.0
+    return q
+
+
+def value_iteration(
+    env: GridWorld,
+    discount: float = 1.0,
+    tolerance: float = 1e-8,
+    max_iterations: int = 10_000,
+) -> DPSolution:
+    """Synchronous value iteration until the largest value change is below tolerance."""
+    solvable = solvable_states(env, discount)
+    values = np.where(solvable, 0.0, np.nan)
+    for iteration in range(1, max_iterations + 1):
+        q = bellman_q(env, values, discount)
+        q[~solvable] = np.nan
+        new_values = q.max(axis=1)
+        delta = np.max(np.abs(new_values - values)[solvable], initial=0.0)
+        values = new_values
+        if delta < tolerance:
+            break
+    else:
+        logger.warning(f"Value iteration did not converge, last delta {delta}.")
+    return DPSolution(values, q, np.where(solvable, q.argmax(axis=1), 0), iteration)
+
+
+def policy_transitions(
+    env: GridWorld, distribution: NDArray
+) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+    """
+    Transition matrix P[S, S] restricted to non-terminal successors, as (rows, cols,
+    probabilities) coordinates, and the expected reward r[S] under a (S, A) action
+    distribution. Rows of terminal states are empty.
+    """
+    next_states, rewards, continues = _model(env)
+    distribution = np.where(env.terminal_table[:, None], 0.0, distribution)
+    expected_rewards = (distribution * rewards).sum(axis=1)
+    mask = continues & (distribution > 0)
+    rows = np.broadcast_to(np.arange(len(mask))[:, None], mask.shape)[mask]
+    return rows, next_states[mask], distribution[mask], expected_rewards
+
+
+def sparse_solve(
+    rows: NDArray,
+    cols: NDArray,
+    probabilities: NDArray,
+    rewards: NDArray,
+    discount: float,
+    tolerance: float = 1e-12,
+    max_iterations: int = 10_000,
+) -> NDArray | None:
+    """
+    Solves (I - discount P) x = rewards with BiCGSTAB, P given by its non-zero entries
+    P[rows, cols] = probabilities. Only needs O(nnz) products with P per iteration.
+    Returns None if the relative residual does not reach tolerance.
+    """
+    n = len(rewards)
+
+    def product(x: NDArray) -> NDArray:
+        return x - discount * np.bincount(
+            rows, weights=probabilities * x[cols], minlength=n
+        )
+
+    b = np.asarray(rewards, dtype=np.float64)
+    target = tolerance * max(np.linalg.norm(b), 1e-300)
+    x = np.zeros(n)
+    r = b.copy()
+    if np.linalg.norm(r) <= target:
+        return x
+    r_hat = r.copy()
+    rho = alpha = omega = 1.0
+    v = p = np.zeros(n)
+    for _ in range(max_iterations):
+        rho_new = r_hat @ r
+        if rho_new == 0.0 or omega == 0.0:
+            return None  # breakdown
+        p = r + (rho_new / rho) * (alpha / omega) * (p - omega * v)
+        v = product(p)
+        alpha = rho_new / (r_hat @ v)
+        s = r - alpha * v
+        if np.linalg.norm(s) <= target:
+            return x + alpha * p
+        t = product(s)
+        omega = (t @ s) / (t @ t)
+        x = x + alpha * p + omega * s
+        r = s - omega * t
+        if np.linalg.norm(r) <= target:
+            return x
+        rho = rho_new
+    return None
+
+
+def policy_evaluation(
+    env: GridWorld,
+    distribution: NDArray,
+    discount: float = 1.0,
+    method: Literal["auto", "dense", "sparse"] = "auto",
+) -> NDArray:
+    """
+    Exact V of a stochastic policy, e.g. Policy.get_distribution(agent), or of a
+    deterministic one given as an action per state, by solving (I - discount P) V = r
+    over the solvable states (nan elsewhere). "dense" uses a direct solve, "sparse"
+    the iterative sparse_solve, and "auto" the latter above DENSE_SOLVE_LIMIT states.
+    With discount 1 the policy must reach a terminal state from every solvable state,
+    otherwise the system is singular.
+    """
+    n_states, n_actions = env.next_state_table.shape
+    distribution = np.asarray(distribution)
+    if distribution.ndim == 1:
+        distribution = np.eye(n_actions)[distribution]
+    assert distribution.shape == (n_states, n_actions), "Distribution must be (S, A)."
+    solvable = solvable_states(env, discount)
+    rows, cols, probabilities, rewards = policy_transitions(env, distribution)
+    # renumber the solvable states, no solvable state leads out of them
+    index = np.cumsum(solvable) - 1
+    keep = solvable[rows]
+    rows, cols, probabilities = (
+        index[rows[keep]],
+        index[cols[keep]],
+        probabilities[keep],
+    )
+    rewards = rewards[solvable]
+    n = len(rewards)
+    solution = None
+    if method == "sparse" or (method == "auto" and n > DENSE_SOLVE_LIMIT):
+        solution = sparse_solve(rows, cols, probabilities, rewards, discount)
+        if solution is None:
+            logger.warning(
+                "Sparse policy evaluation did not converge, solving densely."
+            )
+    if solution is None:
+        system = np.eye(n)
+        np.add.at(system, (rows, cols), -discount * probabilities)
+        solution = np.linalg.solve(system, rewards)
+    values = np.full(n_states, np.nan)
+    values[solvable] = solution
+    return values
+
+
+def policy_iteration(
+    env: GridWorld,
+    discount: float = 1.0,
+    initial_policy: NDArray | None = None,
+    max_iterations: int = 1_000,
+) -> DPSolution:
+    """
+    Alternates exact evaluation and greedy improvement until the policy is stable. The
+    current action is kept whenever it is still among the best, so ties cannot cycle.
+    The default initial policy follows the fewest steps to a terminal state, so it is
+    proper even with discount 1.
+    """
+    n_states = env.next_state_table.shape[0]
+    if initial_policy is None:
+        distances = steps_to_terminal(env)
+        policy = distances[env.next_state_table].argmin(axis=1)
+    else:
+        policy = np.asarray(initial_policy, dtype=np.int64)
+    solvable = solvable_states(env, discount)
+    for iteration in range(1, max_iterations + 1):
+        values = policy_evaluation(env, policy, discount)
+        q = bellman_q(env, values, discount)
+        q[~solvable] = np.nan
+        best = q.max(axis=1)
+        current = q[np.arange(n_states), policy]
+        keep = ~solvable | (current >= best - 1e-12 * np.abs(best))
+        new_policy = np.where(keep, policy, q.argmax(axis=1))
+        if np.array_equal(new_policy, policy):
+            break
+        policy = new_policy
+    else:
+        logger.warning("Policy iteration did not converge.")
+    return DPSolution(values, q, policy, iteration)
+
+
+def value_error(values: NDArray, optimal: NDArray) -> float:
+    """Largest absolute difference to the optimal values over the solvable states."""
+    difference = np.abs(np.asarray(values, dtype=np.float64) - optimal)
+    return float(np.max(difference[~np.isnan(optimal)]))
+
+
+def regret(
+    env: GridWorld, distribution: NDArray, optimal: NDArray, discount: float = 1.0
+) -> float:
+    """Expected loss in return from a start state of following the policy."""
+    values = policy_evaluation(env, distribution, discount)
+    starts = np.asarray(env.config.start_states)
+    return float(np.mean(optimal[starts] - values[starts]))
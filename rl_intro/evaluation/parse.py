@@ -1,36 +1,69 @@
-from rl_intro.simulation.experiment import ExperimentLog, StepLog, ExperimentConfig
+from rl_intro.simulation.experiment import ExperimentLog, ExperimentConfig
+from rl_intro.simulation.log import StepLogColumns, EpisodeLog
 from rl_intro.utils.logger import logger
+from dataclasses import asdict
 import json
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import re
 
 
 def to_dataframe(experiment_log: ExperimentLog) -> pd.DataFrame:
-    rows = []
-    for i, step in enumerate(experiment_log.steps):
-        row = {
-            "agent": experiment_log.agent,
-            "env": experiment_log.env,
-            "episode": step.episode,
-            "step": step.step,
-            "action": step.action,
-            "state": step.state,
-            "reward": step.reward,
-            "terminal": step.terminal,
-            "global_step": i,
-        }
-        rows.append(row)
-    return pd.DataFrame(rows)
+    """Wraps the step columns in a DataFrame without copying them."""
+    steps = experiment_log.steps
+    columns = {
+        "agent": experiment_log.agent,
+        "env": experiment_log.env,
+        **steps.columns(),
+        "global_step": np.arange(len(steps)),
+    }
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(steps)), copy=False)
 
 
 def to_dataframe_batch(experiment_logs: list[ExperimentLog]) -> list[pd.DataFrame]:
     return [to_dataframe(log) for log in experiment_logs]
 
 
+def _experiment_log_metadata(experiment_log: ExperimentLog) -> dict:
+    return {
+        "id": experiment_log.id,
+        "agent": experiment_log.agent,
+        "env": experiment_log.env,
+        "experiment_config": asdict(experiment_log.experiment_config),
+        "final_values": experiment_log.final_values,
+        "seed": experiment_log.seed,
+        "episodes": (
+            experiment_log.episodes.to_data()
+            if experiment_log.episodes is not None
+            else None
+        ),
+    }
+
+
+def experiment_log_to_data(experiment_log: ExperimentLog) -> dict:
+    """Inverse of parse_experiment_data, producing plain JSON-serializable data."""
+    return {
+        **_experiment_log_metadata(experiment_log),
+        "steps": experiment_log.steps.to_records(),
+    }
+
+
+def save_experiment_json(experiment_log: ExperimentLog, json_file: Path) -> None:
+    with open(json_file, "w") as f:
+        json.dump(experiment_log_to_data(experiment_log), f)
+
+
+def save_experiment_batch_json(
+    experiment_logs: list[ExperimentLog], json_file: Path
+) -> None:
+    with open(json_file, "w") as f:
+        json.dump([experiment_log_to_data(log) for log in experiment_logs], f)
+
+
 def parse_experiment_data(data: dict) -> ExperimentLog:
     # TODO: maybe use a lib for parsing dataclasses recursively
-    logs = [StepLog(**step) for step in data["steps"]]
+    logs = StepLogColumns.from_records(data["steps"])
     exp_config = ExperimentConfig(**data["experiment_config"])
     return ExperimentLog(
         id=data["id"],
@@ -40,6 +73,9 @@ def parse_experiment_data(data: dict) -> ExperimentLog:
         steps=logs,
         final_values=data.get("final_values"),
         seed=data.get("seed"),
+        episodes=(
+            EpisodeLog.from_data(data["episodes"]) if data.get("episodes") else None
+        ),
     )
 
 
@@ -55,6 +91,104 @@ def parse_experiment_batch_json(json_file: Path) -> list[ExperimentLog]:
     return [parse_experiment_data(exp) for exp in data]
 
 
+BINARY_MAGIC = b"RLLOG001"
+BINARY_ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // BINARY_ALIGNMENT) * BINARY_ALIGNMENT
+
+
+def save_experiment_batch_binary(
+    experiment_logs: list[ExperimentLog], binary_file: Path
+) -> None:
+    """
+    Writes logs into one binary file: magic bytes, the header length (uint64), a JSON
+    header with the metadata and the absolute offset of every column, followed by the
+    raw step columns, each aligned to 64 bytes.
+    """
+    entries, blobs = [], []
+    for log in experiment_logs:
+        data = _experiment_log_metadata(log)
+        data["n_steps"] = len(log.steps)
+        data["columns"] = {}
+        for name, column in log.steps.columns().items():
+            data["columns"][name] = {"dtype": column.dtype.str, "offset": None}
+            blobs.append((data["columns"][name], np.ascontiguousarray(column)))
+        entries.append(data)
+
+    # offsets depend on the header length, which depends on the offsets' digits, so
+    # reserve room for the header with fixed-width placeholders first
+    for column, _ in blobs:
+        column["offset"] = 2**62
+    header_size = len(json.dumps({"experiments": entries}).encode())
+    offset = _aligned(len(BINARY_MAGIC) + 8 + header_size)
+    for column, values in blobs:
+        column["offset"] = offset
+        offset = _aligned(offset + values.nbytes)
+    header = json.dumps({"experiments": entries}).encode()
+    header += b" " * (header_size - len(header))
+
+    with open(binary_file, "wb") as f:
+        f.write(BINARY_MAGIC)
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        for column, values in blobs:
+            f.write(b"\0" * (column["offset"] - f.tell()))
+            f.write(values.data)
+
+
+def save_experiment_binary(experiment_log: ExperimentLog, binary_file: Path) -> None:
+    save_experiment_batch_binary([experiment_log], binary_file)
+
+
+def parse_experiment_batch_binary(
+    binary_file: Path, mmap: bool = True
+) -> list[ExperimentLog]:
+    """
+    Opens a file written by save_experiment_batch_binary. With mmap=True only the header
+    is read; the step columns are read-only views on a memory map of the file, so pages
+    are only loaded for the columns that are actually accessed.
+    """
+    with open(binary_file, "rb") as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{binary_file} is not a binary experiment log.")
+        header_size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        header = json.loads(f.read(header_size))
+    raw = (
+        np.memmap(binary_file, dtype=np.uint8, mode="r")
+        if mmap
+        else np.fromfile(binary_file, dtype=np.uint8)
+    )
+
+    logs = []
+    for data in header["experiments"]:
+        n_steps = data.pop("n_steps")
+        columns = {}
+        for name, column in data.pop("columns").items():
+            dtype = np.dtype(column["dtype"])
+            start = column["offset"]
+            columns[name] = raw[start : start + n_steps * dtype.itemsize].view(dtype)
+        log = parse_experiment_data({**data, "steps": []})
+        log.steps = StepLogColumns.from_arrays(**columns)
+        logs.append(log)
+    return logs
+
+
+def parse_experiment_binary(binary_file: Path, mmap: bool = True) -> ExperimentLog:
+    return parse_experiment_batch_binary(binary_file, mmap=mmap)[0]
+
+
+def convert_json_to_binary(json_file: Path, binary_file: Path) -> None:
+    """Converts a single or batch JSON log into the binary format."""
+    with open(json_file, "r") as f:
+        data = json.load(f)
+    entries = data if isinstance(data, list) else [data]
+    save_experiment_batch_binary(
+        [parse_experiment_data(entry) for entry in entries], binary_file
+    )
+
+
 def extract_param(df: pd.DataFrame, col: str, param: str, new_col: str) -> pd.DataFrame:
     pattern = re.compile(rf"{param}\s*=\s*([^,\)]+)")
 
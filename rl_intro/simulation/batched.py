@@ -0,0 +1,156 @@
+from rl_intro.agent.agent_batched import BATCHED_AGENTS
+from rl_intro.agent.factory import AgentFactory
+from rl_intro.agent.policy import EpsilonGreedyPolicy, RandomPolicy
+from rl_intro.environment.core import VectorEnvironment
+from rl_intro.environment.gridworld import GridWorld
+from rl_intro.environment.vector_gridworld import VectorGridWorld
+from rl_intro.simulation.log import StepLogColumns, EpisodeLog
+from typing import TYPE_CHECKING
+from numpy.typing import NDArray
+import numpy as np
+
+if TYPE_CHECKING:
+    from rl_intro.simulation.experiment import ExperimentCell, ExperimentLog
+
+# timesteps collected before they are split into the logs of the seeds
+CHUNK_STEPS = 1024
+
+
+def supports_batched(cell: "ExperimentCell") -> bool:
+    """
+    The batched runner covers the one-step agents with a dense float64 Q table, no
+    greedy cache and no replay, under epsilon-greedy or random policies, on a GridWorld
+    without a log directory.
+    """
+    agent_recipe, config = cell.agent_recipe, cell.agent_recipe.agent_config
+    return (
+        agent_recipe.agent_class in BATCHED_AGENTS
+        and agent_recipe.policy_class in (EpsilonGreedyPolicy, RandomPolicy)
+        and config.q_backend == "dense"
+        and config.dtype == "float64"
+        and not config.greedy_cache
+        and config.replay_batch_size == 0
+        and cell.env_recipe.environment_class is GridWorld
+        and cell.log_dir is None
+    )
+
+
+def run_batched_cells(cells: list["ExperimentCell"]) -> list["ExperimentLog"]:
+    """
+    Runs cells that differ only in their seed in lockstep: one batched agent on a
+    VectorGridWorld, so every timestep is a few array operations over all seeds. Each
+    seed reproduces Experiment.run of its cell exactly, and the logs come back per
+    cell in the given order.
+    """
+    from rl_intro.simulation.experiment import ExperimentLog
+
+    assert cells and all(supports_batched(cell) for cell in cells), "Unsupported cells."
+    first = cells[0]
+    assert all(
+        cell.agent_recipe is first.agent_recipe
+        and cell.env_recipe is first.env_recipe
+        and cell.experiment_config is first.experiment_config
+        for cell in cells
+    ), "Batched cells must share their recipes and configuration."
+    seeds = [cell.seed for cell in cells]
+    n = len(cells)
+    recipe, config = first.agent_recipe, first.experiment_config
+    agent = BATCHED_AGENTS[recipe.agent_class](
+        recipe.agent_config, recipe.policy_class(recipe.policy_config), seeds
+    )
+    # one shared configuration object, so all instances share one set of tables
+    env: VectorEnvironment = VectorGridWorld(
+        [first.env_recipe.environment_config] * n, seeds=seeds
+    )
+
+    pieces: list[list[dict[str, NDArray]]] = [[] for _ in range(n)]
+    chunk: list[tuple[NDArray, ...]] = []
+
+    def flush() -> None:
+        if not chunk:
+            return
+        active, *columns = (np.stack(column) for column in zip(*chunk))
+        names = ("episode", "step", "action", "state", "reward", "terminal")
+        for i in range(n):
+            rows = active[:, i]
+            if rows.any():
+                pieces[i].append({name: c[rows, i] for name, c in zip(names, columns)})
+        chunk.clear()
+
+    starts = np.ones(n, dtype=bool)
+    step_counts = np.zeros(n, dtype=np.int64)
+    episode_counts = np.zeros(n, dtype=np.int64)
+    actions = np.zeros(n, dtype=np.int64)
+    while True:
+        # seeds that finished their last episode only wait for the others
+        active = ~starts | (episode_counts < config.n_episodes)
+        if not active.any():
+            break
+        begin = active & starts
+        moving = active & ~starts
+        states, rewards, terminals = env.step(actions, mask=moving)
+        if begin.any():
+            states[begin] = env.reset(begin)[begin]
+        # like Experiment.start_step, a start step is logged with reward 0
+        rewards = np.where(begin, 0.0, rewards)
+        terminals = terminals & moving
+        episode_counts += begin
+        step_counts = np.where(begin, 0, step_counts + moving)
+        # finished seeds pass as episode starts, so they never learn
+        actions = agent.step(states, rewards, terminals, episode_starts=starts)
+        starts = np.where(
+            moving, terminals | (step_counts >= config.max_steps), ~active
+        )
+        chunk.append(
+            (
+                active,
+                episode_counts.copy(),
+                step_counts,
+                actions,
+                states,
+                rewards,
+                terminals,
+            )
+        )
+        if len(chunk) >= CHUNK_STEPS:
+            flush()
+    flush()
+
+    # every cell gets the names its scalar agent and environment would log
+    template = AgentFactory.create_agent(recipe)
+    env_name = str(GridWorld(first.env_recipe.environment_config))
+    final_values = agent.get_greedy_values()
+    logs = []
+    for i, cell in enumerate(cells):
+        columns = {
+            name: np.concatenate([piece[name] for piece in pieces[i]])
+            for name in StepLogColumns.DTYPES
+        }
+        log = ExperimentLog(
+            id=cell.id,
+            agent=str(template),
+            env=env_name,
+            experiment_config=config,
+            steps=StepLogColumns(),
+            final_values=final_values[i].tolist(),
+            seed=cell.seed,
+        )
+        if config.log_level == "steps":
+            log.steps = StepLogColumns.from_arrays(**columns)
+        else:
+            log.episodes = episode_log(columns, agent.config.n_states, config.log_level)
+        logs.append(log)
+    return logs
+
+
+def episode_log(
+    columns: dict[str, NDArray], n_states: int, log_level: str
+) -> EpisodeLog:
+    """Aggregates the step columns of one seed like Experiment does at this log level."""
+    episodes = EpisodeLog(n_states, record_episodes=log_level == "episodes")
+    bounds = np.flatnonzero(columns["step"] == 0)[1:]
+    states = np.split(columns["state"], bounds)
+    rewards = np.split(columns["reward"], bounds)
+    for episode_states, episode_rewards in zip(states, rewards):
+        episodes.add_episode(episode_states.tolist(), episode_rewards.tolist())
+    return episodes
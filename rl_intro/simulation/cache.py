@@ -0,0 +1,199 @@
+from rl_intro.simulation.experiment import ExperimentCell, ExperimentLog
+from rl_intro.evaluation.parse import save_experiment_binary, parse_experiment_binary
+from dataclasses import fields, is_dataclass, replace
+from enum import Enum
+from pathlib import Path
+from types import BuiltinFunctionType, CodeType, FunctionType, ModuleType
+from typing import Any, Optional
+import hashlib
+import json
+import os
+import numpy as np
+from rl_intro.utils.logger import logger
+
+# bump whenever agents, environments or the log format change what a cell produces
+CACHE_VERSION = 2
+
+
+def _qualified_name(obj: Any) -> str:
+    return f"{obj.__module__}.{obj.__qualname__}"
+
+
+def _code_digest(code: CodeType) -> str:
+    digest = hashlib.sha256(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            digest.update(_code_digest(const).encode())
+        else:
+            digest.update(repr(const).encode())
+    return digest.hexdigest()
+
+
+def _global_names(code: CodeType) -> set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            names |= _global_names(const)
+    return names
+
+
+def _canonicalize_function(obj: FunctionType, active: tuple[int, ...]) -> Any:
+    data = {"__function__": _qualified_name(obj), "code": _code_digest(obj.__code__)}
+    if id(obj) in active:
+        # recursive reference, the enclosing entry already covers the function
+        return data
+    active = active + (id(obj),)
+    data["defaults"] = _canonicalize(obj.__defaults__ or (), active)
+    data["kwdefaults"] = _canonicalize(obj.__kwdefaults__ or {}, active)
+    try:
+        cells = [cell.cell_contents for cell in obj.__closure__ or ()]
+    except ValueError:
+        raise TypeError(f"Cannot canonicalize {obj!r}: a closure cell is still empty.")
+    data["closure"] = _canonicalize(cells, active)
+    used = {
+        name: obj.__globals__[name]
+        for name in sorted(_global_names(obj.__code__))
+        if name in obj.__globals__
+    }
+    data["globals"] = {
+        name: _canonicalize(value, active) for name, value in used.items()
+    }
+    return data
+
+
+def canonicalize(obj: Any) -> Any:
+    """
+    Converts recipes and configs into plain JSON data with a deterministic layout.
+    Classes are identified by their qualified name; functions (e.g. reward functions)
+    additionally by a digest of their bytecode and the values they can read: defaults,
+    closure cells and the globals they reference. Editing a function or calling a
+    factory with other arguments therefore changes the key.
+    """
+    return _canonicalize(obj, ())
+
+
+def _canonicalize(obj: Any, active: tuple[int, ...]) -> Any:
+    if is_dataclass(obj) and not isinstance(obj, type):
+        data = {
+            f.name: _canonicalize(getattr(obj, f.name), active) for f in fields(obj)
+        }
+        return {"__dataclass__": _qualified_name(type(obj)), **data}
+    if isinstance(obj, type):
+        return {"__class__": _qualified_name(obj)}
+    if isinstance(obj, FunctionType):
+        return _canonicalize_function(obj, active)
+    if isinstance(obj, ModuleType):
+        return {"__module__": obj.__name__}
+    if isinstance(obj, (BuiltinFunctionType, np.ufunc)):
+        return {"__builtin__": f"{getattr(obj, '__module__', None)}.{obj.__name__}"}
+    if isinstance(obj, Enum):
+        return {
+            "__enum__": _qualified_name(type(obj)),
+            "value": _canonicalize(obj.value, active),
+        }
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (list, tuple)):
+        return [_canonicalize(v, active) for v in obj]
+    if isinstance(obj, dict):
+        return {str(k): _canonicalize(v, active) for k, v in obj.items()}
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    raise TypeError(f"Cannot canonicalize {obj!r} of type {type(obj).__name__}.")
+
+
+def cell_key(cell: ExperimentCell) -> str:
+    """Stable content hash of everything that determines the result of a cell."""
+    agent_recipe = replace(
+        cell.agent_recipe,
+        agent_config=replace(cell.agent_recipe.agent_config, random_seed=cell.seed),
+    )
+    env_recipe = replace(
+        cell.env_recipe,
+        environment_config=replace(
+            cell.env_recipe.environment_config, random_seed=cell.seed
+        ),
+    )
+    data = {
+        "version": CACHE_VERSION,
+        "id": cell.id,
+        "seed": cell.seed,
+        "agent_recipe": canonicalize(agent_recipe),
+        "env_recipe": canonicalize(env_recipe),
+        "experiment_config": canonicalize(cell.experiment_config),
+    }
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache of finished experiment logs keyed by cell_key, stored in the binary
+    log format. Reads refresh a file's modification time, and writes evict the least
+    recently used entries once the cache grows beyond max_bytes.
+    """
+
+    SUFFIX = ".rllog"
+
+    def __init__(self, directory: Path, max_bytes: Optional[int] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def __str__(self):
+        return f"ResultCache(directory={self.directory},max_bytes={self.max_bytes})"
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.SUFFIX}"
+
+    def _entries(self) -> list[Path]:
+        return list(self.directory.glob(f"*{self.SUFFIX}"))
+
+    def __contains__(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self._entries())
+
+    def get(self, key: str) -> Optional[ExperimentLog]:
+        path = self._path(key)
+        try:
+            log = parse_experiment_binary(path)
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return log
+
+    def put(self, key: str, log: ExperimentLog) -> None:
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        save_experiment_binary(log, tmp)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self) -> None:
+        if self.max_bytes is None:
+            return
+        entries = sorted(
+            (
+                (path.stat().st_mtime_ns, path.stat().st_size, path)
+                for path in self._entries()
+            ),
+            key=lambda entry: entry[0],
+        )
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.debug(f"{self} evicted {path.name}.")
+
+    def clear(self) -> None:
+        for path in self._entries():
+            path.unlink(missing_ok=True)
@@ -1,31 +1,40 @@
 from rl_intro.agent.core import Agent
 from rl_intro.environment.core import Environment
 from rl_intro.environment.core import State, Action, Reward, Terminal
-from dataclasses import dataclass, asdict
-from typing import Optional
-from tqdm import trange
-import json
+from dataclasses import dataclass
+from typing import Optional, Literal, Iterator, TYPE_CHECKING
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+from tqdm import tqdm, trange
 from rl_intro.utils.logger import logger
 from rl_intro.utils.visualize import grid_str
+from rl_intro.simulation.log import StepLog, StepLogColumns, EpisodeLog
+from rl_intro.simulation.sink import ChunkedLogWriter
+from rl_intro.simulation.fused import supports_fused, run_fused_episodes
+from rl_intro.simulation.batched import supports_batched, run_batched_cells
+from rl_intro.agent.checkpoint import load_checkpoint, read_metadata, save_checkpoint
 
 from rl_intro.agent.factory import AgentFactory, AgentRecipe
 from rl_intro.environment.factory import EnvironmentFactory, EnvironmentRecipe
 
+if TYPE_CHECKING:
+    from rl_intro.simulation.cache import ResultCache
+
+LogLevel = Literal["steps", "episodes", "none"]
+
 
 @dataclass
 class ExperimentConfig:
     n_episodes: int = 1000
     max_steps: int = 100
-
-
-@dataclass
-class StepLog:
-    episode: int
-    step: int
-    action: Action
-    state: State
-    reward: Reward
-    terminal: Terminal
+    # "steps": every step, "episodes": per-episode aggregates, "none": summary statistics
+    log_level: LogLevel = "steps"
+    # run whole episodes in the fused loop of simulation.fused when the agent,
+    # policy and environment are supported; the trajectory is the same either way
+    fused: bool = False
+    # with a checkpoint_dir, save the agent every this many episodes (0 disables)
+    checkpoint_every: int = 0
 
 
 @dataclass
@@ -34,9 +43,10 @@ class ExperimentLog:
     agent: str
     env: str
     experiment_config: ExperimentConfig
-    steps: list[StepLog]
+    steps: StepLogColumns
     final_values: Optional[list[float]] = None
     seed: Optional[int] = None
+    episodes: Optional[EpisodeLog] = None
 
 
 class Experiment:
@@ -46,22 +56,80 @@ class Experiment:
         env: Environment,
         config: ExperimentConfig,
         id: int = 0,
+        sink: Optional[ChunkedLogWriter] = None,
+        checkpoint_dir: Optional[Path] = None,
     ):
+        """
+        With a sink, step rows are streamed to disk in chunks after every episode and
+        the in-memory step log only ever holds the rows of the current chunk.
+        Environments with non-integer states provide state_index(state) and
+        n_state_indices, and the logs record that index in place of the state.
+        With checkpoint_dir and config.checkpoint_every, the agent is saved to
+        checkpoint_dir/episode{n} after every checkpoint_every-th episode.
+        """
         self.agent = agent
         self.env = env
         self.config = config
+        if config.log_level not in ("steps", "episodes", "none"):
+            raise ValueError(f"Invalid log level: {config.log_level}")
         self.log = ExperimentLog(
             id=id,
             agent=str(agent),
             env=str(env),
             experiment_config=self.config,
-            steps=[],
+            steps=StepLogColumns(),
             seed=agent.config.random_seed,
+            episodes=(
+                None
+                if config.log_level == "steps"
+                else EpisodeLog(
+                    getattr(env, "n_state_indices", agent.config.n_states),
+                    record_episodes=config.log_level == "episodes",
+                )
+            ),
         )
+        self.state_index = getattr(env, "state_index", None)
         self.last_action: Optional[Action] = None
         self.episode_start: Terminal = True
         self.step_count: int = 0
         self.episode_count: int = 0
+        self.sink = sink
+        if self.sink is not None:
+            self.sink.open(self.log)
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
+
+    @classmethod
+    def from_checkpoint(
+        cls,
+        checkpoint: Path,
+        env: Environment,
+        config: ExperimentConfig,
+        mmap_mode: Optional[Literal["r", "r+", "c"]] = None,
+        **kwargs,
+    ) -> "Experiment":
+        """
+        Warm-starts an experiment from a saved agent. Episodes are numbered on from the
+        episode count stored in the checkpoint.
+        """
+        agent = load_checkpoint(checkpoint, mmap_mode=mmap_mode)
+        experiment = cls(agent, env, config, **kwargs)
+        metadata = read_metadata(checkpoint)["metadata"]
+        experiment.episode_count = metadata.get("episode", 0)
+        return experiment
+
+    def save_checkpoint(self, directory: Optional[Path] = None) -> Path:
+        if directory is None:
+            assert self.checkpoint_dir is not None, "No checkpoint directory given."
+            directory = self.checkpoint_dir / f"episode{self.episode_count:06d}"
+        return save_checkpoint(self.agent, directory, episode=self.episode_count)
+
+    def _checkpoint_due(self) -> bool:
+        every = self.config.checkpoint_every
+        return (
+            self.checkpoint_dir is not None
+            and every > 0
+            and self.episode_count % every == 0
+        )
 
     def start_step(self) -> tuple[State, Reward, Terminal]:
         self.step_count = 0
@@ -71,7 +139,7 @@ class Experiment:
         self.episode_start = False
         return state, Reward(0.0), Terminal(False)  # track start step reward as 0.0
 
-    def step(self) -> StepLog:
+    def _advance(self) -> tuple[State, Reward, Terminal]:
         if self.episode_start or self.last_action is None:
             state, reward, terminal = self.start_step()
         else:
@@ -80,7 +148,28 @@ class Experiment:
             self.step_count += 1
             self.episode_start = terminal or self.step_count >= self.config.max_steps
         assert self.last_action is not None, "Agent did not return an action."
-        step_log = StepLog(
+        if self.state_index is not None:
+            state = self.state_index(state)
+        episodes = self.log.episodes
+        if episodes is None:
+            self.log.steps.append_step(
+                self.episode_count,
+                self.step_count,
+                self.last_action,
+                state,
+                reward,
+                terminal,
+            )
+        else:
+            episodes.add_step(state, reward)
+            if self.episode_start:
+                episodes.end_episode(self.step_count)
+        return state, reward, terminal
+
+    def step(self) -> StepLog:
+        state, reward, terminal = self._advance()
+        assert self.last_action is not None, "Agent did not return an action."
+        return StepLog(
             episode=self.episode_count,
             step=self.step_count,
             action=self.last_action,
@@ -88,26 +177,76 @@ class Experiment:
             reward=reward,
             terminal=terminal,
         )
-        self.log.steps.append(step_log)
-        return step_log
 
     def run_episode(self) -> None:
         while True:
-            self.step()
+            self._advance()
             if self.episode_start:
                 break
+        if self.sink is not None:
+            self.sink.write(self.log.steps)
 
     def run_episodes(self, n_episodes: int) -> ExperimentLog:
-        for _ in trange(n_episodes, desc="Episodes"):
-            self.run_episode()
+        if self.config.fused and supports_fused(self):
+            every = self.config.checkpoint_every if self.checkpoint_dir else 0
+            remaining = n_episodes
+            while remaining > 0:
+                # stop the fused loop at every checkpoint
+                chunk = remaining if not every else every - self.episode_count % every
+                chunk = min(chunk, remaining)
+                run_fused_episodes(self, chunk)
+                remaining -= chunk
+                if self._checkpoint_due():
+                    self.save_checkpoint()
+        else:
+            if self.config.fused:
+                logger.warning(f"{self.agent} is not supported by the fused runner.")
+            for _ in trange(n_episodes, desc="Episodes"):
+                self.run_episode()
+                if self._checkpoint_due():
+                    self.save_checkpoint()
         self.log.final_values = self.agent.get_greedy_values().tolist()
+        if self.sink is not None:
+            self.sink.close(self.log)
         return self.log
 
     def run(self) -> ExperimentLog:
-        assert len(self.log.steps) == 0, "Experiment log is not empty."
+        assert (
+            len(self.log.steps) == 0 and not self.log.episodes
+        ), "Experiment log is not empty."
         return self.run_episodes(self.config.n_episodes)
 
 
+@dataclass
+class ExperimentCell:
+    """One (seed, environment recipe, agent recipe) combination of an ExperimentBatch."""
+
+    id: int
+    seed: int
+    agent_recipe: AgentRecipe
+    env_recipe: EnvironmentRecipe
+    experiment_config: ExperimentConfig
+    log_dir: Optional[Path] = None
+    chunk_size: int = 65536
+
+
+def run_experiment_cell(cell: ExperimentCell) -> ExperimentLog:
+    """Builds a fresh environment and agent for the cell and runs it. Used by worker processes."""
+    env = EnvironmentFactory.create_environment(
+        cell.env_recipe, seed_override=cell.seed
+    )
+    agent = AgentFactory.create_agent(cell.agent_recipe, seed_override=cell.seed)
+    logger.info(
+        f"Running experiment {cell.id} with agent {agent} and environment {env}."
+    )
+    sink = (
+        ChunkedLogWriter(cell.log_dir, cell.chunk_size)
+        if cell.log_dir is not None
+        else None
+    )
+    return Experiment(agent, env, cell.experiment_config, id=cell.id, sink=sink).run()
+
+
 class ExperimentBatch:
     def __init__(
         self,
@@ -115,33 +254,119 @@ class ExperimentBatch:
         env_recipes: list[EnvironmentRecipe],
         experiment_config: ExperimentConfig,
         n_runs: int,
+        workers: Optional[int] = 1,
+        log_dir: Optional[Path] = None,
+        chunk_size: int = 65536,
+        cache: Optional["ResultCache"] = None,
+        batched: bool = False,
     ):
+        """
+        workers > 1 runs the cells on a process pool (None uses all cores). Every cell is
+        seeded by its run index and gets its own environment and agent, so the logs are
+        identical to a serial run and come back in the same order.
+        With log_dir, every cell streams its steps to its own subdirectory (see
+        ChunkedLogWriter) and the returned logs only carry the metadata.
+        With cache, cells whose key is already cached are loaded instead of run, and every
+        finished cell is stored as soon as it completes, so an interrupted batch resumes
+        where it stopped. Streamed cells are never cached, as their logs hold no steps.
+        With batched, the seeds of every (environment, agent) pair supported by
+        simulation.batched run in lockstep as one batched agent on a VectorGridWorld in
+        this process, with the same logs as running them one by one.
+        """
+        assert cache is None or log_dir is None, "cache and log_dir are exclusive."
         self.agent_recipes = agent_recipes
         self.env_recipes = env_recipes
         self.experiment_config = experiment_config
         self.n_runs = n_runs
+        self.workers = workers
+        self.log_dir = Path(log_dir) if log_dir is not None else None
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.batched = batched
         self.experiment_logs: list[ExperimentLog] = []
 
+    def cells(self) -> list[ExperimentCell]:
+        return [
+            ExperimentCell(
+                id=i_run,
+                seed=i_run,
+                agent_recipe=agent_recipe,
+                env_recipe=env_recipe,
+                experiment_config=self.experiment_config,
+                log_dir=(
+                    self.log_dir / f"run{i_run:05d}_env{i_env:02d}_agent{i_agent:02d}"
+                    if self.log_dir is not None
+                    else None
+                ),
+                chunk_size=self.chunk_size,
+            )
+            for i_run in range(self.n_runs)
+            for i_env, env_recipe in enumerate(self.env_recipes)
+            for i_agent, agent_recipe in enumerate(self.agent_recipes)
+        ]
+
+    def _execute(
+        self, cells: list[ExperimentCell]
+    ) -> Iterator[tuple[int, ExperimentLog]]:
+        """Yields (index, log) for every cell as soon as it finishes."""
+        if self.batched:
+            groups: dict[tuple[int, int], list[int]] = {}
+            for i, cell in enumerate(cells):
+                if supports_batched(cell):
+                    key = (id(cell.env_recipe), id(cell.agent_recipe))
+                    groups.setdefault(key, []).append(i)
+            for indices in groups.values():
+                logs = run_batched_cells([cells[i] for i in indices])
+                yield from zip(indices, logs)
+            batched = {i for indices in groups.values() for i in indices}
+            rest = [i for i in range(len(cells)) if i not in batched]
+            if rest:
+                logger.warning(f"{len(rest)} cells are not supported batched.")
+            for j, log in self._execute_cells([cells[i] for i in rest]):
+                yield rest[j], log
+            return
+        yield from self._execute_cells(cells)
+
+    def _execute_cells(
+        self, cells: list[ExperimentCell]
+    ) -> Iterator[tuple[int, ExperimentLog]]:
+        if not cells:
+            return
+        if self.workers == 1:
+            for i, cell in enumerate(tqdm(cells, desc="Runs")):
+                yield i, run_experiment_cell(cell)
+            return
+        # spawn avoids forking a process that may already run threads (e.g. BLAS)
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            futures = {
+                executor.submit(run_experiment_cell, cell): i
+                for i, cell in enumerate(cells)
+            }
+            for future in tqdm(as_completed(futures), total=len(cells), desc="Runs"):
+                yield futures[future], future.result()
+
     def run(self) -> list[ExperimentLog]:
-        # TODO: multithreading support
-        for i_run in trange(self.n_runs, desc="Runs"):
-            random_seed = i_run
-            for env_recipe in self.env_recipes:
-                env = EnvironmentFactory.create_environment(
-                    env_recipe, seed_override=random_seed
-                )
-                for agent_recipe in self.agent_recipes:
-                    agent = AgentFactory.create_agent(
-                        agent_recipe, seed_override=random_seed
-                    )
-                    experiment = Experiment(
-                        agent, env, self.experiment_config, id=i_run
-                    )
-                    logger.info(
-                        f"Running experiment {i_run + 1}/{self.n_runs} with agent {agent} and environment {env}."
-                    )
-                    experiment_log = experiment.run()
-                    self.experiment_logs.append(experiment_log)
+        cells = self.cells()
+        logs: list[Optional[ExperimentLog]] = [None] * len(cells)
+        keys: list[Optional[str]] = [None] * len(cells)
+        if self.cache is not None:
+            from rl_intro.simulation.cache import cell_key
+
+            for i, cell in enumerate(cells):
+                keys[i] = cell_key(cell)
+                logs[i] = self.cache.get(keys[i])
+        pending = [i for i, log in enumerate(logs) if log is None]
+        logger.info(f"Running {len(pending)} of {len(cells)} cells.")
+
+        # results are put back in cell order regardless of completion order
+        for i, log in self._execute([cells[i] for i in pending]):
+            logs[pending[i]] = log
+            if self.cache is not None:
+                self.cache.put(keys[pending[i]], log)
+        self.experiment_logs.extend(logs)
         return self.experiment_logs
 
 
@@ -198,8 +423,12 @@ if __name__ == "__main__":
     logger.debug(grid_str(agent.get_greedy_values(), w, h))
 
     # save the logs as a json file
-    with open(out_dir / "experiment_logs.json", "w") as f:
-        json.dump(asdict(experiment_log), f, indent=4)
+    from rl_intro.evaluation.parse import (
+        save_experiment_json,
+        save_experiment_batch_json,
+    )
+
+    save_experiment_json(experiment_log, out_dir / "experiment_logs.json")
     logger.info("Experiment completed and logs saved to 'experiment_logs.json'.")
 
     agent_recipe = AgentRecipe(
@@ -220,8 +449,4 @@ if __name__ == "__main__":
     )
     logs = experiment_batch.run()
     # Save all logs to a JSON file
-
-    with open(out_dir / "experiment_batch_logs.json", "w") as f:
-        json.dump(
-            [asdict(log) for log in logs], f, indent=4, default=lambda o: o.__dict__
-        )
+    save_experiment_batch_json(logs, out_dir / "experiment_batch_logs.json")
@@ -0,0 +1,160 @@
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.agent_expected_sarsa import AgentExpectedSarsa
+from rl_intro.agent.policy import EpsilonGreedyPolicy, RandomPolicy
+from rl_intro.environment.core import State, Action
+from rl_intro.environment.gridworld import GridWorld
+from rl_intro.utils.rng import BufferedGenerator
+from typing import TYPE_CHECKING
+from tqdm import trange
+import numpy as np
+
+if TYPE_CHECKING:
+    from rl_intro.simulation.experiment import Experiment
+
+SARSA, Q_LEARNING, EXPECTED_SARSA = range(3)
+AGENT_KINDS = {
+    AgentSarsa: SARSA,
+    AgentQLearning: Q_LEARNING,
+    AgentExpectedSarsa: EXPECTED_SARSA,
+}
+
+
+def supports_fused(experiment: "Experiment") -> bool:
+    """
+    The fused runner covers the one-step agents with a dense Q table, no greedy
+    cache and no replay, under epsilon-greedy or random policies, on a compiled GridWorld.
+    """
+    agent, env = experiment.agent, experiment.env
+    return (
+        type(agent) in AGENT_KINDS
+        and type(agent.policy) in (EpsilonGreedyPolicy, RandomPolicy)
+        and isinstance(agent.q, np.ndarray)
+        and agent.greedy is None
+        and agent.replay_buffer is None
+        and type(env) is GridWorld
+        and env.config.compiled
+    )
+
+
+def run_fused_episodes(experiment: "Experiment", n_episodes: int) -> None:
+    """
+    Runs whole episodes of a supported experiment in one loop over local bindings:
+    the Q table as nested lists, the environment's transition lists and a
+    BufferedGenerator on the agent's generator. Every random draw, TD update and log
+    row is the one Experiment.run_episode would produce, and the agent, environment,
+    experiment and generator are left in the same state. Rows are collected per
+    episode and written to the log in bulk.
+    """
+    assert supports_fused(experiment), "Unsupported experiment."
+    # finish an episode that was started step by step
+    while not experiment.episode_start and experiment.last_action is not None:
+        experiment._advance()
+
+    agent, env, config = experiment.agent, experiment.env, experiment.config
+    kind = AGENT_KINDS[type(agent)]
+    n_actions = agent.config.n_actions
+    learning_rate, discount = agent.config.learning_rate, agent.config.discount
+    max_steps = config.max_steps
+    epsilon_greedy = isinstance(agent.policy, EpsilonGreedyPolicy)
+    epsilon = agent.policy.config.epsilon if epsilon_greedy else 1.0
+
+    q = agent.q.tolist()
+    # writes to a lower precision table are rounded like the array assignment would
+    cast = None if agent.q.dtype == np.float64 else agent.q.dtype.type
+    generator = agent.random_generator
+    buffered = (
+        generator
+        if isinstance(generator, BufferedGenerator)
+        else BufferedGenerator(generator)
+    )
+    random, integers = buffered.random, buffered.integers
+    next_state_list = env._next_state_list
+    reward_list = env._reward_list
+    terminal_list = env._terminal_list
+    array, dot = np.array, np.dot
+
+    def select(state: State) -> Action:
+        # EpsilonGreedyPolicy / RandomPolicy.select_action with fair_argmax
+        if not epsilon_greedy or random() < epsilon:
+            return integers(0, n_actions)
+        row = q[state]
+        max_value = max(row)
+        if row.count(max_value) == 1:
+            return row.index(max_value)
+        best = [a for a, value in enumerate(row) if value == max_value]
+        return best[integers(0, len(best))]
+
+    def expected_value(state: State) -> float:
+        # Policy.get_expected_value, with the same dot product over the distribution
+        row = q[state]
+        if epsilon_greedy:
+            max_value = max(row)
+            base = epsilon / n_actions
+            share = (1 - epsilon) / row.count(max_value)
+            distribution = [base + share if v == max_value else base for v in row]
+        else:
+            distribution = [1.0 / n_actions] * n_actions
+        return float(dot(array(distribution), array(row)))
+
+    log = experiment.log
+    episodes = log.episodes
+    sink = experiment.sink
+    episode_count = experiment.episode_count
+    state = action = None
+    terminal = False
+    step_count = 0
+    for _ in trange(n_episodes, desc="Episodes"):
+        episode_count += 1
+        state = env.reset()
+        action = select(state)
+        states, actions, rewards, terminals = [state], [action], [0.0], [False]
+        step_count = 0
+        while True:
+            last_state, last_action = state, action
+            if terminal_list[last_state]:
+                state = env._select_start_state()
+            else:
+                state = next_state_list[last_state][last_action]
+            reward, terminal = reward_list[state], terminal_list[state]
+            action = select(state)
+
+            row = q[last_state]
+            current = row[last_action]
+            if terminal:
+                td_error = reward - current
+            elif kind == SARSA:
+                td_error = reward + discount * q[state][action] - current
+            elif kind == Q_LEARNING:
+                td_error = reward + discount * max(q[state]) - current
+            else:
+                td_error = reward + discount * expected_value(state) - current
+            value = current + learning_rate * td_error
+            row[last_action] = value if cast is None else float(cast(value))
+
+            step_count += 1
+            states.append(state)
+            actions.append(action)
+            rewards.append(reward)
+            terminals.append(terminal)
+            if terminal or step_count >= max_steps:
+                break
+
+        if episodes is None:
+            log.steps.extend_episode(episode_count, actions, states, rewards, terminals)
+        else:
+            episodes.add_episode(states, rewards)
+        if sink is not None:
+            sink.write(log.steps)
+
+    agent.q[...] = q
+    if buffered is not generator:
+        buffered.sync()
+    if n_episodes > 0:
+        env.state = state
+        agent.last_state = state if not terminal else None
+        agent.last_action = action if not terminal else None
+        experiment.last_action = action
+        experiment.step_count = step_count
+        experiment.episode_count = episode_count
+        experiment.episode_start = True
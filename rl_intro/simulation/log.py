@@ -0,0 +1,308 @@
+from rl_intro.environment.core import State, Action, Reward, Terminal
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+from numpy.typing import NDArray
+import numpy as np
+from rl_intro.utils.math import RunningStats
+
+
+@dataclass
+class StepLog:
+    episode: int
+    step: int
+    action: Action
+    state: State
+    reward: Reward
+    terminal: Terminal
+
+
+class StepLogColumns:
+    """
+    Column-oriented step log backed by growable typed arrays. Rows are appended as plain
+    tuples into a small pending block which is flushed into the columns in bulk, so no
+    object survives per step. Indexing and iteration hand out StepLog views.
+    """
+
+    DTYPES: dict[str, type] = {
+        "episode": np.int32,
+        "step": np.int32,
+        "action": np.int16,
+        "state": np.int32,
+        "reward": np.float32,
+        "terminal": np.bool_,
+    }
+    BLOCK_SIZE = 4096
+
+    def __init__(self, capacity: int = 1024):
+        self._columns = {
+            name: np.empty(capacity, dtype=dtype) for name, dtype in self.DTYPES.items()
+        }
+        self._size = 0
+        self._pending: list[tuple] = []
+
+    @classmethod
+    def from_arrays(cls, **columns: NDArray) -> "StepLogColumns":
+        """Wraps existing column arrays (e.g. memory-mapped ones) without copying them."""
+        if set(columns) != set(cls.DTYPES):
+            raise ValueError(
+                f"Expected columns {list(cls.DTYPES)}, got {list(columns)}."
+            )
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length.")
+        log = cls(capacity=0)
+        log._columns = {
+            name: np.asarray(columns[name], dtype=dtype)
+            for name, dtype in cls.DTYPES.items()
+        }
+        log._size = lengths.pop() if lengths else 0
+        return log
+
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "StepLogColumns":
+        log = cls()
+        for record in records:
+            log.append_step(*(record[name] for name in cls.DTYPES))
+        log._flush()
+        return log
+
+    def __len__(self) -> int:
+        return self._size + len(self._pending)
+
+    def __iter__(self) -> Iterator[StepLog]:
+        self._flush()
+        rows = zip(*(self.column(name).tolist() for name in self.DTYPES))
+        return (StepLog(*row) for row in rows)
+
+    def __getitem__(self, index: int | slice) -> StepLog | list[StepLog]:
+        self._flush()
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("StepLogColumns index out of range")
+        return StepLog(*(self._columns[name][index].item() for name in self.DTYPES))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, StepLogColumns):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            np.array_equal(self.column(name), other.column(name))
+            for name in self.DTYPES
+        )
+
+    def __repr__(self) -> str:
+        return f"StepLogColumns(n_steps={len(self)})"
+
+    def __reduce__(self):
+        return (_from_columns, (self.columns(),))
+
+    def append(self, step_log: StepLog) -> None:
+        self.append_step(
+            step_log.episode,
+            step_log.step,
+            step_log.action,
+            step_log.state,
+            step_log.reward,
+            step_log.terminal,
+        )
+
+    def append_step(
+        self,
+        episode: int,
+        step: int,
+        action: Action,
+        state: State,
+        reward: Reward,
+        terminal: Terminal,
+    ) -> None:
+        self._pending.append((episode, step, action, state, reward, terminal))
+        if len(self._pending) >= self.BLOCK_SIZE:
+            self._flush()
+
+    def extend_episode(
+        self,
+        episode: int,
+        actions: list[Action],
+        states: list[State],
+        rewards: list[Reward],
+        terminals: list[Terminal],
+    ) -> None:
+        """Appends the rows of one episode, numbered from step 0, in one bulk write."""
+        self._flush()
+        start, end = self._size, self._size + len(actions)
+        self._reserve(end)
+        columns = self._columns
+        columns["episode"][start:end] = episode
+        columns["step"][start:end] = np.arange(end - start)
+        columns["action"][start:end] = actions
+        columns["state"][start:end] = states
+        columns["reward"][start:end] = rewards
+        columns["terminal"][start:end] = terminals
+        self._size = end
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        n = len(self._pending)
+        self._reserve(self._size + n)
+        for name, values in zip(self.DTYPES, zip(*self._pending)):
+            self._columns[name][self._size : self._size + n] = values
+        self._size += n
+        self._pending.clear()
+
+    def _reserve(self, capacity: int) -> None:
+        current = len(self._columns["episode"])
+        if capacity <= current and all(
+            c.flags.writeable for c in self._columns.values()
+        ):
+            return
+        new_capacity = max(capacity, 2 * current, 1024)
+        for name, column in self._columns.items():
+            grown = np.empty(new_capacity, dtype=column.dtype)
+            grown[: self._size] = column[: self._size]
+            self._columns[name] = grown
+
+    def column(self, name: str) -> NDArray:
+        """Returns a view on the filled part of a column."""
+        self._flush()
+        return self._columns[name][: self._size]
+
+    def columns(self) -> dict[str, NDArray]:
+        return {name: self.column(name) for name in self.DTYPES}
+
+    def clear(self) -> None:
+        self._size = 0
+        self._pending.clear()
+
+    def take(self, n: int) -> dict[str, NDArray]:
+        """Removes the first n rows and returns them as copied columns."""
+        self._flush()
+        n = min(n, self._size)
+        taken = {name: column[:n].copy() for name, column in self._columns.items()}
+        remaining = self._size - n
+        self._reserve(self._size)  # memory-mapped columns become writable copies
+        for column in self._columns.values():
+            column[:remaining] = column[n : self._size]
+        self._size = remaining
+        return taken
+
+    @property
+    def episode(self) -> NDArray:
+        return self.column("episode")
+
+    @property
+    def step(self) -> NDArray:
+        return self.column("step")
+
+    @property
+    def action(self) -> NDArray:
+        return self.column("action")
+
+    @property
+    def state(self) -> NDArray:
+        return self.column("state")
+
+    @property
+    def reward(self) -> NDArray:
+        return self.column("reward")
+
+    @property
+    def terminal(self) -> NDArray:
+        return self.column("terminal")
+
+    def to_records(self) -> list[dict]:
+        names = list(self.DTYPES)
+        return [
+            dict(zip(names, row))
+            for row in zip(*(self.column(n).tolist() for n in names))
+        ]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self._columns.values())
+
+
+def _from_columns(columns: dict[str, NDArray]) -> StepLogColumns:
+    return StepLogColumns.from_arrays(**columns)
+
+
+class EpisodeLog:
+    """
+    Per-episode aggregates kept instead of step rows for the "episodes" and "none" log
+    levels: episode returns and lengths, state visit counts and Welford statistics.
+    With record_episodes=False only the statistics and visit counts are kept, so memory
+    no longer grows with the number of episodes.
+    """
+
+    def __init__(self, n_states: int, record_episodes: bool = True):
+        self.record_episodes = record_episodes
+        self._returns: list[float] = []
+        self._lengths: list[int] = []
+        self._visits = [0] * n_states
+        self._episode_return = 0.0
+        self.return_stats = RunningStats()
+        self.length_stats = RunningStats()
+
+    def __len__(self) -> int:
+        return self.return_stats.count
+
+    def __repr__(self) -> str:
+        return f"EpisodeLog(n_episodes={len(self)},returns={self.return_stats})"
+
+    def add_step(self, state: State, reward: Reward) -> None:
+        self._visits[state] += 1
+        self._episode_return += reward
+
+    def add_episode(self, states: list[State], rewards: list[Reward]) -> None:
+        """Same as add_step for every step of an episode followed by end_episode."""
+        visits = self._visits
+        for state in states:
+            visits[state] += 1
+        episode_return = self._episode_return
+        for reward in rewards:
+            episode_return += reward
+        self._episode_return = episode_return
+        self.end_episode(len(states) - 1)
+
+    def end_episode(self, length: int) -> None:
+        episode_return = self._episode_return
+        self._episode_return = 0.0
+        self.return_stats.update(episode_return)
+        self.length_stats.update(length)
+        if self.record_episodes:
+            self._returns.append(episode_return)
+            self._lengths.append(length)
+
+    @property
+    def returns(self) -> NDArray:
+        return np.array(self._returns, dtype=np.float64)
+
+    @property
+    def lengths(self) -> NDArray:
+        return np.array(self._lengths, dtype=np.int64)
+
+    @property
+    def visits(self) -> NDArray:
+        return np.array(self._visits, dtype=np.int64)
+
+    def to_data(self) -> dict:
+        return {
+            "record_episodes": self.record_episodes,
+            "returns": self._returns,
+            "lengths": self._lengths,
+            "visits": self._visits,
+            "return_stats": vars(self.return_stats),
+            "length_stats": vars(self.length_stats),
+        }
+
+    @classmethod
+    def from_data(cls, data: dict) -> "EpisodeLog":
+        log = cls(len(data["visits"]), record_episodes=data["record_episodes"])
+        log._returns = list(data["returns"])
+        log._lengths = list(data["lengths"])
+        log._visits = list(data["visits"])
+        log.return_stats = RunningStats(**data["return_stats"])
+        log.length_stats = RunningStats(**data["length_stats"])
+        return log
@@ -0,0 +1,128 @@
+from rl_intro.simulation.log import StepLogColumns, EpisodeLog
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING
+import json
+import os
+import numpy as np
+from rl_intro.utils.logger import logger
+
+if TYPE_CHECKING:
+    from rl_intro.simulation.experiment import ExperimentLog
+
+
+class ChunkedLogWriter:
+    """
+    Streams the step columns of one experiment to a directory as fixed-size chunks of
+    .npy files (one per column) described by a small JSON manifest. The manifest is
+    rewritten atomically after every chunk and only lists complete chunks, so the
+    directory of an interrupted run can still be read up to the last chunk.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, directory: Path, chunk_size: int = 65536):
+        assert chunk_size > 0, "chunk_size must be positive."
+        self.directory = Path(directory)
+        self.chunk_size = chunk_size
+        self.manifest: dict = {}
+
+    def __str__(self):
+        return (
+            f"ChunkedLogWriter(directory={self.directory},chunk_size={self.chunk_size})"
+        )
+
+    def open(self, log: "ExperimentLog") -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.manifest = {
+            "id": log.id,
+            "agent": log.agent,
+            "env": log.env,
+            "experiment_config": asdict(log.experiment_config),
+            "seed": log.seed,
+            "columns": {
+                name: np.dtype(dtype).str
+                for name, dtype in StepLogColumns.DTYPES.items()
+            },
+            "chunks": [],
+            "n_steps": 0,
+            "final_values": None,
+            "episodes": None,
+            "complete": False,
+        }
+        self._write_manifest()
+
+    def write(self, steps: StepLogColumns, final: bool = False) -> None:
+        """Moves all full chunks (and with final=True also the remainder) out of steps."""
+        while len(steps) >= self.chunk_size or (final and len(steps) > 0):
+            self._write_chunk(steps.take(self.chunk_size))
+
+    def close(self, log: "ExperimentLog") -> None:
+        self.write(log.steps, final=True)
+        self.manifest["final_values"] = log.final_values
+        self.manifest["episodes"] = (
+            log.episodes.to_data() if log.episodes is not None else None
+        )
+        self.manifest["complete"] = True
+        self._write_manifest()
+        logger.debug(f"{self} closed after {self.manifest['n_steps']} steps.")
+
+    def _write_chunk(self, columns: dict[str, np.ndarray]) -> None:
+        index = len(self.manifest["chunks"])
+        for name, values in columns.items():
+            np.save(self.directory / _chunk_file(name, index), values)
+        n_rows = len(columns["episode"])
+        self.manifest["chunks"].append({"index": index, "rows": n_rows})
+        self.manifest["n_steps"] += n_rows
+        self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        tmp = self.directory / (self.MANIFEST + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp, self.directory / self.MANIFEST)
+
+
+def _chunk_file(column: str, index: int) -> str:
+    return f"{column}.{index:06d}.npy"
+
+
+def read_chunked_log(directory: Path) -> "ExperimentLog":
+    """
+    Reads a directory written by ChunkedLogWriter, including partially written runs
+    (then final_values is None and the manifest's "complete" flag is False).
+    """
+    from rl_intro.simulation.experiment import ExperimentLog, ExperimentConfig
+
+    directory = Path(directory)
+    with open(directory / ChunkedLogWriter.MANIFEST, "r") as f:
+        manifest = json.load(f)
+    columns = {}
+    for name, dtype in manifest["columns"].items():
+        parts = [
+            np.load(directory / _chunk_file(name, chunk["index"]), mmap_mode="r")
+            for chunk in manifest["chunks"]
+        ]
+        columns[name] = (
+            np.concatenate(parts) if parts else np.empty(0, dtype=np.dtype(dtype))
+        )
+    return ExperimentLog(
+        id=manifest["id"],
+        agent=manifest["agent"],
+        env=manifest["env"],
+        experiment_config=ExperimentConfig(**manifest["experiment_config"]),
+        steps=StepLogColumns.from_arrays(**columns),
+        final_values=manifest["final_values"],
+        seed=manifest["seed"],
+        episodes=(
+            EpisodeLog.from_data(manifest["episodes"]) if manifest["episodes"] else None
+        ),
+    )
+
+
+def read_chunked_batch(log_dir: Path) -> list["ExperimentLog"]:
+    """Reads all cell directories an ExperimentBatch wrote below log_dir, in cell order."""
+    directories = sorted(
+        p.parent for p in Path(log_dir).glob(f"*/{ChunkedLogWriter.MANIFEST}")
+    )
+    return [read_chunked_log(directory) for directory in directories]
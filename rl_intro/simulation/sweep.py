@@ -0,0 +1,243 @@
+from rl_intro.simulation.experiment import (
+    ExperimentBatch,
+    ExperimentConfig,
+    ExperimentLog,
+    AgentRecipe,
+    EnvironmentRecipe,
+)
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Optional, Sequence, Union, TYPE_CHECKING
+import itertools
+import math
+import numpy as np
+from rl_intro.utils.logger import logger
+
+if TYPE_CHECKING:
+    from rl_intro.simulation.cache import ResultCache
+
+
+@dataclass
+class Uniform:
+    """Continuous range for random_configurations, optionally sampled on a log scale."""
+
+    low: float
+    high: float
+    log: bool = False
+
+    def sample(self, rng: np.random.Generator) -> float:
+        if self.log:
+            return float(np.exp(rng.uniform(np.log(self.low), np.log(self.high))))
+        return float(rng.uniform(self.low, self.high))
+
+
+# parameter name -> candidate values (or a range for random sampling)
+ParamSpace = dict[str, Union[Sequence[Any], Uniform]]
+
+
+def grid_configurations(space: ParamSpace) -> list[dict[str, Any]]:
+    """All combinations of the given values, in the order of the space's keys."""
+    assert not any(
+        isinstance(v, Uniform) for v in space.values()
+    ), "Grid search needs discrete values."
+    names = list(space)
+    return [
+        dict(zip(names, values))
+        for values in itertools.product(*(space[name] for name in names))
+    ]
+
+
+def random_configurations(
+    space: ParamSpace, n: int, seed: Optional[int] = None
+) -> list[dict[str, Any]]:
+    """n configurations, each value drawn uniformly from its list or range."""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            name: (
+                values.sample(rng)
+                if isinstance(values, Uniform)
+                else values[rng.integers(len(values))]
+            )
+            for name, values in space.items()
+        }
+        for _ in range(n)
+    ]
+
+
+def apply_configuration(recipe: AgentRecipe, params: dict[str, Any]) -> AgentRecipe:
+    """
+    Copies the recipe with the parameters set on the agent config, or on the policy
+    config when the agent config has no such field (e.g. epsilon).
+    """
+    agent_fields = {f.name for f in fields(recipe.agent_config)}
+    policy_fields = {f.name for f in fields(recipe.policy_config)}
+    agent_params, policy_params = {}, {}
+    for name, value in params.items():
+        if name in agent_fields:
+            agent_params[name] = value
+        elif name in policy_fields:
+            policy_params[name] = value
+        else:
+            raise ValueError(f"Unknown hyperparameter {name}.")
+    return replace(
+        recipe,
+        agent_config=replace(recipe.agent_config, **agent_params),
+        policy_config=replace(recipe.policy_config, **policy_params),
+    )
+
+
+@dataclass
+class SweepTrial:
+    id: int
+    params: dict[str, Any]
+    recipe: AgentRecipe
+    # episode budget -> score reached with that budget
+    scores: dict[int, float] = field(default_factory=dict)
+
+    @property
+    def budget(self) -> int:
+        return max(self.scores, default=0)
+
+    @property
+    def score(self) -> float:
+        return self.scores[self.budget] if self.scores else -math.inf
+
+
+def score_logs(logs: list[ExperimentLog], window: float) -> float:
+    """Mean return over the last window fraction of episodes, averaged over the logs."""
+    scores = []
+    for log in logs:
+        returns = log.episodes.returns
+        n_last = max(1, math.ceil(window * len(returns)))
+        scores.append(returns[-n_last:].mean())
+    return float(np.mean(scores))
+
+
+class SuccessiveHalving:
+    def __init__(
+        self,
+        base_recipe: AgentRecipe,
+        configurations: list[dict[str, Any]],
+        env_recipes: list[EnvironmentRecipe],
+        experiment_config: ExperimentConfig,
+        n_runs: int = 1,
+        min_episodes: int = 100,
+        eta: int = 3,
+        score_window: float = 0.1,
+        workers: Optional[int] = 1,
+        cache: Optional["ResultCache"] = None,
+    ):
+        """
+        Runs all configurations for min_episodes, keeps the best 1/eta of them by score
+        (see score_logs), and repeats with eta times the episodes until the survivors
+        reach experiment_config.n_episodes. Every configuration is run on the same
+        n_runs seeds per environment; all runs of a round share one ExperimentBatch, so
+        workers > 1 spreads them over a process pool.
+        """
+        assert eta >= 2, "eta must be at least 2."
+        assert 0 < min_episodes <= experiment_config.n_episodes
+        self.base_recipe = base_recipe
+        self.env_recipes = env_recipes
+        self.experiment_config = experiment_config
+        self.n_runs = n_runs
+        self.min_episodes = min_episodes
+        self.eta = eta
+        self.score_window = score_window
+        self.workers = workers
+        self.cache = cache
+        self.trials = [
+            SweepTrial(
+                id=i, params=params, recipe=apply_configuration(base_recipe, params)
+            )
+            for i, params in enumerate(configurations)
+        ]
+
+    def __str__(self):
+        return (
+            f"SuccessiveHalving(n_trials={len(self.trials)},n_runs={self.n_runs},"
+            f"min_episodes={self.min_episodes},eta={self.eta})"
+        )
+
+    @property
+    def budgets(self) -> list[int]:
+        budgets = [self.min_episodes]
+        while budgets[-1] < self.experiment_config.n_episodes:
+            budgets.append(
+                min(budgets[-1] * self.eta, self.experiment_config.n_episodes)
+            )
+        return budgets
+
+    def evaluate(self, trials: list[SweepTrial], n_episodes: int) -> None:
+        config = replace(
+            self.experiment_config, n_episodes=n_episodes, log_level="episodes"
+        )
+        batch = ExperimentBatch(
+            [trial.recipe for trial in trials],
+            self.env_recipes,
+            config,
+            self.n_runs,
+            workers=self.workers,
+            cache=self.cache,
+        )
+        logs = batch.run()
+        # batch logs are ordered by run, then environment, then agent recipe
+        for i, trial in enumerate(trials):
+            trial.scores[n_episodes] = score_logs(
+                logs[i :: len(trials)], self.score_window
+            )
+
+    def run(self) -> list[SweepTrial]:
+        """Returns all trials, best first: by episodes reached, then by score."""
+        survivors = list(self.trials)
+        for budget in self.budgets:
+            logger.info(f"{self}: {len(survivors)} trials with {budget} episodes.")
+            self.evaluate(survivors, budget)
+            survivors.sort(key=lambda trial: trial.score, reverse=True)
+            survivors = survivors[: max(1, len(survivors) // self.eta)]
+        return sorted(
+            self.trials, key=lambda trial: (trial.budget, trial.score), reverse=True
+        )
+
+
+# * Example usage
+if __name__ == "__main__":
+    from rl_intro.agent.core import AgentConfig
+    from rl_intro.agent.agent_q_learning import AgentQLearning
+    from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+    from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+
+    w, h = 10, 4
+    env_recipe = EnvironmentRecipe(
+        environment_class=GridWorld,
+        environment_config=GridWorldConfig(
+            width=w,
+            height=h,
+            start_states=[0],
+            terminal_states=[39],
+            cliff_states=[4, 24, 5, 25],
+            wall_states=[2, 12, 22, 17, 27, 37],
+            random_seed=42,
+        ),
+    )
+    base_recipe = AgentRecipe(
+        agent_class=AgentQLearning,
+        agent_config=AgentConfig(n_states=w * h, n_actions=4, random_seed=42),
+        policy_class=EpsilonGreedyPolicy,
+        policy_config=EpsilonGreedyConfig(),
+    )
+    space = {
+        "learning_rate": Uniform(0.01, 1.0, log=True),
+        "discount": [0.9, 0.99, 1.0],
+        "epsilon": Uniform(0.01, 0.3),
+    }
+    sweep = SuccessiveHalving(
+        base_recipe,
+        random_configurations(space, n=27, seed=0),
+        [env_recipe],
+        ExperimentConfig(n_episodes=900, max_steps=200),
+        n_runs=3,
+        min_episodes=100,
+        workers=None,
+    )
+    for trial in sweep.run()[:5]:
+        logger.info(f"{trial.params} -> {trial.score:.2f} after {trial.budget}")
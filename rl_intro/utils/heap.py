@@ -0,0 +1,97 @@
+from typing import Hashable, Optional
+
+
+class IndexedMaxHeap:
+    """
+    Binary max-heap of keys with priorities and a key -> position index, so the priority
+    of a queued key can be raised or lowered in O(log n) instead of queueing it twice.
+    """
+
+    def __init__(self):
+        self._keys: list[Hashable] = []
+        self._priorities: list[float] = []
+        self._positions: dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._positions
+
+    def __repr__(self):
+        return f"IndexedMaxHeap(n={len(self)})"
+
+    def priority(self, key: Hashable) -> Optional[float]:
+        position = self._positions.get(key)
+        return None if position is None else self._priorities[position]
+
+    def peek(self) -> tuple[Hashable, float]:
+        return self._keys[0], self._priorities[0]
+
+    def push(self, key: Hashable, priority: float) -> None:
+        """Inserts the key, or moves it to the new priority if it is already queued."""
+        position = self._positions.get(key)
+        if position is None:
+            self._keys.append(key)
+            self._priorities.append(priority)
+            self._positions[key] = len(self._keys) - 1
+            self._sift_up(len(self._keys) - 1)
+            return
+        old = self._priorities[position]
+        self._priorities[position] = priority
+        if priority > old:
+            self._sift_up(position)
+        elif priority < old:
+            self._sift_down(position)
+
+    def pop(self) -> tuple[Hashable, float]:
+        """Removes and returns the key with the highest priority."""
+        key, priority = self._keys[0], self._priorities[0]
+        self._remove_at(0)
+        return key, priority
+
+    def remove(self, key: Hashable) -> None:
+        self._remove_at(self._positions[key])
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._priorities.clear()
+        self._positions.clear()
+
+    def _remove_at(self, position: int) -> None:
+        last = len(self._keys) - 1
+        self._swap(position, last)
+        del self._positions[self._keys.pop()]
+        self._priorities.pop()
+        if position < last:
+            self._sift_down(position)
+            self._sift_up(position)
+
+    def _swap(self, i: int, j: int) -> None:
+        keys, priorities = self._keys, self._priorities
+        keys[i], keys[j] = keys[j], keys[i]
+        priorities[i], priorities[j] = priorities[j], priorities[i]
+        self._positions[keys[i]] = i
+        self._positions[keys[j]] = j
+
+    def _sift_up(self, position: int) -> None:
+        priorities = self._priorities
+        while position > 0:
+            parent = (position - 1) // 2
+            if priorities[parent] >= priorities[position]:
+                break
+            self._swap(position, parent)
+            position = parent
+
+    def _sift_down(self, position: int) -> None:
+        priorities = self._priorities
+        n = len(priorities)
+        while True:
+            largest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < n and priorities[child] > priorities[largest]:
+                    largest = child
+            if largest == position:
+                break
+            self._swap(position, largest)
+            position = largest
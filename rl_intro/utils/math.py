@@ -13,3 +13,32 @@ def fair_argmax(x: ArrayLike, random_generator: np.random.Generator) -> tuple[in
     max_value = np.max(x)
     max_indices = np.where(x == max_value)[0]
     return random_generator.choice(max_indices), max_value
+
+
+class RunningStats:
+    """
+    Welford's online algorithm for the mean and variance of a stream of values.
+    """
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def __repr__(self):
+        return f"RunningStats(count={self.count},mean={self.mean},std={self.std})"
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1 in the denominator), 0.0 for fewer than two values."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
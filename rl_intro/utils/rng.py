@@ -0,0 +1,232 @@
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+from typing import Any, Optional, Sequence, Union
+
+MASK32 = 0xFFFFFFFF
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+class BufferedGenerator:
+    """
+    Drop-in replacement for the scalar random(), integers() and choice() calls of a
+    numpy Generator. Raw 64-bit values are fetched from the bit generator in blocks and
+    handed out from a list, and the conversions replicate numpy's (53-bit doubles,
+    Lemire's bounded integers on a buffered 32-bit stream), so the values are exactly
+    the ones the wrapped generator would have returned.
+    Use sync() before drawing from the wrapped generator directly again.
+    """
+
+    def __init__(self, generator: np.random.Generator, block_size: int = 4096):
+        assert block_size > 0, "block_size must be positive."
+        self.generator = generator
+        self.bit_generator = generator.bit_generator
+        self.block_size = block_size
+        self._reset()
+
+    def __repr__(self):
+        return f"BufferedGenerator({self.bit_generator.__class__.__name__},block_size={self.block_size})"
+
+    def _reset(self) -> None:
+        # bit generator state before the first block; the blocks run ahead of it
+        self._state = self.bit_generator.state
+        self._has_uint32 = bool(self._state.get("has_uint32", 0))
+        self._uinteger = int(self._state.get("uinteger", 0))
+        self._block: list[int] = []
+        self._index = 0
+        self._fetched = 0
+
+    def _next64(self) -> int:
+        if self._index == len(self._block):
+            self._block = self.bit_generator.random_raw(self.block_size).tolist()
+            self._index = 0
+            self._fetched += self.block_size
+        value = self._block[self._index]
+        self._index += 1
+        return value
+
+    def _next32(self) -> int:
+        # 64-bit draws are split into two 32-bit values, the upper half kept for later
+        if self._has_uint32:
+            self._has_uint32 = False
+            return self._uinteger
+        value = self._next64()
+        self._has_uint32 = True
+        self._uinteger = value >> 32
+        return value & MASK32
+
+    def random(self) -> float:
+        return (self._next64() >> 11) * (1.0 / 9007199254740992.0)
+
+    def integers(self, low: int, high: Optional[int] = None) -> int:
+        if high is None:
+            low, high = 0, low
+        rng = int(high) - int(low) - 1
+        if rng < 0:
+            raise ValueError("high <= low")
+        if rng == 0:
+            return int(low)
+        if rng == MASK32:
+            return int(low) + self._next32()
+        if rng == MASK64:
+            return int(low) + self._next64()
+        rng_excl = rng + 1
+        if rng < MASK32:
+            bits, next_value = 32, self._next32
+        else:
+            bits, next_value = 64, self._next64
+        mask = (1 << bits) - 1
+        m = next_value() * rng_excl
+        leftover = m & mask
+        if leftover < rng_excl:
+            threshold = (mask - rng) % rng_excl
+            while leftover < threshold:
+                m = next_value() * rng_excl
+                leftover = m & mask
+        return int(low) + (m >> bits)
+
+    def choice(self, a: Union[int, Sequence[Any], np.ndarray]) -> Any:
+        if isinstance(a, (int, np.integer)):
+            return self.integers(0, int(a))
+        return a[self.integers(0, len(a))]
+
+    def sync(self) -> np.random.Generator:
+        """
+        Moves the wrapped generator to the position of the values handed out so far and
+        returns it. Prefetched but unused values are discarded.
+        """
+        consumed = self._fetched - (len(self._block) - self._index)
+        self.bit_generator.state = self._state
+        if consumed:
+            if hasattr(self.bit_generator, "advance"):
+                self.bit_generator.advance(consumed)
+            else:
+                self.bit_generator.random_raw(consumed)
+        state = self.bit_generator.state
+        if "has_uint32" in state:
+            state["has_uint32"] = int(self._has_uint32)
+            state["uinteger"] = self._uinteger
+            self.bit_generator.state = state
+        self._reset()
+        return self.generator
+
+
+RandomGenerator = Union[np.random.Generator, BufferedGenerator]
+
+
+class BatchedGenerator:
+    """
+    n independent generators drawn in lockstep: random() and integers(highs) return one
+    value per generator, vectorized over all of them. Like BufferedGenerator, raw values
+    are prefetched in (n, block_size) blocks and converted the way numpy does, so
+    generator i yields exactly the values generators[i].random() and
+    generators[i].integers(highs[i]) would have. Python only loops over the generators
+    when their blocks run out, once every block_size draws.
+    Use sync() before drawing from the wrapped generators directly again.
+    """
+
+    def __init__(self, generators: Sequence[RandomGenerator], block_size: int = 256):
+        assert block_size > 0, "block_size must be positive."
+        self.generators = [
+            g.sync() if isinstance(g, BufferedGenerator) else g for g in generators
+        ]
+        self.bit_generators = [g.bit_generator for g in self.generators]
+        self.block_size = block_size
+        self._reset()
+
+    def __repr__(self):
+        return f"BatchedGenerator(n={len(self)},block_size={self.block_size})"
+
+    def __len__(self) -> int:
+        return len(self.generators)
+
+    def _reset(self) -> None:
+        n = len(self)
+        self._states = [bit_generator.state for bit_generator in self.bit_generators]
+        self._has_uint32 = np.array(
+            [bool(state.get("has_uint32", 0)) for state in self._states]
+        )
+        self._uinteger = np.array(
+            [int(state.get("uinteger", 0)) for state in self._states], dtype=np.uint64
+        )
+        self._block = np.zeros((n, self.block_size), dtype=np.uint64)
+        # all blocks start exhausted and are fetched on the first draw
+        self._index = np.full(n, self.block_size)
+        self._fetched = np.zeros(n, dtype=np.int64)
+
+    def _next64(self, rows: NDArray) -> NDArray:
+        for i in rows[self._index[rows] == self.block_size].tolist():
+            self._block[i] = self.bit_generators[i].random_raw(self.block_size)
+            self._index[i] = 0
+            self._fetched[i] += self.block_size
+        values = self._block[rows, self._index[rows]]
+        self._index[rows] += 1
+        return values
+
+    def _next32(self, rows: NDArray) -> NDArray:
+        # same splitting of 64-bit draws as BufferedGenerator._next32, per row
+        values = np.empty(len(rows), dtype=np.uint64)
+        stored = self._has_uint32[rows]
+        values[stored] = self._uinteger[rows[stored]]
+        fresh = rows[~stored]
+        raw = self._next64(fresh)
+        values[~stored] = raw & np.uint64(MASK32)
+        self._uinteger[fresh] = raw >> np.uint64(32)
+        self._has_uint32[rows] = ~stored
+        return values
+
+    def random(self) -> NDArray:
+        raw = self._next64(np.arange(len(self)))
+        return (raw >> np.uint64(11)) * (1.0 / 9007199254740992.0)
+
+    def integers(self, highs: ArrayLike) -> NDArray:
+        """One integer in [0, highs[i]) per generator, for 0 < highs[i] <= 2**32."""
+        highs = np.broadcast_to(np.asarray(highs, dtype=np.int64), (len(self),))
+        assert (highs > 0).all() and (highs <= MASK32 + 1).all(), "Invalid highs."
+        out = np.zeros(len(self), dtype=np.int64)
+        # a single choice consumes nothing, as in numpy
+        rows = np.flatnonzero(highs > 1)
+        full = rows[highs[rows] == MASK32 + 1]
+        out[full] = self._next32(full)
+        rows = rows[highs[rows] <= MASK32]
+        n = highs[rows].astype(np.uint64)
+        # Lemire's method with rejection, redrawing only the rejected rows
+        m = self._next32(rows) * n
+        threshold = (np.uint64(MASK32) - (n - np.uint64(1))) % n
+        rejected = np.flatnonzero((m & np.uint64(MASK32)) < threshold)
+        while len(rejected):
+            m[rejected] = self._next32(rows[rejected]) * n[rejected]
+            still = (m[rejected] & np.uint64(MASK32)) < threshold[rejected]
+            rejected = rejected[still]
+        out[rows] = m >> np.uint64(32)
+        return out
+
+    def sync(self) -> list[np.random.Generator]:
+        """
+        Moves each wrapped generator to the position of the values handed out so far
+        and returns them. Prefetched but unused values are discarded.
+        """
+        for i, bit_generator in enumerate(self.bit_generators):
+            consumed = int(self._fetched[i]) - (self.block_size - int(self._index[i]))
+            bit_generator.state = self._states[i]
+            if consumed > 0:
+                if hasattr(bit_generator, "advance"):
+                    bit_generator.advance(consumed)
+                else:
+                    bit_generator.random_raw(consumed)
+            state = bit_generator.state
+            if "has_uint32" in state:
+                state["has_uint32"] = int(self._has_uint32[i])
+                state["uinteger"] = int(self._uinteger[i])
+                bit_generator.state = state
+        self._reset()
+        return self.generators
+
+
+def make_generator(
+    seed: Optional[int], block_size: Optional[int] = None
+) -> RandomGenerator:
+    """default_rng(seed), wrapped in a BufferedGenerator if block_size is given."""
+    generator = np.random.default_rng(seed)
+    if block_size is None:
+        return generator
+    return BufferedGenerator(generator, block_size)
@@ -0,0 +1,129 @@
+import pytest
+import numpy as np
+from rl_intro.agent.agent_batched import (
+    BatchedAgentSarsa,
+    BatchedAgentQLearning,
+    BatchedAgentExpectedSarsa,
+)
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.agent_expected_sarsa import AgentExpectedSarsa
+from rl_intro.agent.core import AgentConfig, PolicyConfig
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig, RandomPolicy
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation import experiment
+from rl_intro.simulation.experiment import (
+    AgentRecipe,
+    EnvironmentRecipe,
+    ExperimentBatch,
+    ExperimentConfig,
+)
+
+SEEDS = [0, 1, 2, 7, 42]
+MAX_STEPS = 50
+
+
+def make_env(seed: int) -> GridWorld:
+    return GridWorld(
+        GridWorldConfig(
+            width=6,
+            height=4,
+            start_states=[0, 6],
+            terminal_states=[23],
+            cliff_states=[19, 20, 21, 22],
+            wall_states=[8, 14],
+            random_seed=seed,
+        )
+    )
+
+
+def make_config() -> AgentConfig:
+    return AgentConfig(n_states=24, n_actions=4, learning_rate=0.3, discount=0.95)
+
+
+def run_batch(agent_class, policy_class, policy_config, batched, log_level="steps"):
+    env_config = make_env(0).config
+    batch = ExperimentBatch(
+        [AgentRecipe(agent_class, policy_class, make_config(), policy_config)],
+        [EnvironmentRecipe(GridWorld, env_config)],
+        ExperimentConfig(n_episodes=40, max_steps=MAX_STEPS, log_level=log_level),
+        n_runs=len(SEEDS),
+        batched=batched,
+    )
+    return batch.run()
+
+
+def assert_logs_equal(logs, reference):
+    assert len(logs) == len(reference)
+    for log, expected in zip(logs, reference):
+        assert (log.id, log.seed, log.agent, log.env) == (
+            expected.id,
+            expected.seed,
+            expected.agent,
+            expected.env,
+        )
+        assert log.steps == expected.steps
+        assert log.final_values == expected.final_values
+        if expected.episodes is not None:
+            assert log.episodes.to_data() == expected.episodes.to_data()
+
+
+@pytest.mark.parametrize(
+    "agent_class", [AgentSarsa, AgentQLearning, AgentExpectedSarsa]
+)
+def test_experiment_batch_runs_seeds_batched(agent_class):
+    config = EpsilonGreedyConfig(epsilon=0.1)
+    reference = run_batch(agent_class, EpsilonGreedyPolicy, config, batched=False)
+    logs = run_batch(agent_class, EpsilonGreedyPolicy, config, batched=True)
+    assert_logs_equal(logs, reference)
+    assert len({len(log.steps) for log in logs}) > 1
+
+
+@pytest.mark.parametrize("log_level", ["episodes", "none"])
+def test_batched_random_policy_and_episode_logs(log_level):
+    args = (AgentQLearning, RandomPolicy, PolicyConfig())
+    reference = run_batch(*args, batched=False, log_level=log_level)
+    logs = run_batch(*args, batched=True, log_level=log_level)
+    assert_logs_equal(logs, reference)
+
+
+def test_batch_runs_unsupported_cells_one_by_one(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        experiment, "run_batched_cells", lambda cells: calls.append(cells) or []
+    )
+    config = make_config()
+    config.greedy_cache = True
+    batch = ExperimentBatch(
+        [AgentRecipe(AgentSarsa, RandomPolicy, config, PolicyConfig())],
+        [EnvironmentRecipe(GridWorld, make_env(0).config)],
+        ExperimentConfig(n_episodes=2, max_steps=5),
+        n_runs=2,
+        batched=True,
+    )
+    assert len(batch.run()) == 2 and not calls
+
+
+def test_batched_q_shape_and_greedy():
+    agent = BatchedAgentSarsa(
+        make_config(), EpsilonGreedyPolicy(EpsilonGreedyConfig()), SEEDS
+    )
+    assert agent.q.shape == (len(SEEDS), 24, 4)
+    agent.q[1, 3, 2] = 5.0
+    assert agent.get_greedy_actions().shape == (len(SEEDS), 24)
+    assert agent.get_greedy_actions()[1, 3] == 2
+    assert agent.get_greedy_values()[1, 3] == 5.0
+
+
+def test_batched_does_not_learn_without_last_state():
+    agent = BatchedAgentQLearning(
+        make_config(), EpsilonGreedyPolicy(EpsilonGreedyConfig()), SEEDS
+    )
+    n = len(SEEDS)
+    states = np.arange(n)
+    agent.step(states, None, np.zeros(n, dtype=bool))
+    # every seed terminates, so none has a last state for the next reward
+    agent.step(states + 1, np.ones(n), np.ones(n, dtype=bool))
+    q = agent.q.copy()
+    agent.step(states + 2, np.full(n, 5.0), np.zeros(n, dtype=bool))
+    np.testing.assert_array_equal(agent.q, q)
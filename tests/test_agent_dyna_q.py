@@ -0,0 +1,62 @@
+import numpy as np
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.agent_dyna_q import AgentDynaQ, DynaConfig
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+
+
+def maze() -> GridWorld:
+    return GridWorld(
+        GridWorldConfig(
+            width=9,
+            height=6,
+            start_states=[18],
+            terminal_states=[8],
+            cliff_states=[],
+            wall_states=[11, 20, 29, 7, 16, 25, 41],
+            random_seed=0,
+        )
+    )
+
+
+def run(agent, n_episodes=20):
+    config = ExperimentConfig(n_episodes, max_steps=500, log_level="episodes")
+    return Experiment(agent, maze(), config).run()
+
+
+def test_no_planning_is_q_learning():
+    config = DynaConfig(n_states=54, n_actions=4, random_seed=3, n_planning=0)
+    dyna = AgentDynaQ(config, EpsilonGreedyPolicy(EpsilonGreedyConfig()))
+    q_learning = AgentQLearning(
+        AgentConfig(n_states=54, n_actions=4, random_seed=3),
+        EpsilonGreedyPolicy(EpsilonGreedyConfig()),
+    )
+    dyna_log, q_log = run(dyna), run(q_learning)
+    np.testing.assert_array_equal(dyna_log.episodes.lengths, q_log.episodes.lengths)
+    np.testing.assert_array_equal(dyna.q, q_learning.q)
+
+
+def test_model_records_transitions():
+    config = DynaConfig(n_states=54, n_actions=4, random_seed=3, n_planning=5)
+    agent = AgentDynaQ(config, EpsilonGreedyPolicy(EpsilonGreedyConfig()))
+    run(agent, n_episodes=3)
+    assert agent.n_seen == agent.model_seen.sum()
+    states, actions = np.divmod(agent.seen_pairs[: agent.n_seen], 4)
+    assert agent.model_seen[states, actions].all()
+    # the transitions into the goal are the only terminal ones
+    terminal = agent.model_terminal[agent.model_seen]
+    assert (agent.model_next_state[agent.model_seen][terminal] == 8).all()
+    assert agent.memory_footprint()["model"] > 0
+
+
+def test_planning_improves_sample_efficiency():
+    lengths = {}
+    for n_planning in (0, 50):
+        config = DynaConfig(
+            n_states=54, n_actions=4, random_seed=1, n_planning=n_planning
+        )
+        agent = AgentDynaQ(config, EpsilonGreedyPolicy(EpsilonGreedyConfig()))
+        lengths[n_planning] = run(agent, n_episodes=10).episodes.lengths
+    assert lengths[50][1:].sum() < lengths[0][1:].sum() / 2
@@ -0,0 +1,94 @@
+import pytest
+import numpy as np
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.agent_sarsa_lambda import AgentSarsaLambda
+from rl_intro.agent.agent_q_lambda import AgentQLambda
+from rl_intro.agent.traces import TraceAgentConfig, EligibilityTraces
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig, StateKind
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+from tests.test_utils import DummyAgent
+
+
+def goal_reward(state, kind):
+    return 1.0 if kind == StateKind.TERMINAL.value else 0.0
+
+
+def corridor(length: int = 12, seed: int = 0) -> GridWorld:
+    return GridWorld(
+        GridWorldConfig(
+            width=length,
+            height=1,
+            start_states=[0],
+            terminal_states=[length - 1],
+            cliff_states=[],
+            wall_states=[],
+            reward_function=goal_reward,
+            random_seed=seed,
+        )
+    )
+
+
+def run(agent_class, config, n_episodes=20, epsilon=0.1, max_steps=100):
+    agent = agent_class(config, EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon)))
+    env = corridor(seed=config.random_seed)
+    log = Experiment(agent, env, ExperimentConfig(n_episodes, max_steps)).run()
+    return agent, log
+
+
+@pytest.mark.parametrize(
+    "trace_class, one_step_class",
+    [(AgentSarsaLambda, AgentSarsa), (AgentQLambda, AgentQLearning)],
+)
+def test_zero_lambda_is_one_step(trace_class, one_step_class):
+    config = TraceAgentConfig(
+        n_states=12, n_actions=4, learning_rate=0.5, random_seed=1, trace_decay=0.0
+    )
+    agent, log = run(trace_class, config)
+    one_step_agent, one_step_log = run(
+        one_step_class,
+        AgentConfig(n_states=12, n_actions=4, learning_rate=0.5, random_seed=1),
+    )
+    assert log.steps == one_step_log.steps
+    np.testing.assert_array_equal(agent.q, one_step_agent.q)
+
+
+@pytest.mark.parametrize("trace_type", ["accumulating", "replacing"])
+def test_traces_propagate_reward_along_the_path(trace_type):
+    config = TraceAgentConfig(
+        n_states=12,
+        n_actions=4,
+        learning_rate=0.5,
+        random_seed=2,
+        trace_decay=0.99,
+        trace_type=trace_type,
+    )
+    agent, _ = run(AgentSarsaLambda, config, n_episodes=1, epsilon=0.0, max_steps=1000)
+    one_step_agent, _ = run(
+        AgentSarsa, config, n_episodes=1, epsilon=0.0, max_steps=1000
+    )
+    # the goal reward reaches every state on the way, not just the one before the goal
+    assert np.count_nonzero(one_step_agent.get_greedy_values()) == 1
+    assert np.count_nonzero(agent.get_greedy_values()[:-1]) == 11
+    assert len(agent.traces) == 0
+
+
+def test_traces_are_pruned_below_threshold():
+    agent = DummyAgent(n_states=3, n_actions=2)
+    traces = EligibilityTraces("accumulating", threshold=0.1)
+    traces.visit(0, 1)
+    traces.visit(0, 1)
+    traces.visit(2, 0)
+    traces.update(agent, step=0.5, decay=0.5)
+    np.testing.assert_array_equal(agent.q, [[0.0, 1.0], [0.0, 0.0], [0.5, 0.0]])
+    assert traces.traces == {(0, 1): 1.0, (2, 0): 0.5}
+    for _ in range(3):
+        traces.update(agent, step=0.0, decay=0.5)
+    assert traces.traces == {(0, 1): 0.125}
+
+    replacing = EligibilityTraces("replacing", threshold=0.1)
+    replacing.visit(0, 1)
+    replacing.visit(0, 1)
+    assert replacing.traces == {(0, 1): 1.0}
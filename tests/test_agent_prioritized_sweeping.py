@@ -0,0 +1,65 @@
+import numpy as np
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.agent_prioritized_sweeping import (
+    AgentPrioritizedSweeping,
+    PrioritizedSweepingConfig,
+)
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+
+
+def maze() -> GridWorld:
+    return GridWorld(
+        GridWorldConfig(
+            width=9,
+            height=6,
+            start_states=[18],
+            terminal_states=[8],
+            cliff_states=[],
+            wall_states=[11, 20, 29, 7, 16, 25, 41],
+            random_seed=0,
+        )
+    )
+
+
+def run(agent, n_episodes=20):
+    config = ExperimentConfig(n_episodes, max_steps=500, log_level="episodes")
+    return Experiment(agent, maze(), config).run()
+
+
+def test_predecessors_match_model():
+    config = PrioritizedSweepingConfig(
+        n_states=54, n_actions=4, random_seed=3, n_planning=5
+    )
+    agent = AgentPrioritizedSweeping(config, EpsilonGreedyPolicy(EpsilonGreedyConfig()))
+    run(agent, n_episodes=5)
+    expected: dict[int, set[int]] = {}
+    for pair in agent.seen_pairs[: agent.n_seen].tolist():
+        state, action = divmod(pair, 4)
+        expected.setdefault(int(agent.model_next_state[state, action]), set()).add(pair)
+    actual = {state: pairs for state, pairs in agent.predecessors.items() if pairs}
+    assert actual == expected
+    # queued pairs are all above the threshold
+    assert all(
+        agent.queue.priority(pair) > config.priority_threshold
+        for pair in agent.queue._keys
+    )
+
+
+def test_learns_faster_than_q_learning():
+    policy_config = EpsilonGreedyConfig()
+    sweeping = AgentPrioritizedSweeping(
+        PrioritizedSweepingConfig(
+            n_states=54, n_actions=4, random_seed=1, n_planning=20
+        ),
+        EpsilonGreedyPolicy(policy_config),
+    )
+    q_learning = AgentQLearning(
+        AgentConfig(n_states=54, n_actions=4, random_seed=1),
+        EpsilonGreedyPolicy(policy_config),
+    )
+    sweeping_lengths = run(sweeping, n_episodes=10).episodes.lengths
+    q_lengths = run(q_learning, n_episodes=10).episodes.lengths
+    assert sweeping_lengths[1:].sum() < q_lengths[1:].sum() / 2
@@ -71,3 +71,18 @@ def test_step_updates_q():
     )
     assert np.isclose(agent.q[state0, 0], expected)
     assert action == 0
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_compact_q_dtype(dtype):
+    config = AgentConfig(n_states=3, n_actions=2, random_seed=42, dtype=dtype)
+    agent = AgentSarsa(config, DummyPolicy(PolicyConfig()))
+    assert agent.q.dtype == np.dtype(dtype)
+    assert agent.memory_footprint() == {"q": 6 * np.dtype(dtype).itemsize}
+    agent.last_state = 0
+    agent.last_action = 0
+    agent.q[1, 0] = 2.0
+    agent.learn(state=1, reward=1.0, terminal=False, action=0)
+    # computed in float64, rounded once when stored
+    expected = 0.1 * (1.0 + 1.0 * 2.0 - 0.0)
+    assert agent.q[0, 0] == np.array(expected, dtype=dtype)
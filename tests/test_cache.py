@@ -0,0 +1,129 @@
+import os
+from dataclasses import replace
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation import experiment
+from rl_intro.simulation.experiment import (
+    ExperimentBatch,
+    ExperimentConfig,
+    ExperimentCell,
+    AgentRecipe,
+    EnvironmentRecipe,
+    run_experiment_cell,
+)
+from rl_intro.simulation.cache import ResultCache, cell_key
+
+
+def make_cell(seed: int = 0, random_seed: int = 0, **agent_kwargs) -> ExperimentCell:
+    agent_recipe = AgentRecipe(
+        agent_class=AgentSarsa,
+        agent_config=AgentConfig(
+            n_states=12, n_actions=4, random_seed=random_seed, **agent_kwargs
+        ),
+        policy_class=EpsilonGreedyPolicy,
+        policy_config=EpsilonGreedyConfig(epsilon=0.1),
+    )
+    env_recipe = EnvironmentRecipe(
+        environment_class=GridWorld,
+        environment_config=GridWorldConfig(
+            width=4,
+            height=3,
+            start_states=[0],
+            terminal_states=[11],
+            cliff_states=[9, 10],
+            wall_states=[5],
+            random_seed=random_seed,
+        ),
+    )
+    return ExperimentCell(
+        id=seed,
+        seed=seed,
+        agent_recipe=agent_recipe,
+        env_recipe=env_recipe,
+        experiment_config=ExperimentConfig(n_episodes=10, max_steps=30),
+    )
+
+
+def test_cell_key_is_stable_and_content_addressed():
+    cell = make_cell()
+    assert cell_key(cell) == cell_key(make_cell())
+    assert cell_key(cell) != cell_key(make_cell(seed=1))
+    assert cell_key(cell) != cell_key(make_cell(learning_rate=0.2))
+    other_policy = replace(
+        cell.agent_recipe, policy_config=EpsilonGreedyConfig(epsilon=0.2)
+    )
+    assert cell_key(cell) != cell_key(replace(cell, agent_recipe=other_policy))
+    # the recipe's own seed is overridden by the cell seed and does not matter
+    assert cell_key(cell) == cell_key(make_cell(random_seed=123))
+
+
+def test_cell_key_depends_on_reward_function():
+    def flat_reward(state, kind):
+        return -1.0
+
+    cell = make_cell()
+    config = replace(cell.env_recipe.environment_config, reward_function=flat_reward)
+    env_recipe = replace(cell.env_recipe, environment_config=config)
+    assert cell_key(cell) != cell_key(replace(cell, env_recipe=env_recipe))
+
+
+def test_cache_roundtrip_and_lru_eviction(tmp_path):
+    log = run_experiment_cell(make_cell())
+    cache = ResultCache(tmp_path)
+    assert cache.get("a") is None
+    cache.put("a", log)
+    assert "a" in cache
+    assert cache.get("a").steps == log.steps
+
+    cache.max_bytes = 2 * cache.size_bytes
+    cache.put("b", log)
+    os.utime(cache._path("b"), ns=(0, 0))
+    os.utime(cache._path("a"), ns=(1, 1))
+    cache.get("b")  # refreshes b, so a is now the least recently used entry
+    cache.put("c", log)
+    assert len(cache) == 2
+    assert "a" not in cache and "b" in cache and "c" in cache
+
+
+def test_batch_resumes_from_cache(tmp_path, monkeypatch):
+    cell = make_cell()
+    batch_args = ([cell.agent_recipe], [cell.env_recipe], cell.experiment_config)
+    cache = ResultCache(tmp_path)
+    ExperimentBatch(*batch_args, n_runs=2, cache=cache).run()
+    assert len(cache) == 2
+
+    ran = []
+    monkeypatch.setattr(
+        experiment,
+        "run_experiment_cell",
+        lambda cell: ran.append(cell.id) or run_experiment_cell(cell),
+    )
+    resumed = ExperimentBatch(*batch_args, n_runs=3, cache=cache).run()
+    assert ran == [2]
+    assert len(cache) == 3
+    assert [log.id for log in resumed] == [0, 1, 2]
+    for log in resumed:
+        assert log.steps == run_experiment_cell(make_cell(log.id)).steps
+
+
+def make_reward(step_reward: float):
+    def reward(state, kind):
+        return step_reward
+
+    return reward
+
+
+def test_cell_key_depends_on_captured_values():
+    cell = make_cell()
+
+    def with_reward(reward_function):
+        config = replace(
+            cell.env_recipe.environment_config, reward_function=reward_function
+        )
+        env_recipe = replace(cell.env_recipe, environment_config=config)
+        return cell_key(replace(cell, env_recipe=env_recipe))
+
+    assert with_reward(make_reward(-1.0)) == with_reward(make_reward(-1.0))
+    assert with_reward(make_reward(-100.0)) != with_reward(make_reward(-1.0))
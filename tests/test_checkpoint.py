@@ -0,0 +1,178 @@
+import tracemalloc
+import numpy as np
+import pytest
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.agent import checkpoint
+from rl_intro.agent.checkpoint import load_checkpoint, read_metadata, save_checkpoint
+from rl_intro.agent.q_table import SparseQTable
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+
+
+def cliff_walk() -> GridWorld:
+    return GridWorld(
+        GridWorldConfig(
+            width=12,
+            height=4,
+            start_states=[36],
+            terminal_states=[47],
+            cliff_states=list(range(37, 47)),
+            wall_states=[],
+            random_seed=0,
+        )
+    )
+
+
+def make_agent(**kwargs) -> AgentQLearning:
+    return AgentQLearning(
+        AgentConfig(n_states=48, n_actions=4, random_seed=7, **kwargs),
+        EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.2)),
+    )
+
+
+def make_config(**kwargs) -> ExperimentConfig:
+    return ExperimentConfig(n_episodes=20, max_steps=50, log_level="steps", **kwargs)
+
+
+@pytest.mark.parametrize("rng_block_size", [None, 64])
+def test_round_trip(tmp_path, rng_block_size):
+    agent = make_agent(rng_block_size=rng_block_size)
+    Experiment(agent, cliff_walk(), make_config()).run_episodes(5)
+    agent.last_state, agent.last_action = np.int64(3), 1
+    save_checkpoint(agent, tmp_path / "agent", episode=5)
+
+    loaded = load_checkpoint(tmp_path / "agent")
+    assert type(loaded) is AgentQLearning
+    assert loaded.config == agent.config
+    assert loaded.policy.config == agent.policy.config
+    np.testing.assert_array_equal(loaded.q, agent.q)
+    assert (loaded.last_state, loaded.last_action) == (3, 1)
+    draws = [agent.random_generator.random() for _ in range(10)]
+    assert [loaded.random_generator.random() for _ in range(10)] == draws
+    assert read_metadata(tmp_path / "agent")["metadata"] == {"episode": 5}
+    assert not (tmp_path / "agent.tmp").exists()
+
+
+def test_memory_mapped_load(tmp_path):
+    agent = make_agent()
+    agent.q[:] = np.arange(agent.q.size).reshape(agent.q.shape)
+    save_checkpoint(agent, tmp_path / "agent")
+
+    loaded = load_checkpoint(tmp_path / "agent", mmap_mode="r")
+    assert isinstance(loaded.q, np.memmap)
+    assert not loaded.q.flags.writeable
+    np.testing.assert_array_equal(loaded.q, agent.q)
+    np.testing.assert_array_equal(loaded.get_greedy_values(), agent.get_greedy_values())
+
+    # copy-on-write maps can keep learning without touching the file
+    writable = load_checkpoint(tmp_path / "agent", mmap_mode="c")
+    Experiment(writable, cliff_walk(), make_config()).run_episodes(2)
+    np.testing.assert_array_equal(load_checkpoint(tmp_path / "agent").q, agent.q)
+
+
+@pytest.mark.parametrize("fused", [False, True])
+@pytest.mark.parametrize(
+    "agent_kwargs", [{}, {"q_backend": "sparse"}, {"replay_batch_size": 8}]
+)
+def test_resume_matches_uninterrupted_run(tmp_path, fused, agent_kwargs):
+    reference = Experiment(
+        make_agent(**agent_kwargs), cliff_walk(), make_config(fused=fused)
+    )
+    reference.run_episodes(20)
+
+    first = Experiment(
+        make_agent(**agent_kwargs),
+        cliff_walk(),
+        make_config(fused=fused, checkpoint_every=10),
+        checkpoint_dir=tmp_path,
+    )
+    first.run_episodes(10)
+    assert (tmp_path / "episode000010").is_dir()
+    # the environment is not part of the checkpoint, so hand over the same one
+    resumed = Experiment.from_checkpoint(
+        tmp_path / "episode000010", first.env, make_config(fused=fused)
+    )
+    assert resumed.episode_count == 10
+    resumed.run_episodes(10)
+
+    np.testing.assert_array_equal(
+        np.asarray(resumed.agent.q), np.asarray(reference.agent.q)
+    )
+    assert list(first.log.steps) + list(resumed.log.steps) == list(reference.log.steps)
+
+
+@pytest.mark.parametrize("fused", [False, True])
+def test_checkpoint_every(tmp_path, fused):
+    experiment = Experiment(
+        make_agent(),
+        cliff_walk(),
+        make_config(fused=fused, checkpoint_every=4),
+        checkpoint_dir=tmp_path,
+    )
+    experiment.run_episodes(10)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "episode000004",
+        "episode000008",
+    ]
+    np.testing.assert_array_equal(
+        load_checkpoint(tmp_path / "episode000008").q.shape, experiment.agent.q.shape
+    )
+
+
+def test_sparse_round_trip(tmp_path):
+    agent = make_agent(q_backend="sparse")
+    Experiment(agent, cliff_walk(), make_config()).run_episodes(5)
+    save_checkpoint(agent, tmp_path / "agent")
+
+    loaded = load_checkpoint(tmp_path / "agent")
+    assert isinstance(loaded.q, SparseQTable)
+    np.testing.assert_array_equal(loaded.q.states, agent.q.states)
+    np.testing.assert_array_equal(np.asarray(loaded.q), np.asarray(agent.q))
+    with pytest.raises(AssertionError, match="memory-mapped"):
+        load_checkpoint(tmp_path / "agent", mmap_mode="r")
+
+
+def test_interrupted_save_keeps_previous_checkpoint(tmp_path, monkeypatch):
+    agent = make_agent()
+    save_checkpoint(agent, tmp_path / "agent", episode=1)
+
+    def crash(source, target):
+        raise OSError("crashed while swapping")
+
+    monkeypatch.setattr(checkpoint.os, "replace", crash)
+    agent.q[:] = 1.0
+    with pytest.raises(OSError):
+        save_checkpoint(agent, tmp_path / "agent", episode=2)
+    monkeypatch.undo()
+
+    assert read_metadata(tmp_path / "agent")["metadata"] == {"episode": 1}
+    np.testing.assert_array_equal(load_checkpoint(tmp_path / "agent").q, 0.0)
+    save_checkpoint(agent, tmp_path / "agent", episode=2)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["agent"]
+    np.testing.assert_array_equal(load_checkpoint(tmp_path / "agent").q, 1.0)
+
+
+def test_memory_mapped_load_allocates_no_table(tmp_path):
+    agent = AgentQLearning(
+        AgentConfig(n_states=200_000, n_actions=4, random_seed=7),
+        EpsilonGreedyPolicy(EpsilonGreedyConfig()),
+    )
+    save_checkpoint(agent, tmp_path / "agent")
+    tracemalloc.start()
+    try:
+        loaded = load_checkpoint(tmp_path / "agent", mmap_mode="r")
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert isinstance(loaded.q, np.memmap)
+    assert peak < agent.q.nbytes / 10
+
+
+def test_load_rejects_mismatched_dtype(tmp_path):
+    agent = make_agent()
+    save_checkpoint(agent, tmp_path / "agent")
+    np.save(tmp_path / "agent" / checkpoint.Q_FILE, agent.q.astype(np.float32))
+    with pytest.raises(AssertionError, match="dtype"):
+        load_checkpoint(tmp_path / "agent")
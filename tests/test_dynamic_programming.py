@@ -0,0 +1,103 @@
+import pytest
+import numpy as np
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.evaluation.dynamic_programming import (
+    DENSE_SOLVE_LIMIT,
+    bellman_q,
+    policy_evaluation,
+    policy_iteration,
+    regret,
+    value_error,
+    value_iteration,
+)
+
+
+def cliff_walk() -> GridWorld:
+    return GridWorld(
+        GridWorldConfig(
+            width=12,
+            height=4,
+            start_states=[36],
+            terminal_states=[47],
+            cliff_states=list(range(37, 47)),
+            wall_states=[],
+            random_seed=0,
+        )
+    )
+
+
+def test_value_and_policy_iteration_agree():
+    env = cliff_walk()
+    for discount in (1.0, 0.9):
+        vi = value_iteration(env, discount)
+        pi = policy_iteration(env, discount)
+        assert value_error(pi.values, vi.values) < 1e-6
+        np.testing.assert_allclose(vi.q, pi.q, atol=1e-6)
+    # 13 steps along the cliff: 12 times -1, then +1 for the goal
+    assert value_iteration(env).values[36] == -11.0
+
+
+@pytest.mark.parametrize("method", ["dense", "sparse"])
+def test_policy_evaluation_satisfies_bellman_equation(method):
+    env = cliff_walk()
+    agent = AgentQLearning(
+        AgentConfig(n_states=48, n_actions=4, random_seed=0),
+        EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.2)),
+    )
+    agent.q[:] = np.random.default_rng(0).random((48, 4))
+    distribution = agent.policy.get_distribution(agent)
+    values = policy_evaluation(env, distribution, discount=0.95, method=method)
+    expected = (distribution * bellman_q(env, values, 0.95)).sum(axis=1)
+    np.testing.assert_allclose(values, expected, atol=1e-9)
+
+    optimal = value_iteration(env, discount=0.95).values
+    assert regret(env, distribution, optimal, discount=0.95) > 0.0
+    greedy = np.eye(4)[value_iteration(env, discount=0.95).policy]
+    assert abs(regret(env, greedy, optimal, discount=0.95)) < 1e-6
+
+
+def test_unsolvable_states_are_nan():
+    # the right column is walled off from the goal in the left column
+    env = GridWorld(
+        GridWorldConfig(
+            width=3,
+            height=2,
+            start_states=[0],
+            terminal_states=[3],
+            cliff_states=[],
+            wall_states=[1, 4],
+            random_seed=0,
+        )
+    )
+    for solution in (value_iteration(env), policy_iteration(env)):
+        assert np.isnan(solution.values[[1, 2, 4, 5]]).all()
+        assert solution.values[0] == 1.0
+    assert np.isnan(value_iteration(env, discount=0.9).values[[1, 4]]).all()
+    assert np.isfinite(value_iteration(env, discount=0.9).values[[2, 5]]).all()
+
+
+def test_sparse_solve_matches_dense_solve():
+    # large enough for "auto" to pick the iterative solve
+    width, height = 30, 20
+    env = GridWorld(
+        GridWorldConfig(
+            width=width,
+            height=height,
+            start_states=[width * (height - 1)],
+            terminal_states=[width * height - 1],
+            cliff_states=list(range(width * (height - 1) + 1, width * height - 1)),
+            wall_states=[],
+            random_seed=0,
+        )
+    )
+    assert width * height > DENSE_SOLVE_LIMIT
+    q = np.random.default_rng(0).random((width * height, 4))
+    best = q == q.max(axis=1, keepdims=True)
+    distribution = 0.8 * best / best.sum(axis=1, keepdims=True) + 0.05
+    for discount in (1.0, 0.9):
+        dense = policy_evaluation(env, distribution, discount, method="dense")
+        auto = policy_evaluation(env, distribution, discount)
+        np.testing.assert_allclose(auto, dense, rtol=1e-9)
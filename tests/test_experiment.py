@@ -0,0 +1,138 @@
+import pytest
+import numpy as np
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import (
+    Experiment,
+    ExperimentBatch,
+    ExperimentConfig,
+    AgentRecipe,
+    EnvironmentRecipe,
+)
+from rl_intro.evaluation.analyze import analyze_experiment
+
+
+@pytest.fixture
+def env_config() -> GridWorldConfig:
+    return GridWorldConfig(
+        width=5,
+        height=3,
+        start_states=[0, 5],
+        terminal_states=[14],
+        cliff_states=[11, 12, 13],
+        wall_states=[7],
+        random_seed=42,
+    )
+
+
+@pytest.fixture
+def agent_config() -> AgentConfig:
+    return AgentConfig(
+        n_states=15, n_actions=4, learning_rate=0.3, discount=1.0, random_seed=42
+    )
+
+
+def make_recipes(agent_config, env_config):
+    agent_recipes = [
+        AgentRecipe(
+            agent_class=agent_class,
+            agent_config=agent_config,
+            policy_class=EpsilonGreedyPolicy,
+            policy_config=EpsilonGreedyConfig(epsilon=0.1),
+        )
+        for agent_class in (AgentSarsa, AgentQLearning)
+    ]
+    env_recipes = [
+        EnvironmentRecipe(environment_class=GridWorld, environment_config=env_config)
+    ]
+    return agent_recipes, env_recipes
+
+
+def test_experiment_run_logs_every_step(agent_config, env_config):
+    agent = AgentSarsa(agent_config, EpsilonGreedyPolicy(EpsilonGreedyConfig()))
+    experiment = Experiment(
+        agent, GridWorld(env_config), ExperimentConfig(n_episodes=5, max_steps=20)
+    )
+    log = experiment.run()
+    episodes = [step.episode for step in log.steps]
+    assert episodes[0] == 1 and episodes[-1] == 5
+    assert all(step.step <= 20 for step in log.steps)
+    assert len(log.final_values) == 15
+
+
+def test_batch_workers_match_serial(agent_config, env_config):
+    agent_recipes, env_recipes = make_recipes(agent_config, env_config)
+    experiment_config = ExperimentConfig(n_episodes=20, max_steps=50)
+    serial = ExperimentBatch(
+        agent_recipes, env_recipes, experiment_config, n_runs=3
+    ).run()
+    parallel = ExperimentBatch(
+        agent_recipes, env_recipes, experiment_config, n_runs=3, workers=2
+    ).run()
+    assert len(serial) == len(parallel) == 6
+    for a, b in zip(serial, parallel):
+        assert (a.id, a.seed, a.agent) == (b.id, b.seed, b.agent)
+        assert a.steps == b.steps
+        assert a.final_values == b.final_values
+
+
+def test_batch_does_not_mutate_recipes(agent_config, env_config):
+    agent_recipes, env_recipes = make_recipes(agent_config, env_config)
+    ExperimentBatch(
+        agent_recipes, env_recipes, ExperimentConfig(n_episodes=2), n_runs=2
+    ).run()
+    assert agent_config.random_seed == 42
+    assert env_config.random_seed == 42
+
+
+def test_batch_seeds_runs_by_index(agent_config, env_config):
+    agent_recipes, env_recipes = make_recipes(agent_config, env_config)
+    logs = ExperimentBatch(
+        agent_recipes[:1], env_recipes, ExperimentConfig(n_episodes=2), n_runs=3
+    ).run()
+    assert [log.seed for log in logs] == [0, 1, 2]
+
+
+def run_with_log_level(agent_config, env_config, log_level):
+    agent = AgentSarsa(agent_config, EpsilonGreedyPolicy(EpsilonGreedyConfig()))
+    config = ExperimentConfig(n_episodes=30, max_steps=25, log_level=log_level)
+    return Experiment(agent, GridWorld(env_config), config).run()
+
+
+def test_episode_log_level_matches_step_log(agent_config, env_config):
+    step_log = run_with_log_level(agent_config, env_config, "steps")
+    episode_log = run_with_log_level(agent_config, env_config, "episodes")
+    episodes = episode_log.episodes
+    assert len(episode_log.steps) == 0
+    assert len(episodes) == 30
+
+    returns = np.bincount(step_log.steps.episode, weights=step_log.steps.reward)[1:]
+    lengths = np.bincount(step_log.steps.episode)[1:] - 1
+    np.testing.assert_allclose(episodes.returns, returns)
+    np.testing.assert_array_equal(episodes.lengths, lengths)
+    np.testing.assert_array_equal(
+        episodes.visits, np.bincount(step_log.steps.state, minlength=15)
+    )
+    assert np.isclose(episodes.return_stats.mean, returns.mean())
+    assert np.isclose(episodes.return_stats.variance, returns.var(ddof=1))
+    assert episode_log.final_values == step_log.final_values
+
+    analysis = analyze_experiment(episode_log, 3, 5)
+    np.testing.assert_allclose(analysis.episodic_rewards["reward"], returns)
+    assert analysis.cumulative_reward["global_step"].iloc[-1] == len(step_log.steps) - 1
+
+
+def test_none_log_level_keeps_only_statistics(agent_config, env_config):
+    log = run_with_log_level(agent_config, env_config, "none")
+    reference = run_with_log_level(agent_config, env_config, "episodes")
+    assert len(log.episodes.returns) == 0
+    assert log.episodes.return_stats.count == 30
+    assert np.isclose(log.episodes.return_stats.mean, reference.episodes.returns.mean())
+
+
+def test_invalid_log_level(agent_config, env_config):
+    with pytest.raises(ValueError):
+        run_with_log_level(agent_config, env_config, "everything")
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from rl_intro.agent.core import AgentConfig, PolicyConfig
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.agent_expected_sarsa import AgentExpectedSarsa
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig, RandomPolicy
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+from rl_intro.simulation.fused import supports_fused
+
+
+def cliff_walk() -> GridWorld:
+    return GridWorld(
+        GridWorldConfig(
+            width=12,
+            height=4,
+            start_states=[36],
+            terminal_states=[47],
+            cliff_states=list(range(37, 47)),
+            wall_states=[],
+            random_seed=0,
+        )
+    )
+
+
+def make_experiment(agent_class, policy, fused, log_level="steps", **agent_kwargs):
+    agent = agent_class(
+        AgentConfig(n_states=48, n_actions=4, random_seed=7, **agent_kwargs), policy
+    )
+    config = ExperimentConfig(
+        n_episodes=30, max_steps=50, log_level=log_level, fused=fused
+    )
+    return Experiment(agent, cliff_walk(), config)
+
+
+@pytest.mark.parametrize(
+    "agent_class", [AgentSarsa, AgentQLearning, AgentExpectedSarsa]
+)
+@pytest.mark.parametrize(
+    "policy",
+    [
+        EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.2)),
+        RandomPolicy(PolicyConfig()),
+    ],
+)
+def test_fused_matches_step_loop(agent_class, policy):
+    reference = make_experiment(agent_class, policy, fused=False)
+    fused = make_experiment(agent_class, policy, fused=True)
+    assert supports_fused(fused)
+    reference_log, fused_log = reference.run(), fused.run()
+    assert fused_log.steps == reference_log.steps
+    np.testing.assert_array_equal(fused.agent.q, reference.agent.q)
+    assert fused_log.final_values == reference_log.final_values
+    # agent, environment and generator continue identically afterwards
+    for experiment in (reference, fused):
+        experiment.config.fused = False
+        experiment.run_episodes(3)
+    assert fused.log.steps == reference.log.steps
+    assert (
+        fused.agent.random_generator.random()
+        == reference.agent.random_generator.random()
+    )
+
+
+@pytest.mark.parametrize("log_level", ["episodes", "none"])
+def test_fused_episode_logs(log_level):
+    policy = EpsilonGreedyPolicy(EpsilonGreedyConfig())
+    reference = make_experiment(AgentExpectedSarsa, policy, False, log_level)
+    fused = make_experiment(AgentExpectedSarsa, policy, True, log_level)
+    reference_episodes, fused_episodes = reference.run().episodes, fused.run().episodes
+    np.testing.assert_array_equal(fused_episodes.returns, reference_episodes.returns)
+    np.testing.assert_array_equal(fused_episodes.lengths, reference_episodes.lengths)
+    np.testing.assert_array_equal(fused_episodes.visits, reference_episodes.visits)
+    assert fused_episodes.return_stats.mean == reference_episodes.return_stats.mean
+
+
+def test_fused_rounds_like_the_table_dtype():
+    policy = EpsilonGreedyPolicy(EpsilonGreedyConfig())
+    reference = make_experiment(AgentQLearning, policy, False, dtype="float32")
+    fused = make_experiment(AgentQLearning, policy, True, dtype="float32")
+    assert fused.run().steps == reference.run().steps
+    np.testing.assert_array_equal(fused.agent.q, reference.agent.q)
+
+
+def test_unsupported_falls_back():
+    policy = EpsilonGreedyPolicy(EpsilonGreedyConfig())
+    reference = make_experiment(AgentSarsa, policy, False, greedy_cache=True)
+    fused = make_experiment(AgentSarsa, policy, True, greedy_cache=True)
+    assert not supports_fused(fused)
+    assert fused.run().steps == reference.run().steps
@@ -0,0 +1,104 @@
+import pytest
+import numpy as np
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.agent_expected_sarsa import AgentExpectedSarsa
+from rl_intro.agent.greedy_cache import GreedyCache
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+
+
+def run(agent_class, greedy_cache: bool):
+    env = GridWorld(
+        GridWorldConfig(
+            width=5,
+            height=3,
+            start_states=[0, 5],
+            terminal_states=[14],
+            cliff_states=[11, 12, 13],
+            wall_states=[7],
+            random_seed=3,
+        )
+    )
+    agent = agent_class(
+        AgentConfig(
+            n_states=15,
+            n_actions=4,
+            learning_rate=0.5,
+            random_seed=3,
+            greedy_cache=greedy_cache,
+        ),
+        EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.2)),
+    )
+    log = Experiment(agent, env, ExperimentConfig(n_episodes=50, max_steps=40)).run()
+    return agent, log
+
+
+def assert_cache_matches(cache: GreedyCache, q: np.ndarray):
+    np.testing.assert_array_equal(cache.max_values, q.max(axis=1))
+    for s in range(len(q)):
+        assert cache.best[s] == list(np.flatnonzero(q[s] == q[s].max()))
+    np.testing.assert_array_equal(cache.sums, q.sum(axis=1))
+
+
+def test_cache_tracks_random_updates():
+    rng = np.random.default_rng(0)
+    q = np.zeros((6, 4))
+    cache = GreedyCache(q)
+    for _ in range(2000):
+        s, a = rng.integers(6), rng.integers(4)
+        old = q[s, a]
+        # few distinct values, so ties appear and disappear all the time
+        q[s, a] = rng.integers(-2, 3)
+        cache.update(s, a, old, q[s, a])
+        assert_cache_matches(cache, q)
+
+
+def test_row_sums_do_not_drift():
+    rng = np.random.default_rng(1)
+    q = np.zeros((3, 5))
+    cache = GreedyCache(q)
+    for _ in range(5000):
+        s, a = rng.integers(3), rng.integers(5)
+        old = q[s, a]
+        q[s, a] += rng.normal() * 1e3
+        cache.update(s, a, old, q[s, a])
+    np.testing.assert_array_equal(cache.sums, q.sum(axis=1))
+
+
+@pytest.mark.parametrize("agent_class", [AgentSarsa, AgentQLearning])
+def test_cached_agents_reproduce_uncached_runs(agent_class):
+    agent, log = run(agent_class, greedy_cache=False)
+    cached_agent, cached_log = run(agent_class, greedy_cache=True)
+    assert cached_log.steps == log.steps
+    np.testing.assert_array_equal(cached_agent.q, agent.q)
+    assert_cache_matches(cached_agent.greedy, cached_agent.q)
+
+
+def test_expected_sarsa_closed_form():
+    agent, log = run(AgentExpectedSarsa, greedy_cache=False)
+    cached_agent, cached_log = run(AgentExpectedSarsa, greedy_cache=True)
+    np.testing.assert_allclose(cached_agent.q, agent.q)
+    # compare against the array path on the same Q table
+    policy = cached_agent.policy
+    greedy, cached_agent.greedy = cached_agent.greedy, None
+    expected = [policy.get_expected_value(cached_agent, s) for s in range(15)]
+    distributions = [policy.get_state_distribution(cached_agent, s) for s in range(15)]
+    cached_agent.greedy = greedy
+    for s in range(15):
+        assert np.isclose(policy.get_expected_value(cached_agent, s), expected[s])
+        np.testing.assert_array_equal(
+            policy.get_state_distribution(cached_agent, s), distributions[s]
+        )
+
+
+def test_rebuild_after_direct_writes():
+    agent = AgentSarsa(
+        AgentConfig(n_states=3, n_actions=4, random_seed=0, greedy_cache=True),
+        EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.0)),
+    )
+    agent.q[1, 2] = 10
+    agent.greedy.rebuild()
+    assert agent.step(1, None, False) == 2
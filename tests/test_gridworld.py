@@ -65,3 +65,43 @@ def test_reward_function(env: GridWorld) -> None:
     env.state = 11  # empty
     _, reward, _ = env.step(Act.UP.value)
     assert reward == -1.0
+
+
+def test_compiled_tables_match_step_logic(grid_config: GridWorldConfig) -> None:
+    grid_config.compiled = False
+    reference = GridWorld(grid_config)
+    compiled = GridWorld(GridWorldConfig(**{**vars(grid_config), "compiled": True}))
+    np.testing.assert_array_equal(compiled.grid, reference.grid)
+    for s in range(16):
+        reference.state = s
+        assert compiled.terminal_table[s] == reference.terminal
+        if reference.terminal:
+            continue
+        for a in reference.action_space:
+            reference.state = s
+            s1, reward, terminal = reference.step(a)
+            assert compiled.next_state_table[s, a] == s1
+            assert compiled.reward_table[s1] == reward
+
+
+def test_compiled_trajectory_matches_uncompiled(grid_config: GridWorldConfig) -> None:
+    grid_config.start_states = [0, 1, 4]
+    compiled = GridWorld(GridWorldConfig(**{**vars(grid_config), "compiled": True}))
+    reference = GridWorld(GridWorldConfig(**{**vars(grid_config), "compiled": False}))
+    actions = np.random.default_rng(0).integers(4, size=2000)
+    for a in actions:
+        assert compiled.step(int(a)) == reference.step(int(a))
+
+
+def test_invalid_action_raises(env: GridWorld) -> None:
+    env.reset()
+    with pytest.raises(ValueError):
+        env.step(4)
+
+
+def test_states_off_the_grid_are_ignored(grid_config: GridWorldConfig) -> None:
+    expected = GridWorld(grid_config).grid.copy()
+    grid_config.wall_states = [*grid_config.wall_states, 16, -1]
+    grid_config.cliff_states = [*grid_config.cliff_states, 100]
+    env = GridWorld(grid_config)
+    assert np.array_equal(env.grid, expected)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from rl_intro.utils.heap import IndexedMaxHeap
+
+
+def test_pops_in_priority_order():
+    rng = np.random.default_rng(0)
+    priorities = rng.random(200)
+    heap = IndexedMaxHeap()
+    for key, priority in enumerate(priorities.tolist()):
+        heap.push(key, priority)
+    popped = [heap.pop() for _ in range(len(priorities))]
+    assert [key for key, _ in popped] == np.argsort(-priorities).tolist()
+    assert len(heap) == 0
+
+
+def test_push_updates_queued_key():
+    heap = IndexedMaxHeap()
+    for key in range(10):
+        heap.push(key, float(key))
+    heap.push(0, 100.0)  # raised to the top
+    heap.push(9, -1.0)  # lowered to the bottom
+    assert len(heap) == 10
+    assert heap.peek() == (0, 100.0)
+    assert heap.priority(9) == -1.0
+    order = [heap.pop()[0] for _ in range(10)]
+    assert order == [0, 8, 7, 6, 5, 4, 3, 2, 1, 9]
+
+
+def test_remove():
+    rng = np.random.default_rng(1)
+    heap = IndexedMaxHeap()
+    priorities = dict(enumerate(rng.random(50).tolist()))
+    for key, priority in priorities.items():
+        heap.push(key, priority)
+    for key in range(0, 50, 3):
+        heap.remove(key)
+        del priorities[key]
+    assert 3 not in heap and 4 in heap
+    assert heap.priority(3) is None
+    order = [heap.pop()[0] for _ in range(len(heap))]
+    assert order == sorted(priorities, key=priorities.get, reverse=True)
+    with pytest.raises(KeyError):
+        heap.remove(0)
@@ -0,0 +1,106 @@
+import pytest
+import numpy as np
+from rl_intro.agent.core import AgentConfig, PolicyConfig
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.agent_expected_sarsa import AgentExpectedSarsa
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig, RandomPolicy
+from tests.test_greedy_cache import assert_cache_matches
+
+AGENTS = [AgentSarsa, AgentQLearning, AgentExpectedSarsa]
+
+
+def make_agent(agent_class, greedy_cache=False):
+    agent = agent_class(
+        AgentConfig(
+            n_states=5,
+            n_actions=3,
+            learning_rate=0.3,
+            discount=0.9,
+            random_seed=0,
+            greedy_cache=greedy_cache,
+        ),
+        EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.2)),
+    )
+    agent.q[:] = np.random.default_rng(1).normal(size=agent.q.shape)
+    if agent.greedy is not None:
+        agent.greedy.rebuild()
+    return agent
+
+
+def learn_sequentially(
+    agent, states, actions, rewards, next_states, next_actions, terminals
+):
+    for transition in zip(
+        states, actions, rewards, next_states, next_actions, terminals
+    ):
+        state, action, reward, next_state, next_action, terminal = transition
+        agent.last_state, agent.last_action = state, action
+        agent.learn(next_state, reward, terminal, next_action)
+
+
+@pytest.mark.parametrize("agent_class", AGENTS)
+def test_distinct_pairs_match_learn(agent_class):
+    # no pair is also a successor, so sequential updates see the same targets
+    batch = (
+        [0, 1, 2, 0],
+        [0, 1, 2, 1],
+        [1.0, -1.0, 0.5, 2.0],
+        [3, 4, 3, 4],
+        [1, 2, 0, 0],
+        [False, False, True, False],
+    )
+    reference, batched = make_agent(agent_class), make_agent(agent_class)
+    learn_sequentially(reference, *batch)
+    batched.learn_batch(*map(np.array, batch))
+    np.testing.assert_allclose(batched.q, reference.q, rtol=1e-12)
+
+
+@pytest.mark.parametrize("agent_class", AGENTS)
+def test_repeated_pairs_apply_sequentially(agent_class):
+    batch = (
+        [0, 0, 1, 0, 1],
+        [2, 2, 0, 2, 0],
+        [1.0, -3.0, 0.5, 2.0, 0.0],
+        [3, 4, 3, 3, 4],
+        [0, 1, 2, 1, 0],
+        [False, True, False, False, False],
+    )
+    reference, batched = make_agent(agent_class), make_agent(agent_class)
+    learn_sequentially(reference, *batch)
+    batched.learn_batch(*map(np.array, batch))
+    np.testing.assert_allclose(batched.q, reference.q, rtol=1e-12)
+
+
+def test_learn_batch_keeps_greedy_cache_in_sync():
+    agent = make_agent(AgentQLearning, greedy_cache=True)
+    rng = np.random.default_rng(2)
+    for _ in range(20):
+        states, next_states = rng.integers(5, size=(2, 30))
+        agent.learn_batch(
+            states,
+            rng.integers(3, size=30),
+            rng.normal(size=30),
+            next_states,
+            rng.integers(3, size=30),
+            rng.random(30) < 0.2,
+        )
+        assert_cache_matches(agent.greedy, agent.q)
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [
+        EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.2)),
+        RandomPolicy(PolicyConfig()),
+    ],
+)
+def test_rows_distribution_matches_full_distribution(policy):
+    agent = make_agent(AgentExpectedSarsa)
+    agent.policy = policy
+    agent.q[2] = agent.q[2, 0]  # a row of ties
+    states = np.array([4, 2, 2, 0])
+    np.testing.assert_array_equal(
+        policy.get_rows_distribution(agent, states),
+        policy.get_distribution(agent)[states],
+    )
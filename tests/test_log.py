@@ -0,0 +1,127 @@
+import pickle
+import numpy as np
+import pandas as pd
+from rl_intro.simulation.log import StepLog, StepLogColumns, EpisodeLog
+from rl_intro.utils.math import RunningStats
+from rl_intro.simulation.experiment import ExperimentConfig, ExperimentLog
+from rl_intro.evaluation.parse import (
+    to_dataframe,
+    experiment_log_to_data,
+    parse_experiment_data,
+)
+from rl_intro.evaluation.analyze import (
+    analyze_experiment,
+    calc_cumulative_reward,
+    calc_episodic_rewards,
+    gen_state_visit_frequency_matrix,
+)
+
+
+def make_steps(n: int) -> StepLogColumns:
+    steps = StepLogColumns()
+    for i in range(n):
+        steps.append_step(i // 10 + 1, i % 10, i % 4, i % 12, -1.0, i % 10 == 9)
+    return steps
+
+
+def make_log(steps: StepLogColumns) -> ExperimentLog:
+    return ExperimentLog(
+        id=0,
+        agent="AgentSarsa()",
+        env="GridWorld()",
+        experiment_config=ExperimentConfig(),
+        steps=steps,
+        final_values=[0.0] * 12,
+    )
+
+
+def test_append_and_step_log_views():
+    steps = make_steps(StepLogColumns.BLOCK_SIZE + 7)
+    assert len(steps) == StepLogColumns.BLOCK_SIZE + 7
+    assert steps[0] == StepLog(1, 0, 0, 0, -1.0, False)
+    assert steps[-1] == list(steps)[-1]
+    assert steps[9].terminal is True
+    assert steps.episode.dtype == np.int32
+    assert steps.reward.dtype == np.float32
+
+
+def test_append_step_log_and_records_roundtrip():
+    steps = StepLogColumns()
+    steps.append(
+        StepLog(episode=1, step=0, action=2, state=3, reward=0.0, terminal=False)
+    )
+    assert StepLogColumns.from_records(steps.to_records()) == steps
+
+
+def test_pickle_roundtrip():
+    steps = make_steps(100)
+    assert pickle.loads(pickle.dumps(steps)) == steps
+
+
+def test_from_arrays_is_zero_copy_and_appendable():
+    columns = make_steps(20).columns()
+    wrapped = StepLogColumns.from_arrays(**columns)
+    assert np.shares_memory(wrapped.state, columns["state"])
+    wrapped.append_step(3, 0, 1, 1, 1.0, True)
+    assert len(wrapped) == 21 and len(columns["state"]) == 20
+
+
+def test_to_dataframe_shares_columns():
+    log = make_log(make_steps(30))
+    df = to_dataframe(log)
+    assert list(df.columns) == [
+        "agent",
+        "env",
+        "episode",
+        "step",
+        "action",
+        "state",
+        "reward",
+        "terminal",
+        "global_step",
+    ]
+    assert np.shares_memory(df["state"].to_numpy(), log.steps.state)
+
+
+def test_json_data_roundtrip():
+    log = make_log(make_steps(30))
+    parsed = parse_experiment_data(experiment_log_to_data(log))
+    assert parsed.steps == log.steps
+    assert parsed.final_values == log.final_values
+
+
+def test_column_analysis_matches_dataframe_analysis():
+    log = make_log(make_steps(95))
+    df = to_dataframe(log)
+    result = analyze_experiment(log, 3, 4)
+    pd.testing.assert_frame_equal(
+        result.cumulative_reward, calc_cumulative_reward(df), check_dtype=False
+    )
+    pd.testing.assert_frame_equal(
+        result.episodic_rewards, calc_episodic_rewards(df), check_dtype=False
+    )
+    np.testing.assert_array_equal(
+        result.visit_matrix, gen_state_visit_frequency_matrix(df, 3, 4)
+    )
+
+
+def test_running_stats_matches_numpy():
+    values = np.random.default_rng(0).normal(3.0, 2.0, size=500)
+    stats = RunningStats()
+    for v in values:
+        stats.update(v)
+    assert stats.count == 500
+    assert np.isclose(stats.mean, values.mean())
+    assert np.isclose(stats.variance, values.var(ddof=1))
+
+
+def test_episode_log_json_roundtrip():
+    log = make_log(StepLogColumns())
+    log.episodes = EpisodeLog(n_states=12)
+    log.episodes.add_step(3, -1.0)
+    log.episodes.add_step(4, 1.0)
+    log.episodes.end_episode(1)
+    parsed = parse_experiment_data(experiment_log_to_data(log))
+    np.testing.assert_array_equal(parsed.episodes.returns, [0.0])
+    np.testing.assert_array_equal(parsed.episodes.visits, log.episodes.visits)
+    assert parsed.episodes.return_stats.count == 1
@@ -0,0 +1,67 @@
+import numpy as np
+from rl_intro.agent.agent_linear import AgentLinearSarsa, LinearAgentConfig
+from rl_intro.agent.factory import AgentRecipe
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.factory import EnvironmentRecipe
+from rl_intro.environment.mountain_car import (
+    HIGH,
+    LOW,
+    MountainCar,
+    MountainCarConfig,
+    VectorMountainCar,
+)
+from rl_intro.simulation.experiment import ExperimentBatch, ExperimentConfig
+
+
+def test_vector_matches_scalar_instances():
+    config = MountainCarConfig(random_seed=0)
+    vector = VectorMountainCar(config, n_envs=3, seeds=[1, 2, 3])
+    scalars = [MountainCar(MountainCarConfig(random_seed=seed)) for seed in (1, 2, 3)]
+    np.testing.assert_array_equal(vector.states, [env.state for env in scalars])
+    rng = np.random.default_rng(0)
+    n_terminals = 0
+    for _ in range(3000):
+        # mostly forward, so that the goal is reached and instances reset
+        actions = np.where(vector.states[:, 1] < 0, 0, 2)
+        actions[rng.random(3) < 0.1] = 1
+        states, rewards, terminals = vector.step(actions)
+        for i, env in enumerate(scalars):
+            state, reward, terminal = env.step(actions[i])
+            # exact, as both environments evaluate the slope with the same numpy cos
+            np.testing.assert_array_equal(states[i], state)
+            assert rewards[i] == reward and terminals[i] == terminal
+        n_terminals += terminals.sum()
+    assert n_terminals > 0
+
+
+def test_masked_instances_keep_their_state():
+    vector = VectorMountainCar(MountainCarConfig(random_seed=0), n_envs=2)
+    before = vector.states.copy()
+    states, rewards, _ = vector.step(np.array([2, 2]), mask=np.array([True, False]))
+    assert not np.array_equal(states[0], before[0])
+    np.testing.assert_array_equal(states[1], before[1])
+    np.testing.assert_array_equal(rewards, [-1.0, 0.0])
+
+
+def test_linear_agent_learns_in_experiment_batch():
+    agent_recipe = AgentRecipe(
+        agent_class=AgentLinearSarsa,
+        policy_class=EpsilonGreedyPolicy,
+        agent_config=LinearAgentConfig(
+            n_states=0, n_actions=3, learning_rate=0.5, low=LOW, high=HIGH
+        ),
+        policy_config=EpsilonGreedyConfig(epsilon=0.0),
+    )
+    env_recipe = EnvironmentRecipe(MountainCar, MountainCarConfig(random_seed=None))
+    batch = ExperimentBatch(
+        [agent_recipe],
+        [env_recipe],
+        ExperimentConfig(n_episodes=30, max_steps=1000),
+        n_runs=1,
+    )
+    (log,) = batch.run()
+    # states are logged as cells of the 20 x 20 grid
+    assert log.steps.state.min() >= 0 and log.steps.state.max() < 400
+    lengths = np.bincount(log.steps.episode)[1:] - 1
+    assert lengths[-5:].mean() < lengths[:5].mean() / 2
+    assert log.final_values == []
@@ -0,0 +1,88 @@
+import pytest
+import numpy as np
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+from rl_intro.evaluation.parse import (
+    save_experiment_json,
+    save_experiment_batch_json,
+    save_experiment_binary,
+    save_experiment_batch_binary,
+    parse_experiment_json,
+    parse_experiment_binary,
+    parse_experiment_batch_binary,
+    convert_json_to_binary,
+)
+
+
+def run(seed: int, log_level: str = "steps"):
+    env = GridWorld(
+        GridWorldConfig(
+            width=4,
+            height=3,
+            start_states=[0],
+            terminal_states=[11],
+            cliff_states=[9, 10],
+            wall_states=[5],
+            random_seed=seed,
+        )
+    )
+    agent = AgentSarsa(
+        AgentConfig(n_states=12, n_actions=4, random_seed=seed),
+        EpsilonGreedyPolicy(EpsilonGreedyConfig()),
+    )
+    config = ExperimentConfig(n_episodes=20, max_steps=30, log_level=log_level)
+    return Experiment(agent, env, config, id=seed).run()
+
+
+def test_binary_roundtrip_is_memory_mapped(tmp_path):
+    log = run(0)
+    path = tmp_path / "log.bin"
+    save_experiment_binary(log, path)
+    loaded = parse_experiment_binary(path)
+    assert loaded.steps == log.steps
+    assert loaded.final_values == log.final_values
+    assert loaded.experiment_config == log.experiment_config
+    assert not loaded.steps.state.flags.writeable
+    loaded.steps.append_step(21, 0, 0, 0, 0.0, False)
+    assert len(loaded.steps) == len(log.steps) + 1
+
+
+def test_binary_batch_roundtrip(tmp_path):
+    logs = [run(0), run(1, log_level="episodes"), run(2)]
+    path = tmp_path / "batch.bin"
+    save_experiment_batch_binary(logs, path)
+    for mmap in (True, False):
+        loaded = parse_experiment_batch_binary(path, mmap=mmap)
+        assert [log.id for log in loaded] == [0, 1, 2]
+        for a, b in zip(logs, loaded):
+            assert a.steps == b.steps
+        np.testing.assert_array_equal(
+            loaded[1].episodes.returns, logs[1].episodes.returns
+        )
+
+
+def test_json_conversion(tmp_path):
+    log = run(3)
+    save_experiment_json(log, tmp_path / "log.json")
+    convert_json_to_binary(tmp_path / "log.json", tmp_path / "log.bin")
+    assert parse_experiment_binary(tmp_path / "log.bin").steps == log.steps
+
+    save_experiment_batch_json([log, run(4)], tmp_path / "batch.json")
+    convert_json_to_binary(tmp_path / "batch.json", tmp_path / "batch.bin")
+    assert len(parse_experiment_batch_binary(tmp_path / "batch.bin")) == 2
+
+
+def test_json_roundtrip(tmp_path):
+    log = run(5)
+    save_experiment_json(log, tmp_path / "log.json")
+    assert parse_experiment_json(tmp_path / "log.json").steps == log.steps
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "log.json"
+    save_experiment_json(run(0), path)
+    with pytest.raises(ValueError):
+        parse_experiment_binary(path)
@@ -95,3 +95,23 @@ def test_epsilon_greedy_policy_distribution_ties():
     dist = policy.get_distribution(agent)
     expected = np.array([[0.05, 0.45, 0.45, 0.05]])
     assert np.allclose(dist, expected)
+
+
+def test_epsilon_greedy_distribution_matches_per_state():
+    q = np.random.default_rng(0).integers(0, 3, size=(50, 4)).astype(float)
+    agent = DummyAgent(q=q, n_states=50, n_actions=4)
+    policy = EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.3))
+    expected = np.array([policy.get_state_distribution(agent, s) for s in range(50)])
+    np.testing.assert_array_equal(policy.get_distribution(agent), expected)
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [RandomPolicy(PolicyConfig()), EpsilonGreedyPolicy(EpsilonGreedyConfig())],
+)
+def test_distribution_writes_into_buffer(policy):
+    agent = DummyAgent()
+    out = np.full(agent.q.shape, np.nan)
+    dist = policy.get_distribution(agent, out=out)
+    assert dist is out
+    np.testing.assert_allclose(out.sum(axis=1), 1.0)
@@ -0,0 +1,81 @@
+import pytest
+import numpy as np
+from dataclasses import replace
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.agent_expected_sarsa import AgentExpectedSarsa
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.agent.q_table import SparseQTable, make_q_table
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+
+
+def test_sparse_table_matches_dense_writes():
+    rng = np.random.default_rng(0)
+    dense = np.full((5000, 3), -1.0)
+    sparse = SparseQTable(3, n_states=5000, initial_value=-1.0, capacity=4)
+    for _ in range(3000):
+        s, a, v = int(rng.integers(5000)), int(rng.integers(3)), rng.normal()
+        dense[s, a] = v
+        sparse[s, a] = v
+    assert len(sparse) == len(np.unique(sparse.states))
+    for s in rng.integers(5000, size=500).tolist():
+        np.testing.assert_array_equal(sparse[s], dense[s])
+        assert sparse[s, 1] == dense[s, 1]
+    np.testing.assert_array_equal(np.asarray(sparse), dense)
+    np.testing.assert_array_equal(sparse.greedy_values(), dense.max(axis=1))
+    np.testing.assert_array_equal(sparse.greedy_actions(), dense.argmax(axis=1))
+
+
+def test_unvisited_reads_do_not_allocate():
+    sparse = SparseQTable(4, initial_value=0.5)
+    assert sparse[10**12, 2] == 0.5
+    assert len(sparse) == 0
+    with pytest.raises(ValueError):
+        sparse[3][0] = 1.0  # rows of unvisited states are read-only
+    sparse[7, 1] = 2.0
+    assert len(sparse) == 1 and sparse.shape == (8, 4)
+    np.testing.assert_array_equal(sparse.greedy_values(), [0.5] * 7 + [2.0])
+
+
+@pytest.mark.parametrize(
+    "agent_class", [AgentSarsa, AgentQLearning, AgentExpectedSarsa]
+)
+def test_sparse_agents_reproduce_dense_runs(agent_class):
+    env_config = GridWorldConfig(
+        width=8,
+        height=4,
+        start_states=[0],
+        terminal_states=[31],
+        cliff_states=[25, 26, 27, 28, 29, 30],
+        wall_states=[10, 18],
+        random_seed=7,
+    )
+    agent_config = AgentConfig(n_states=32, n_actions=4, random_seed=7)
+
+    def run(q_backend):
+        agent = agent_class(
+            replace(agent_config, q_backend=q_backend),
+            EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.2)),
+        )
+        config = ExperimentConfig(n_episodes=30, max_steps=60)
+        return agent, Experiment(agent, GridWorld(env_config), config).run()
+
+    dense_agent, dense_log = run("dense")
+    sparse_agent, sparse_log = run("sparse")
+    assert sparse_log.steps == dense_log.steps
+    assert sparse_log.final_values == dense_log.final_values
+    np.testing.assert_array_equal(
+        sparse_agent.get_greedy_actions(), dense_agent.get_greedy_actions()
+    )
+    assert len(sparse_agent.q) < 32
+    assert sparse_agent.memory_footprint()["q"] == sparse_agent.q.nbytes
+
+
+def test_make_q_table_backends():
+    config = AgentConfig(n_states=3, n_actions=2, initial_value=1.0)
+    np.testing.assert_array_equal(make_q_table(config), np.ones((3, 2)))
+    assert isinstance(make_q_table(replace(config, q_backend="sparse")), SparseQTable)
+    with pytest.raises(ValueError):
+        make_q_table(replace(config, q_backend="tree"))
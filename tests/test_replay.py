@@ -0,0 +1,103 @@
+import pytest
+import numpy as np
+from rl_intro.agent.core import Agent, AgentConfig
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.agent_expected_sarsa import AgentExpectedSarsa
+from rl_intro.agent.agent_sarsa import AgentSarsa
+from rl_intro.agent.agent_sarsa_lambda import AgentSarsaLambda
+from rl_intro.agent.agent_q_lambda import AgentQLambda
+from rl_intro.agent.agent_dyna_q import AgentDynaQ, DynaConfig
+from rl_intro.agent.agent_linear import AgentLinearSarsa, LinearAgentConfig
+from rl_intro.agent.traces import TraceAgentConfig
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.agent.replay import ReplayBuffer
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig, StateKind
+from rl_intro.evaluation.dynamic_programming import value_error, value_iteration
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+
+
+def test_ring_overwrites_oldest():
+    buffer = ReplayBuffer(
+        4, n_states=300, n_actions=4, random_generator=np.random.default_rng(0)
+    )
+    assert buffer.states.dtype == np.uint16 and buffer.actions.dtype == np.uint8
+    for i in range(6):
+        buffer.add(i, i % 4, float(i), i + 1, i == 5)
+    assert len(buffer) == 4 and buffer.position == 2
+    np.testing.assert_array_equal(buffer.states, [4, 5, 2, 3])
+    states, actions, rewards, next_states, terminals = buffer.sample(1000)
+    assert set(states.tolist()) == {2, 3, 4, 5}
+    np.testing.assert_array_equal(next_states, states + 1)
+    np.testing.assert_array_equal(rewards, states)
+    np.testing.assert_array_equal(terminals, states == 5)
+
+
+def goal_reward(state, kind):
+    return 1.0 if kind == StateKind.TERMINAL.value else 0.0
+
+
+def sparse_maze() -> GridWorld:
+    return GridWorld(
+        GridWorldConfig(
+            width=9,
+            height=6,
+            start_states=[18],
+            terminal_states=[8],
+            cliff_states=[],
+            wall_states=[11, 20, 29, 7, 16, 25, 41],
+            reward_function=goal_reward,
+            random_seed=0,
+        )
+    )
+
+
+def value_error_of(agent_class, replay_batch_size: int) -> tuple[float, Agent]:
+    env = sparse_maze()
+    agent = agent_class(
+        AgentConfig(
+            n_states=54,
+            n_actions=4,
+            learning_rate=0.5,
+            discount=0.95,
+            random_seed=0,
+            replay_batch_size=replay_batch_size,
+        ),
+        EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.2)),
+    )
+    config = ExperimentConfig(n_episodes=15, max_steps=300, log_level="none")
+    Experiment(agent, env, config).run()
+    optimal = value_iteration(env, discount=0.95).values
+    return value_error(agent.get_greedy_values(), optimal), agent
+
+
+@pytest.mark.parametrize("agent_class", [AgentQLearning, AgentExpectedSarsa])
+def test_replay_reaches_values_sooner(agent_class):
+    online_error, _ = value_error_of(agent_class, replay_batch_size=0)
+    replay_error, agent = value_error_of(agent_class, replay_batch_size=16)
+    assert replay_error < 0.75 * online_error
+    assert len(agent.replay_buffer) > 0
+    assert agent.memory_footprint()["replay"] == agent.replay_buffer.nbytes
+
+
+def test_replay_rejects_sparse_q_table():
+    config = AgentConfig(
+        n_states=54, n_actions=4, q_backend="sparse", replay_batch_size=8
+    )
+    with pytest.raises(AssertionError, match="dense Q table"):
+        AgentQLearning(config, EpsilonGreedyPolicy(EpsilonGreedyConfig()))
+
+
+@pytest.mark.parametrize(
+    "agent_class, config_class",
+    [
+        (AgentSarsa, AgentConfig),
+        (AgentSarsaLambda, TraceAgentConfig),
+        (AgentQLambda, TraceAgentConfig),
+        (AgentDynaQ, DynaConfig),
+        (AgentLinearSarsa, LinearAgentConfig),
+    ],
+)
+def test_agents_without_replay_reject_replay_batch_size(agent_class, config_class):
+    config = config_class(n_states=16, n_actions=4, replay_batch_size=8)
+    with pytest.raises(AssertionError, match="does not replay"):
+        agent_class(config, EpsilonGreedyPolicy(EpsilonGreedyConfig()))
@@ -0,0 +1,84 @@
+import pytest
+import numpy as np
+from dataclasses import replace
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+from rl_intro.utils.rng import BatchedGenerator, BufferedGenerator, make_generator
+
+BOUNDS = [1, 2, 3, 4, 7, 1000, 2**31 + 5, 2**32 - 1, 2**32, 2**32 + 1, 2**40 + 3]
+
+
+def draw(generator, plan: np.ndarray) -> list:
+    values = []
+    for op, bound in plan:
+        if op == 0:
+            values.append(generator.random())
+        elif op == 1:
+            values.append(int(generator.integers(BOUNDS[bound])))
+        elif op == 2:
+            values.append(int(generator.choice(4)))
+        else:
+            values.append(int(generator.choice(np.array([3, 5, 9])[: bound % 3 + 1])))
+    return values
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 4096])
+def test_buffered_generator_reproduces_numpy(block_size):
+    rng = np.random.default_rng(0)
+    plan = np.stack([rng.integers(4, size=5000), rng.integers(len(BOUNDS), size=5000)])
+    reference = np.random.default_rng(5)
+    buffered = BufferedGenerator(np.random.default_rng(5), block_size)
+    assert draw(buffered, plan.T) == draw(reference, plan.T)
+
+    # after sync the wrapped generator continues exactly where the buffer stopped
+    generator = buffered.sync()
+    assert generator.bit_generator.state == reference.bit_generator.state
+    assert draw(buffered, plan.T[:100]) == draw(reference, plan.T[:100])
+
+
+def test_experiment_with_buffered_generators():
+    env_config = GridWorldConfig(
+        width=5,
+        height=3,
+        start_states=[0, 5, 10],
+        terminal_states=[14],
+        cliff_states=[11, 12, 13],
+        wall_states=[7],
+        random_seed=1,
+    )
+    agent_config = AgentConfig(n_states=15, n_actions=4, random_seed=1)
+
+    def run(block_size):
+        agent = AgentQLearning(
+            replace(agent_config, rng_block_size=block_size),
+            EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.3)),
+        )
+        env = GridWorld(replace(env_config, rng_block_size=block_size))
+        config = ExperimentConfig(n_episodes=30, max_steps=50)
+        return Experiment(agent, env, config).run()
+
+    assert isinstance(make_generator(0, 64), BufferedGenerator)
+    assert run(64).steps == run(None).steps
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 256])
+def test_batched_generator_reproduces_numpy(block_size):
+    seeds = [0, 1, 2, 3, 4]
+    rng = np.random.default_rng(0)
+    references = [np.random.default_rng(seed) for seed in seeds]
+    batched = BatchedGenerator([make_generator(seed, 16) for seed in seeds], block_size)
+    bounds = np.array(BOUNDS[:-2])  # up to 2**32
+    for _ in range(2000):
+        if rng.random() < 0.5:
+            expected = [g.random() for g in references]
+            assert batched.random().tolist() == expected
+        else:
+            highs = bounds[rng.integers(len(bounds), size=len(seeds))]
+            expected = [int(g.integers(h)) for g, h in zip(references, highs)]
+            assert batched.integers(highs).tolist() == expected
+
+    for generator, reference in zip(batched.sync(), references):
+        assert generator.bit_generator.state == reference.bit_generator.state
@@ -0,0 +1,98 @@
+import numpy as np
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import (
+    Experiment,
+    ExperimentBatch,
+    ExperimentConfig,
+    AgentRecipe,
+    EnvironmentRecipe,
+)
+from rl_intro.simulation.sink import (
+    ChunkedLogWriter,
+    read_chunked_log,
+    read_chunked_batch,
+)
+
+ENV_CONFIG = GridWorldConfig(
+    width=5,
+    height=3,
+    start_states=[0],
+    terminal_states=[14],
+    cliff_states=[11, 12, 13],
+    wall_states=[],
+    random_seed=1,
+)
+AGENT_CONFIG = AgentConfig(n_states=15, n_actions=4, learning_rate=0.3, random_seed=1)
+MAX_STEPS = 20
+
+
+def make_experiment(sink=None, n_episodes=40, log_level="steps"):
+    agent = AgentQLearning(AGENT_CONFIG, EpsilonGreedyPolicy(EpsilonGreedyConfig()))
+    config = ExperimentConfig(
+        n_episodes=n_episodes, max_steps=MAX_STEPS, log_level=log_level
+    )
+    return Experiment(agent, GridWorld(ENV_CONFIG), config, sink=sink)
+
+
+def test_streamed_log_matches_in_memory_log(tmp_path):
+    reference = make_experiment().run()
+    experiment = make_experiment(ChunkedLogWriter(tmp_path, chunk_size=50))
+    log = experiment.run()
+    assert len(log.steps) == 0
+    streamed = read_chunked_log(tmp_path)
+    assert streamed.steps == reference.steps
+    assert streamed.final_values == reference.final_values
+    assert len(list(tmp_path.glob("state.*.npy"))) == -(-len(reference.steps) // 50)
+
+
+def test_memory_stays_bounded(tmp_path):
+    experiment = make_experiment(ChunkedLogWriter(tmp_path, chunk_size=32))
+    for _ in range(100):
+        experiment.run_episode()
+        assert len(experiment.log.steps) < 32 + MAX_STEPS + 1
+
+
+def test_partial_run_is_readable(tmp_path):
+    reference = make_experiment().run()
+    experiment = make_experiment(ChunkedLogWriter(tmp_path, chunk_size=25))
+    for _ in range(10):
+        experiment.run_episode()
+    partial = read_chunked_log(tmp_path)
+    n = len(partial.steps)
+    assert partial.final_values is None
+    assert n % 25 == 0 and n > 0
+    for name in ("episode", "state", "action", "reward"):
+        np.testing.assert_array_equal(
+            partial.steps.column(name), reference.steps.column(name)[:n]
+        )
+
+
+def test_episode_summaries_are_stored(tmp_path):
+    make_experiment(ChunkedLogWriter(tmp_path), log_level="episodes").run()
+    log = read_chunked_log(tmp_path)
+    assert len(log.steps) == 0
+    assert len(log.episodes.returns) == 40
+
+
+def test_batch_streams_every_cell(tmp_path):
+    recipe = AgentRecipe(
+        agent_class=AgentQLearning,
+        agent_config=AGENT_CONFIG,
+        policy_class=EpsilonGreedyPolicy,
+        policy_config=EpsilonGreedyConfig(),
+    )
+    env_recipe = EnvironmentRecipe(
+        environment_class=GridWorld, environment_config=ENV_CONFIG
+    )
+    config = ExperimentConfig(n_episodes=10, max_steps=MAX_STEPS)
+    in_memory = ExperimentBatch([recipe], [env_recipe], config, n_runs=3).run()
+    ExperimentBatch(
+        [recipe], [env_recipe], config, n_runs=3, log_dir=tmp_path, chunk_size=64
+    ).run()
+    streamed = read_chunked_batch(tmp_path)
+    assert [log.seed for log in streamed] == [0, 1, 2]
+    for a, b in zip(in_memory, streamed):
+        assert a.steps == b.steps
@@ -0,0 +1,107 @@
+import pytest
+from rl_intro.agent.core import AgentConfig
+from rl_intro.agent.agent_q_learning import AgentQLearning
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import (
+    ExperimentConfig,
+    ExperimentCell,
+    AgentRecipe,
+    EnvironmentRecipe,
+    run_experiment_cell,
+)
+from rl_intro.simulation.sweep import (
+    SuccessiveHalving,
+    Uniform,
+    apply_configuration,
+    grid_configurations,
+    random_configurations,
+    score_logs,
+)
+
+
+@pytest.fixture
+def base_recipe() -> AgentRecipe:
+    return AgentRecipe(
+        agent_class=AgentQLearning,
+        agent_config=AgentConfig(n_states=12, n_actions=4, random_seed=0),
+        policy_class=EpsilonGreedyPolicy,
+        policy_config=EpsilonGreedyConfig(),
+    )
+
+
+@pytest.fixture
+def env_recipe() -> EnvironmentRecipe:
+    return EnvironmentRecipe(
+        environment_class=GridWorld,
+        environment_config=GridWorldConfig(
+            width=4,
+            height=3,
+            start_states=[0],
+            terminal_states=[11],
+            cliff_states=[9, 10],
+            wall_states=[5],
+            random_seed=0,
+        ),
+    )
+
+
+def test_grid_and_random_configurations():
+    grid = grid_configurations({"learning_rate": [0.1, 0.5], "epsilon": [0.0, 0.1]})
+    assert grid == [
+        {"learning_rate": 0.1, "epsilon": 0.0},
+        {"learning_rate": 0.1, "epsilon": 0.1},
+        {"learning_rate": 0.5, "epsilon": 0.0},
+        {"learning_rate": 0.5, "epsilon": 0.1},
+    ]
+    space = {"learning_rate": Uniform(0.01, 1.0, log=True), "discount": [0.9, 1.0]}
+    configs = random_configurations(space, n=20, seed=0)
+    assert configs == random_configurations(space, n=20, seed=0)
+    assert all(0.01 <= c["learning_rate"] <= 1.0 for c in configs)
+    assert {c["discount"] for c in configs} <= {0.9, 1.0}
+
+
+def test_apply_configuration(base_recipe):
+    recipe = apply_configuration(base_recipe, {"learning_rate": 0.5, "epsilon": 0.2})
+    assert recipe.agent_config.learning_rate == 0.5
+    assert recipe.policy_config.epsilon == 0.2
+    assert base_recipe.agent_config.learning_rate == 0.1
+    with pytest.raises(ValueError):
+        apply_configuration(base_recipe, {"temperature": 1.0})
+
+
+def test_successive_halving(base_recipe, env_recipe):
+    configurations = grid_configurations(
+        {"learning_rate": [0.01, 0.5, 0.9], "epsilon": [0.05, 0.5, 0.9]}
+    )
+    sweep = SuccessiveHalving(
+        base_recipe,
+        configurations,
+        [env_recipe],
+        ExperimentConfig(n_episodes=90, max_steps=50),
+        n_runs=2,
+        min_episodes=10,
+        eta=3,
+    )
+    assert sweep.budgets == [10, 30, 90]
+    trials = sweep.run()
+    assert [len(t.scores) for t in trials] == [3, 2, 2, 1, 1, 1, 1, 1, 1]
+    assert trials[0].budget == 90
+
+    # scores are the mean over the seeds of the last episodes of a plain run
+    best = trials[0]
+    logs = [
+        run_experiment_cell(
+            ExperimentCell(
+                id=seed,
+                seed=seed,
+                agent_recipe=best.recipe,
+                env_recipe=env_recipe,
+                experiment_config=ExperimentConfig(
+                    n_episodes=90, max_steps=50, log_level="episodes"
+                ),
+            )
+        )
+        for seed in range(2)
+    ]
+    assert best.score == score_logs(logs, 0.1)
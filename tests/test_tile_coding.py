@@ -0,0 +1,86 @@
+import pytest
+import numpy as np
+from rl_intro.agent.agent_linear import (
+    AgentLinearQLearning,
+    AgentLinearSarsa,
+    LinearAgentConfig,
+)
+from rl_intro.agent.policy import EpsilonGreedyPolicy, EpsilonGreedyConfig
+from rl_intro.agent.tile_coding import TileCoder
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.simulation.experiment import Experiment, ExperimentConfig
+
+
+def test_indices_are_bounded_and_local():
+    coder = TileCoder(
+        [0.0, -1.0], [1.0, 1.0], n_tilings=8, tiles_per_dim=10, memory_size=500
+    )
+    observations = np.random.default_rng(0).uniform([0, -1], [1, 1], size=(1000, 2))
+    indices = coder.indices(observations)
+    assert indices.shape == (1000, 8)
+    assert indices.min() >= 0 and indices.max() < 500
+    # one observation at a time gives the same features
+    np.testing.assert_array_equal(coder.indices(observations[3]), indices[3])
+    # a small move changes few tilings, a move across the box changes all of them
+    near = coder.indices([0.501, 0.0]) == coder.indices([0.5, 0.0])
+    far = coder.indices([0.9, 0.9]) == coder.indices([0.1, -0.9])
+    assert near.sum() >= 6 and far.sum() <= 1
+
+
+def grid(width: int) -> GridWorld:
+    return GridWorld(
+        GridWorldConfig(
+            width=width,
+            height=width,
+            start_states=[0],
+            terminal_states=[width * width - 1],
+            cliff_states=[],
+            wall_states=[],
+            random_seed=0,
+        )
+    )
+
+
+@pytest.mark.parametrize("agent_class", [AgentLinearSarsa, AgentLinearQLearning])
+def test_learns_grid_larger_than_its_memory(agent_class):
+    width = 30
+    config = LinearAgentConfig(
+        n_states=width * width,
+        n_actions=4,
+        learning_rate=0.5,
+        random_seed=0,
+        grid_width=width,
+        tiles_per_dim=6,
+        memory_size=512,
+    )
+    agent = agent_class(config, EpsilonGreedyPolicy(EpsilonGreedyConfig(epsilon=0.05)))
+    experiment_config = ExperimentConfig(
+        n_episodes=100, max_steps=2000, log_level="episodes"
+    )
+    log = Experiment(agent, grid(width), experiment_config).run()
+    # the shortest path takes 58 steps
+    assert log.episodes.lengths[-10:].mean() < 100
+    assert agent.memory_footprint()["q"] == 512 * 4 * 8
+    assert len(log.final_values) == width * width
+    assert agent.q[0, 3] == agent.action_values(0)[3]
+
+
+def test_feature_cache_compares_states_by_value():
+    config = LinearAgentConfig(
+        n_states=4, n_actions=2, random_seed=0, low=(0.0, 0.0), high=(1.0, 1.0)
+    )
+    agent = AgentLinearSarsa(config, EpsilonGreedyPolicy(EpsilonGreedyConfig()))
+    state = np.array([0.1, 0.1])
+    first = agent.features(state).copy()
+    state[:] = [0.9, 0.9]
+    assert not np.array_equal(agent.features(state), first)
+    assert np.array_equal(agent.features(np.array([0.1, 0.1])), first)
+
+
+def test_feature_cache_hits_equal_grid_states():
+    config = LinearAgentConfig(n_states=900, n_actions=4, random_seed=0, grid_width=30)
+    agent = AgentLinearSarsa(config, EpsilonGreedyPolicy(EpsilonGreedyConfig()))
+    features = agent.features(700)
+    # a fresh int object beyond the small-int cache still hits
+    assert agent.features(int("700")) is features
+    assert not np.array_equal(agent.features(701), features)
@@ -0,0 +1,80 @@
+import pytest
+import numpy as np
+from rl_intro.environment.gridworld import GridWorld, GridWorldConfig
+from rl_intro.environment.vector_gridworld import VectorGridWorld
+
+
+def make_config(seed=None, start_states=(0, 1, 4)) -> GridWorldConfig:
+    return GridWorldConfig(
+        width=4,
+        height=4,
+        start_states=list(start_states),
+        terminal_states=[15],
+        cliff_states=[8, 9, 10],
+        wall_states=[5, 6],
+        random_seed=seed,
+    )
+
+
+def test_matches_scalar_gridworlds() -> None:
+    seeds = [0, 1, 2, 3]
+    configs = [make_config(seed) for seed in seeds]
+    configs[3] = make_config(3, start_states=(12,))
+    vector_env = VectorGridWorld(configs)
+    envs = [GridWorld(config) for config in configs]
+
+    np.testing.assert_array_equal(vector_env.states, [env.state for env in envs])
+    actions = np.random.default_rng(0).integers(4, size=(3000, len(seeds)))
+    for step_actions in actions:
+        states, rewards, terminals = vector_env.step(step_actions)
+        expected = [env.step(int(a)) for env, a in zip(envs, step_actions)]
+        np.testing.assert_array_equal(states, [e[0] for e in expected])
+        np.testing.assert_array_equal(rewards, [e[1] for e in expected])
+        np.testing.assert_array_equal(terminals, [e[2] for e in expected])
+
+
+def test_single_config_shares_tables() -> None:
+    vector_env = VectorGridWorld(make_config(7), n_envs=16)
+    assert vector_env.n_envs == 16
+    assert vector_env.next_state_table.shape == (1, 16, 4)
+    assert len(set(vector_env.seeds)) == 16
+
+
+def test_masked_reset() -> None:
+    vector_env = VectorGridWorld([make_config(s) for s in range(3)])
+    vector_env.states[:] = 15
+    states = vector_env.reset(np.array([True, False, True]))
+    assert states[1] == 15
+    assert states[0] in (0, 1, 4) and states[2] in (0, 1, 4)
+
+
+def test_wall_blocks_and_terminal_resets() -> None:
+    vector_env = VectorGridWorld([make_config(0), make_config(1)])
+    vector_env.states[:] = [4, 15]
+    states, rewards, terminals = vector_env.step(np.array([3, 0]))
+    assert states[0] == 4  # wall at 5
+    assert states[1] in (0, 1, 4)
+    assert not terminals.any()
+
+
+def test_rejects_mismatched_shapes() -> None:
+    other = make_config(0)
+    other.width = 5
+    with pytest.raises(ValueError):
+        VectorGridWorld([make_config(0), other])
+
+
+def test_rejects_invalid_actions() -> None:
+    vector_env = VectorGridWorld(make_config(0), n_envs=2)
+    with pytest.raises(ValueError):
+        vector_env.step(np.array([0, 4]))
+
+
+def test_masked_step_keeps_inactive_instances() -> None:
+    vector_env = VectorGridWorld([make_config(0), make_config(1)])
+    vector_env.states[:] = [15, 0]
+    states, _, terminals = vector_env.step(
+        np.array([0, 3]), mask=np.array([False, True])
+    )
+    assert states[0] == 15 and terminals[0]
+    assert states[1] == 1